@@ -0,0 +1,36 @@
+"""
+sample strings used by the benchmarks, taken from the unit tests
+"""
+
+LINEAR_RATE = [
+    "10Y 1",
+    "EUR 10Y 97.25KR",
+    "EUR 5Y10Y 0.1 1S ACT365 100KR",
+    "4APR1910Y 100M",
+    "DKK 3X6I -0.36",
+    "DKK 11X23 0.12 125.1M",
+    "EUR 5Y10Y 2/1 1D6S ACT365 100KR",
+    "DKKSEK MTM 5Y10Y -100M",
+    "EUR 5Y 5S10S 2/1 6S ACT365 1M/500KR",
+    "5S10S -193.4M/100M",
+    "EUR 1JAN19 5S7S10S 0.5/2/1 1D ACT365 -5K/10.2K/-5KR",
+    "5S7S10S 3S -69M/100M/-35.9M",
+    "H02YSH22YS 3S 100M/100MR",
+    "EUR 1JAN195YS30MAR1910YS 0.5/2 1D ACT365 1.2M",
+    "5Y2YS7Y2YS10Y2YS -69M/100M/-35.9M",
+]
+
+RATES_VOLATILITY = [
+    "10Y10Y P CASH 100M",
+    "Z910Y 1.35393 R CASH -100M",
+    "EUR 10Y10Y P 3S PHYS 100M",
+    "2Y5Y A-10 P",
+    "USD 5Y5Y 100WC -100M",
+    "EUR 5Y5Y 1.25 50WS CASH",
+    "6MX10Y 0.91 F 6S -100M",
+    "0MX12M A1 C",
+    "EUR 0MX10Y 0WS 6S 100M",
+    "USD 3MX12M S",
+]
+
+CORPUS = {"linear_rate": LINEAR_RATE, "rates_volatility": RATES_VOLATILITY}
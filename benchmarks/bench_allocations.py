@@ -0,0 +1,119 @@
+"""
+measures the memory allocated per call of parse & format for each product type, on a synthetic corpus, and compares it
+to the baselines recorded in allocations.json:
+ - peak_kib: the peak of the memory traced by tracemalloc while parsing (or formatting) a string
+ - retained_blocks: the memory blocks still allocated after the call (f.ex. by the caches)
+ - cyclic_objects: the objects only freed by the cyclic garbage collector, which make collections more frequent
+
+usage: python -m benchmarks.bench_allocations [--update] [--count COUNT] [--tolerance TOLERANCE]
+The exit status is 1 if any measure is over its baseline by more than the tolerance, --update records the measures as
+the new baselines.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tracemalloc
+from typing import Callable, Dict, List
+
+import lark
+
+from rates_derivative_grammar import AssetClassFormatter, AssetClassParser
+from rates_derivative_grammar.corpus import CorpusGenerator
+
+BASELINES_PATH = os.path.join(os.path.dirname(__file__), "allocations.json")
+ASSET_CLASSES = ("linear_rate", "rates_volatility")
+
+
+def measure(func: Callable, args: List) -> Dict[str, float]:
+    """
+    Returns: the measures of a call of func averaged over args
+    """
+    # the first calls fill the caches (f.ex. the pipelines of the products) which are not measured
+    for arg in args[:2]:
+        func(*arg)
+
+    peak = retained = cyclic = 0
+    gc.collect()
+    gc.disable()
+    tracemalloc.start()
+    try:
+        for arg in args:
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            blocks = sys.getallocatedblocks()
+            func(*arg)
+            peak += tracemalloc.get_traced_memory()[1] - before
+            cyclic += gc.collect()
+            retained += sys.getallocatedblocks() - blocks
+    finally:
+        tracemalloc.stop()
+        gc.enable()
+
+    return {
+        "peak_kib": round(peak / 1024 / len(args), 1),
+        "retained_blocks": round(retained / len(args), 1),
+        "cyclic_objects": round(cyclic / len(args), 1),
+    }
+
+
+def measure_all(count: int) -> Dict[str, Dict[str, float]]:
+    """
+    Returns: the measures as {asset_class/product_type/(parse|format): measures}
+    """
+    measures = {}
+    for asset_class in ASSET_CLASSES:
+        parser, formatter = AssetClassParser(asset_class), AssetClassFormatter(asset_class)
+        for product_type in CorpusGenerator(asset_class, expected=False).products:
+            corpus = CorpusGenerator(asset_class, products={product_type: 1.0})
+            samples = list(corpus.generate(count))
+            key = f"{asset_class}/{product_type}"
+            measures[f"{key}/parse"] = measure(parser.parse, [(sample.string,) for sample in samples])
+            measures[f"{key}/format"] = measure(
+                formatter.format, [(sample.product_type, sample.attributes_dict) for sample in samples]
+            )
+    return measures
+
+
+def environment() -> Dict[str, str]:
+    return {"python": platform.python_version(), "lark": lark.__version__}
+
+
+def main(argv=None) -> int:
+    args = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    args.add_argument("--update", action="store_true", help="record the measures as the new baselines")
+    args.add_argument("--count", type=int, default=20, help="the number of strings measured per product type")
+    args.add_argument("--tolerance", type=float, default=0.1, help="the share a measure may exceed its baseline by")
+    args = args.parse_args(argv)
+
+    measures = measure_all(args.count)
+    if args.update:
+        with open(BASELINES_PATH, "w", encoding="utf-8") as f:
+            json.dump({"environment": environment(), "measures": measures}, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+    with open(BASELINES_PATH, encoding="utf-8") as f:
+        baselines = json.load(f)
+    if baselines["environment"] != environment():
+        print(f"the baselines were recorded on {baselines['environment']}, the measures may differ", file=sys.stderr)
+
+    regressions = 0
+    print(f"{'':<45}{'peak_kib':>20}{'retained_blocks':>20}{'cyclic_objects':>20}")
+    for key, values in measures.items():
+        baseline = baselines["measures"].get(key, {})
+        cells = []
+        for name, value in values.items():
+            expected = baseline.get(name)
+            regression = expected is not None and value > expected * (1 + args.tolerance) + 1
+            regressions += regression
+            delta = f"{value / expected - 1:+.0%}" if expected else ""
+            cells.append(f"{value:>10.1f} {delta:>7}{'!' if regression else ' '}")
+        print(f"{key:<45}{cells[0]:>20}{cells[1]:>20}{cells[2]:>20}")
+    print(f"{regressions} regressions (over baseline by more than {args.tolerance:.0%}, marked with !)")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
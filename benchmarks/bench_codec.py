@@ -0,0 +1,63 @@
+"""
+compares the size and the speed of the ParseResultCodec with pickle on parsed results.
+
+usage: python -m benchmarks.bench_codec [n_results]
+"""
+import gc
+import pickle
+import sys
+import time
+
+from rates_derivative_grammar import AssetClassParser
+from rates_derivative_grammar.codec import ParseResultCodec
+
+from ._corpus import CORPUS
+
+
+def timed(func, *args):
+    # the garbage collector is disabled as its passes over the results created would dominate the timings
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        result = func(*args)
+        return result, time.perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def main(n_results: int = 100_000) -> None:
+    for asset_class, strings in CORPUS.items():
+        parser, codec = AssetClassParser(asset_class), ParseResultCodec(asset_class)
+        parsed = list(map(parser.parse, strings))
+        # copies so that pickle cannot memoize identical objects
+        results = [pickle.loads(pickle.dumps(parsed[i % len(parsed)])) for i in range(n_results)]
+
+        print(f"{asset_class}: {n_results} results")
+
+        # one record at a time, f.ex. to store in a cache
+        encoded, encode_time = timed(lambda: [codec.encode(result) for result in results])
+        _, decode_time = timed(lambda: [codec.decode(buffer) for buffer in encoded])
+        pickled, pickle_time = timed(lambda: [pickle.dumps(result, pickle.HIGHEST_PROTOCOL) for result in results])
+        _, unpickle_time = timed(lambda: [pickle.loads(buffer) for buffer in pickled])
+        for name, buffers, dump_time, load_time in [
+            ("codec", encoded, encode_time, decode_time),
+            ("pickle", pickled, pickle_time, unpickle_time),
+        ]:
+            size = sum(map(len, buffers)) / n_results
+            print(f"  single {name:<6}: {size:6.1f} bytes/result, dump {dump_time:.3f}s, load {load_time:.3f}s")
+
+        # in bulk, f.ex. to send to another process
+        encoded, encode_time = timed(codec.encode_many, results)
+        _, decode_time = timed(codec.decode_many, memoryview(encoded))
+        pickled, pickle_time = timed(pickle.dumps, results, pickle.HIGHEST_PROTOCOL)
+        _, unpickle_time = timed(pickle.loads, pickled)
+        for name, buffer, dump_time, load_time in [
+            ("codec", encoded, encode_time, decode_time),
+            ("pickle", pickled, pickle_time, unpickle_time),
+        ]:
+            size = len(buffer) / n_results
+            print(f"  bulk   {name:<6}: {size:6.1f} bytes/result, dump {dump_time:.3f}s, load {load_time:.3f}s")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
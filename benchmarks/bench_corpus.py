@@ -0,0 +1,29 @@
+"""
+measures the rate at which the corpus generator derives strings, and checks that parsing the strings generated gives
+back the attributes they were derived from (the strings that do not are ambiguous for the grammar).
+
+usage: python -m benchmarks.bench_corpus [count]
+"""
+import sys
+import time
+
+from rates_derivative_grammar.corpus import CorpusGenerator
+
+
+def main(count: int = 2000) -> None:
+    for asset_class in ("linear_rate", "rates_volatility"):
+        for expected in (False, True):
+            generator = CorpusGenerator(asset_class, expected=expected)
+            start = time.perf_counter()
+            samples = list(generator.generate(count))
+            elapsed = time.perf_counter() - start
+            label = "strings & attributes" if expected else "strings"
+            print(f"{asset_class:<18}: {count / elapsed:10.0f} {label}/s")
+
+        results = generator.parser.parse_many([sample.string for sample in samples], return_exceptions=True)
+        agree = sum(result == (sample.product_type, sample.attributes_dict) for sample, result in zip(samples, results))
+        print(f"{asset_class:<18}: {agree / count:10.1%} of the strings parse to the attributes they were derived from")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,34 @@
+"""
+measures the overhead of collecting the coverage of the grammar while parsing the corpus.
+
+usage: python -m benchmarks.bench_coverage [repeat]
+"""
+import sys
+import time
+
+from rates_derivative_grammar import AssetClassParser
+from rates_derivative_grammar.coverage import CoverageCollector
+
+from ._corpus import CORPUS
+
+
+def measure(parser: AssetClassParser, strings, repeat: int) -> float:
+    parser.parse_many(strings)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        parser.parse_many(strings)
+    return (time.perf_counter() - start) / (repeat * len(strings))
+
+
+def main(repeat: int = 20) -> None:
+    for asset_class, strings in CORPUS.items():
+        without = measure(AssetClassParser(asset_class), strings, repeat)
+        with_coverage = measure(AssetClassParser(asset_class, coverage=CoverageCollector()), strings, repeat)
+        print(
+            f"{asset_class:<18}: {without * 1e6:8.1f} us/parse, {with_coverage * 1e6:8.1f} us/parse with coverage "
+            f"({with_coverage / without - 1:+.1%})"
+        )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
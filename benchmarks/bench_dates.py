@@ -0,0 +1,54 @@
+"""
+compares DateConverter to the strptime/strftime conversion it replaces, on a column of dates of a blotter.
+
+usage: python -m benchmarks.bench_dates [rows]
+"""
+from datetime import date, datetime, timedelta
+import gc
+import random
+import sys
+import time
+
+from lark import Token
+
+from rates_derivative_grammar.conversion import DateConverter
+
+
+def timed(func, *args) -> float:
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        func(*args)
+        return time.perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def main(rows: int = 200_000) -> None:
+    random.seed(0)
+    # dates of a blotter fall on a few thousand distinct days
+    dates = [date(2020, 1, 1) + timedelta(days=random.randrange(3650)) for _ in range(rows)]
+    tokens = [Token("DATE", d.strftime("%d%b%y").upper().lstrip("0")) for d in dates]
+
+    def strptime():
+        return [datetime.strptime(token, "%d%b%y").date() for token in tokens]
+
+    def strftime():
+        return [Token("DATE", d.strftime("%d%b%y").upper().lstrip("0")) for d in dates]
+
+    results = [
+        ("from_token", strptime, lambda: [DateConverter.from_token(token) for token in tokens]),
+        ("from_tokens", None, lambda: DateConverter.from_tokens(tokens)),
+        ("to_token", strftime, lambda: [DateConverter.to_token("DATE", d) for d in dates]),
+        ("to_tokens", None, lambda: DateConverter.to_tokens("DATE", dates)),
+    ]
+    for name, baseline, converter in results:
+        elapsed = timed(converter)
+        line = f"{name:<12}: {rows / elapsed:10.0f} dates/s"
+        if baseline is not None:
+            line += f" (strptime/strftime: {rows / timed(baseline):10.0f} dates/s)"
+        print(line)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,37 @@
+"""
+compares AssetClassFormatter.format called in a loop with format_many on a blotter where records repeat, as in a
+risk report where the same products are held in many books.
+
+usage: python -m benchmarks.bench_format_many [repeat]
+"""
+import sys
+import time
+
+from rates_derivative_grammar import AssetClassParser, AssetClassFormatter
+
+from ._corpus import CORPUS
+
+
+def main(repeat: int = 20) -> None:
+    for asset_class, strings in CORPUS.items():
+        records = AssetClassParser(asset_class).parse_many(strings) * repeat
+        formatter = AssetClassFormatter(asset_class)
+        formatter.format_many(records[: len(strings)])
+
+        start = time.perf_counter()
+        for record in records:
+            formatter.format(*record)
+        serial = time.perf_counter() - start
+
+        start = time.perf_counter()
+        formatter.format_many(records)
+        batch = time.perf_counter() - start
+
+        print(
+            f"{asset_class:<16} format: {len(records) / serial:8.0f} records/s, "
+            f"format_many: {len(records) / batch:8.0f} records/s (x{serial / batch:.2f})"
+        )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
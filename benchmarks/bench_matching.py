@@ -0,0 +1,54 @@
+"""
+measures the time & memory taken to build an EquivalenceIndex over a blotter and to join another blotter against it.
+
+The blotters are made of the products of the corpus with varying sizes, the right blotter holding the same products
+as the left one written differently (sizes off by less than the tolerance) in a different order.
+
+usage: python -m benchmarks.bench_matching [rows]
+"""
+import random
+import sys
+import time
+import tracemalloc
+
+from rates_derivative_grammar import AssetClassParser
+from rates_derivative_grammar.matching import EquivalenceIndex
+
+from ._corpus import LINEAR_RATE
+
+
+def make_blotter(rows: int, seed: int = 0):
+    random.seed(seed)
+    products = AssetClassParser("linear_rate").parse_many(LINEAR_RATE)
+    left = []
+    for i in range(rows):
+        product_type, attributes_dict = products[i % len(products)]
+        left.append((product_type, {**attributes_dict, "size": float(1_000_000 + i)}))
+
+    right = [(product_type, {**attributes, "size": attributes["size"] + 0.1}) for product_type, attributes in left]
+    random.shuffle(right)
+    return left, right
+
+
+def main(rows: int = 1_000_000) -> None:
+    left, right = make_blotter(rows)
+
+    start = time.perf_counter()
+    index = EquivalenceIndex.build(left)
+    elapsed = time.perf_counter() - start
+
+    # the memory is measured on a second build as tracing allocations slows it down
+    tracemalloc.start()
+    EquivalenceIndex.build(left)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"build: {rows / elapsed:10.0f} rows/s, {peak / rows:6.0f} bytes/row")
+
+    start = time.perf_counter()
+    matches = sum(1 for _ in index.join(right))
+    elapsed = time.perf_counter() - start
+    print(f"join:  {rows / elapsed:10.0f} rows/s, {matches} matches")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
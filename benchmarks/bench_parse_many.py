@@ -0,0 +1,38 @@
+"""
+measures the throughput of AssetClassParser.parse_many for an increasing number of threads.
+
+The threads only scale on a free-threaded build of python (python3.13t or later). On a build with a GIL the throughput
+stays flat, which shows that the thread pool degrades gracefully to serial parsing.
+
+usage: python -m benchmarks.bench_parse_many [repeat]
+"""
+import sys
+import time
+
+from rates_derivative_grammar import AssetClassParser
+from rates_derivative_grammar.utils import is_gil_enabled
+
+from ._corpus import CORPUS
+
+
+def main(repeat: int = 20) -> None:
+    print(f"python {sys.version.split()[0]}, gil enabled: {is_gil_enabled()}")
+    for asset_class, strings in CORPUS.items():
+        parser = AssetClassParser(asset_class)
+        strings = strings * repeat
+        parser.parse_many(strings[:10], workers=1)
+
+        baseline = None
+        for workers in (1, 2, 4, 8):
+            start = time.perf_counter()
+            parser.parse_many(strings, workers=workers)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(
+                f"{asset_class:<16} workers={workers}: {len(strings) / elapsed:8.0f} strings/s "
+                f"(speed-up x{baseline / elapsed:.2f})"
+            )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,65 @@
+"""
+measures the time per call of the pre-processing of the attributes formatted, chained through the pre_process of the
+processor's mixins or run as the plan compiled by compile_pre_process, next to the time of a whole format. The
+products cover the leverage schedules, the triple sizes and the relative strikes.
+
+usage: python -m benchmarks.bench_pre_process [count] [repeat]
+"""
+import gc
+import sys
+import time
+
+from rates_derivative_grammar import AssetClassFormatter
+from rates_derivative_grammar.corpus import CorpusGenerator
+from rates_derivative_grammar.processing import processors_registry, to_processor_key
+
+PRODUCTS = {
+    "linear_rate": ("leverage_swap_fly", "leverage_swap_curve", "swap_fly", "fix_float_swap"),
+    "rates_volatility": ("swaption_strategy", "cap_floor"),
+}
+
+
+def timed(func, args) -> float:
+    """
+    Returns: the seconds per call of func, each call taking its own argument (the pre-processing updates the nodes)
+    """
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for arg in args:
+            func(arg)
+        return (time.perf_counter() - start) / len(args)
+    finally:
+        gc.enable()
+
+
+def main(count: int = 200, repeat: int = 20) -> None:
+    print(f"{'':<40}{'pre_process':>14}{'plan':>14}{'format':>14}")
+    for asset_class, product_types in PRODUCTS.items():
+        formatter = AssetClassFormatter(asset_class)
+        for product_type in product_types:
+            samples = list(CorpusGenerator(asset_class, products={product_type: 1.0}).generate(count))
+            processor = processors_registry[to_processor_key(asset_class, product_type)]
+            plan = processor.compile_pre_process()
+            rule_names = formatter._get_format_tools(product_type).analyser.rules_by_origin.keys()
+
+            def make_nodes():
+                nodes = []
+                for _ in range(repeat):
+                    nodes.extend(formatter._make_attributes_nodes(s.attributes_dict, rule_names) for s in samples)
+                return nodes
+
+            def pre_process(nodes):
+                return list(processor.pre_process(nodes))
+
+            seconds = [
+                timed(pre_process, make_nodes()),
+                timed(plan, make_nodes()),
+                timed(lambda s: formatter.format(product_type, s.attributes_dict), samples),
+            ]
+            cells = "".join(f"{s * 1e6:11.1f} us" for s in seconds)
+            print(f"{asset_class + '/' + product_type:<40}{cells}")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
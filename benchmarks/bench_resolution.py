@@ -0,0 +1,35 @@
+"""
+compares resolving a column of time values one by one without memo to TimeResolver.resolve_many.
+
+usage: python -m benchmarks.bench_resolution [rows]
+"""
+from datetime import date
+import itertools
+import sys
+import time
+
+from rates_derivative_grammar.resolution import TimeResolver
+
+VALUES = ["1Y", "2Y", "5Y", "10Y", "30Y", "4.25Y", "6M", "3B", "H5", "M5", "U5", "Z5", "IMM_1", "IMM_4", "IMM_MAR26"]
+
+
+def main(rows: int = 1_000_000) -> None:
+    valuation_date = date(2025, 1, 15)
+    column = list(itertools.islice(itertools.cycle(VALUES), rows))
+
+    resolver = TimeResolver()
+    resolve = TimeResolver._resolve.__wrapped__
+    start = time.perf_counter()
+    expected = [resolve(resolver, valuation_date, value) for value in column]
+    serial = time.perf_counter() - start
+
+    start = time.perf_counter()
+    resolved = resolver.resolve_many(valuation_date, column)
+    batch = time.perf_counter() - start
+    assert resolved == expected
+
+    print(f"one by one: {rows / serial:10.0f} values/s, resolve_many: {rows / batch:10.0f} values/s")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,87 @@
+"""
+compares 8 worker processes parsing a skewed batch of strings with a private result cache per worker against the same
+workers sharing a SharedMemoryParseCache.
+
+usage: python -m benchmarks.bench_shared_cache [n_strings] [n_workers]
+"""
+from concurrent.futures import ProcessPoolExecutor
+import random
+import sys
+import time
+from typing import Dict, Iterable, Optional
+
+from rates_derivative_grammar import AssetClassParser
+from rates_derivative_grammar.caching import SharedMemoryParseCache
+
+from ._corpus import LINEAR_RATE
+
+ASSET_CLASS = "linear_rate"
+
+_parser: Optional[AssetClassParser] = None
+_cache = None
+
+
+class PrivateCache(dict):
+    """ the cache of a single worker """
+
+    hits = misses = 0
+
+    def get_many(self, strings: Iterable[str]) -> Dict:
+        strings = list(strings)
+        results = {string: self[string] for string in strings if string in self}
+        self.hits += len(results)
+        self.misses += len(strings) - len(results)
+        return results
+
+    def put_many(self, results) -> None:
+        self.update(results)
+
+
+def _initialize(cache_name: Optional[str]) -> None:
+    global _parser, _cache
+    _parser = AssetClassParser(ASSET_CLASS)
+    _cache = SharedMemoryParseCache.attach(cache_name) if cache_name else PrivateCache()
+
+
+def _parse_chunk(strings):
+    hits, misses = _cache.hits, _cache.misses
+    _parser.parse_many(strings, cache=_cache)
+    return _cache.hits - hits, _cache.misses - misses
+
+
+def run(strings, n_workers: int, cache_name: Optional[str]) -> None:
+    chunks = [strings[i : i + 50] for i in range(0, len(strings), 50)]
+    with ProcessPoolExecutor(n_workers, initializer=_initialize, initargs=(cache_name,)) as executor:
+        # make sure all the workers are started before timing
+        list(executor.map(time.sleep, [0.1] * n_workers))
+
+        start = time.perf_counter()
+        stats = list(executor.map(_parse_chunk, chunks))
+        elapsed = time.perf_counter() - start
+
+    hits = sum(hit for hit, _ in stats)
+    lookups = sum(hit + miss for hit, miss in stats)
+    name = "shared cache" if cache_name else "private caches"
+    print(f"{name:<15}: {len(strings) / elapsed:8.0f} strings/s, hit rate {hits / lookups:.1%}")
+
+
+def main(n_strings: int = 20000, n_workers: int = 8) -> None:
+    # a blotter of skewed, mostly repeated descriptions
+    rng = random.Random(0)
+    distinct = list(LINEAR_RATE)
+    distinct += [f"EUR {i}Y {rng.choice(['3S', '6S'])} {rng.randint(1, 500)}M" for i in range(1, 31)]
+    strings = [distinct[min(int(rng.paretovariate(1.0)) - 1, len(distinct) - 1)] for _ in range(n_strings)]
+    print(f"{n_strings} strings, {len(set(strings))} distinct, {n_workers} workers")
+
+    run(strings, n_workers, None)
+
+    cache = SharedMemoryParseCache.create(ASSET_CLASS, 1 << 14)
+    try:
+        run(strings, n_workers, cache.name)
+    finally:
+        cache.close()
+        cache.unlink()
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,87 @@
+"""
+measures the startup cost of the library: the seconds & the memory (the peak and the memory retained, traced by
+tracemalloc) taken to build the parser of each asset class, then the format tools of each product type. Each run is
+made in a fresh interpreter so that no grammar is memoized when it starts, and the memory is measured in separate runs
+as tracing slows down the startup.
+
+usage: python -m benchmarks.bench_startup [repeat]
+"""
+from glob import glob
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict
+
+ASSET_CLASSES = ("linear_rate", "rates_volatility")
+
+
+def measure(func: Callable, traced: bool) -> Dict[str, float]:
+    if not traced:
+        start = time.perf_counter()
+        func()
+        return {"seconds": time.perf_counter() - start}
+
+    before = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    func()
+    current, peak = tracemalloc.get_traced_memory()
+    return {"peak_kib": (peak - before) / 1024, "retained_kib": (current - before) / 1024}
+
+
+def run(formatters_only: bool, traced: bool) -> Dict[str, Dict[str, float]]:
+    """
+    Returns: the measures of each stage of the startup as {stage: measures}
+    """
+    from rates_derivative_grammar import GRAMMAR_PATH, AssetClassFormatter, AssetClassParser
+    from rates_derivative_grammar.utils import PATH_DELIMITER
+
+    def make_parsers():
+        for asset_class in ASSET_CLASSES:
+            AssetClassParser(asset_class)
+
+    def make_formatters():
+        for asset_class in ASSET_CLASSES:
+            formatter = AssetClassFormatter(asset_class)
+            for path in glob(os.path.join(GRAMMAR_PATH, f"{asset_class}{PATH_DELIMITER}*.lark")):
+                formatter._get_format_tools(os.path.basename(path)[: -len(".lark")].split(PATH_DELIMITER, 1)[1])
+
+    if traced:
+        tracemalloc.start()
+    measures = {}
+    if not formatters_only:
+        measures["parsers"] = measure(make_parsers, traced)
+    measures["formatters"] = measure(make_formatters, traced)
+    tracemalloc.stop()
+    return measures
+
+
+def run_fresh(formatters_only: bool, traced: bool) -> Dict[str, Dict[str, float]]:
+    """
+    Returns: the measures of run in a fresh interpreter
+    """
+    args = [sys.executable, "-m", "benchmarks.bench_startup", "--run", str(int(formatters_only)), str(int(traced))]
+    return json.loads(subprocess.run(args, check=True, capture_output=True, text=True).stdout)
+
+
+def main(repeat: int = 3) -> None:
+    for formatters_only in (False, True):
+        runs = [run_fresh(formatters_only, False) for _ in range(repeat)]
+        memory = run_fresh(formatters_only, True)
+        print("formatters only" if formatters_only else "parsers, then formatters")
+        for stage, measures in memory.items():
+            # the fastest run is the least disturbed by the rest of the machine
+            seconds = min(r[stage]["seconds"] for r in runs)
+            print(
+                f"  {stage:<12}: {seconds * 1e3:8.1f} ms, {measures['peak_kib']:9.1f} KiB peak, "
+                f"{measures['retained_kib']:9.1f} KiB retained"
+            )
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--run"]:
+        print(json.dumps(run(bool(int(sys.argv[2])), bool(int(sys.argv[3])))))
+    else:
+        main(*map(int, sys.argv[1:]))
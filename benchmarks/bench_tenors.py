@@ -0,0 +1,48 @@
+"""
+measures the memory held by the results of a blotter parsed with and without interned tenors.
+
+The blotter is made of swaps & curves over the usual grid of tenors, as a book of trades would be.
+
+usage: python -m benchmarks.bench_tenors [rows]
+"""
+import gc
+import itertools
+import sys
+import tracemalloc
+
+from rates_derivative_grammar import AssetClassParser
+
+TENORS = ["1Y", "2Y", "3Y", "5Y", "7Y", "10Y", "15Y", "20Y", "30Y"]
+
+
+def make_blotter(rows: int):
+    templates = ["EUR {}{} 3S {}M", "{}{} 0.5 {}M", "USD {}{} 1D {}KR"]
+    products = itertools.cycle(itertools.product(templates, TENORS, TENORS))
+    return [template.format(start, end, i % 1000 + 1) for i, (template, start, end) in zip(range(rows), products)]
+
+
+def measure(parser: AssetClassParser, strings):
+    gc.collect()
+    tracemalloc.start()
+    results = [parser.parse(string) for string in strings]
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return results, current
+
+
+def main(rows: int = 2000) -> None:
+    strings = make_blotter(rows)
+    for intern_tenors in (False, True):
+        parser = AssetClassParser("linear_rate", intern_tenors=intern_tenors)
+        parser.parse(strings[0])
+        results, held = measure(parser, strings)
+        tenors = {id(attributes[name]) for _, attributes in results for name in ("start_time", "end_time")}
+        print(
+            f"intern_tenors={intern_tenors!s:<5}: {held / rows:6.0f} bytes/row held, "
+            f"{len(tenors)} distinct tenor objects for {2 * rows} tenors"
+        )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
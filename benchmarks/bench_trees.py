@@ -0,0 +1,77 @@
+"""
+measures the time per parse & the number of tree nodes (and their meta) allocated per parse, split between building
+the tree (lark's earley parser) and transforming it into attributes (the transformers, the processor & the visitor).
+
+usage: python -m benchmarks.bench_trees [repeat]
+"""
+import gc
+import sys
+import time
+
+from lark.tree import Meta, Tree
+
+from rates_derivative_grammar import AssetClassParser
+from rates_derivative_grammar.utils import SlimTree
+
+from ._corpus import CORPUS
+
+
+def timed(func, strings, repeat: int) -> float:
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for string in strings:
+                func(string)
+        return (time.perf_counter() - start) / (repeat * len(strings))
+    finally:
+        gc.enable()
+
+
+def allocated(func, strings) -> float:
+    """
+    Returns: the number of trees & metas allocated per call
+    """
+    count = 0
+    inits = {cls: cls.__init__ for cls in (Tree, SlimTree, Meta)}
+
+    def counted(init):
+        def wrapper(*args, **kwargs):
+            nonlocal count
+            count += 1
+            init(*args, **kwargs)
+
+        return wrapper
+
+    for cls, init in inits.items():
+        cls.__init__ = counted(init)
+    try:
+        for string in strings:
+            func(string)
+    finally:
+        for cls, init in inits.items():
+            cls.__init__ = init
+    return count / len(strings)
+
+
+def main(repeat: int = 20) -> None:
+    for asset_class, strings in CORPUS.items():
+        parser = AssetClassParser(asset_class)
+        trees = {string: parser.parser.parse(string).children[0] for string in strings}
+
+        def transform(string):
+            product = trees[string]
+            transformer, visitor = parser._make_pipeline(product.data)
+            return visitor(transformer.transform(product))
+
+        print(asset_class)
+        for name, func in (("parse", parser.parser.parse), ("transform", transform), ("total", parser.parse)):
+            func(strings[0])
+            print(
+                f"  {name:<10}: {timed(func, strings, repeat) * 1e6:8.1f} us/parse, "
+                f"{allocated(func, strings):6.1f} nodes/parse"
+            )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
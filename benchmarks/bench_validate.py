@@ -0,0 +1,34 @@
+"""
+compares the cost of validating strings (recognising them without building their tree) to the cost of parsing them.
+
+usage: python -m benchmarks.bench_validate [repeat]
+"""
+import sys
+import time
+
+from rates_derivative_grammar import AssetClassParser
+
+from ._corpus import CORPUS
+
+
+def measure(func, strings, repeat: int) -> float:
+    func(strings)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(strings)
+    return (time.perf_counter() - start) / (repeat * len(strings))
+
+
+def main(repeat: int = 20) -> None:
+    for asset_class, strings in CORPUS.items():
+        parser = AssetClassParser(asset_class)
+        parse = measure(lambda s: parser.parse_many(s, return_exceptions=True), strings, repeat)
+        validate = measure(parser.validate_many, strings, repeat)
+        print(
+            f"{asset_class:<18}: {parse * 1e6:8.1f} us/parse, {validate * 1e6:8.1f} us/validate "
+            f"({validate / parse:.0%} of a parse)"
+        )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,271 @@
+from collections import defaultdict
+from itertools import combinations, islice
+import re
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from lark import Lark
+from lark.common import ParserConf
+from lark.grammar import Rule, Terminal
+from lark.parsers.lalr_analysis import LALR_Analyzer
+
+from .parsers import AssetClassParser
+from .utils import PATH_DELIMITER, iter_regexp_examples, to_path_root
+
+
+__all__ = ["GrammarAudit", "LalrConflict", "TerminalCollision", "ChartStats", "SHIFT_REDUCE", "REDUCE_REDUCE"]
+
+SHIFT_REDUCE, REDUCE_REDUCE = "shift/reduce", "reduce/reduce"
+
+# the number of examples of the strings two terminals match shown in a collision
+COLLISION_EXAMPLES = 3
+
+
+class TerminalCollision(NamedTuple):
+    # the terminals, by name in the grammar files, along with the products using them
+    terminal: str
+    products: Tuple[str, ...]
+    other_terminal: str
+    other_products: Tuple[str, ...]
+    # strings matched by both terminals
+    examples: Tuple[str, ...]
+
+
+class LalrConflict(NamedTuple):
+    kind: str
+    # the lookahead terminal: the terminals a lexer cannot tell apart are joined by |
+    terminal: str
+    # the rules in conflict (the rules reduced and, for shift/reduce conflicts, the rules shifting the terminal)
+    rules: Tuple[str, ...]
+    products: Tuple[str, ...]
+
+
+class ChartStats(NamedTuple):
+    strings: int
+    characters: int
+    # the number of earley items created, summed over the columns of the chart
+    items: int
+    # the largest number of items in a column
+    max_column_items: int
+    # the number of strings that did not parse
+    errors: int
+
+    @property
+    def items_per_character(self) -> float:
+        return self.items / self.characters if self.characters else 0.0
+
+
+class _ConflictCollector(LALR_Analyzer):
+    """ builds the LALR(1) states of a grammar, collecting its conflicts instead of raising on the first one """
+
+    def compute_lalr1_states(self):
+        self.conflicts: Set[Tuple[str, Terminal, FrozenSet[Rule]]] = set()
+        for state in self.lr0_states:
+            for lookahead, rules in state.lookaheads.items():
+                if len(rules) > 1:
+                    self.conflicts.add((REDUCE_REDUCE, lookahead, frozenset(rules)))
+                if lookahead in state.transitions:
+                    shifting = {item.rule for item in state.closure if not item.is_satisfied and item.next == lookahead}
+                    self.conflicts.add((SHIFT_REDUCE, lookahead, frozenset(rules) | shifting))
+
+
+class GrammarAudit:
+    """
+    audits the grammar of an asset class for the constructs that make earley parsing ambiguous or expensive:
+     - terminal collisions: the terminals of different products matching the same strings (f.ex. "S" is both a
+     SWAPTION_TYPE and a CAP_FLOOR_STRATEGY_TYPE). Earley has to try every terminal that matches at a position.
+     - LALR conflicts: the places where the grammar cannot be parsed deterministically with one token of lookahead.
+     Terminals are compared as a lexer would see them: the terminals matching common strings are merged first.
+     - chart sizes: the number of earley items created while parsing a corpus, per product.
+
+    Collisions are found on the first examples of the strings each terminal matches (see iter_regexp_examples), so
+    that collisions on strings past the examples are not reported.
+    """
+
+    def __init__(self, asset_class: str, *, grammar_path: Optional[str] = None, examples: int = 1000):
+        """
+
+        Args:
+            asset_class: the asset class of the grammar to audit
+            grammar_path: the folder containing the grammar files
+            examples: the number of examples of each terminal matched against the other terminals
+
+        """
+        self.asset_class = asset_class
+        # NOTE: the parser is not shared with other AssetClassParsers as measuring chart sizes instruments it
+        self.parser: Lark = AssetClassParser(asset_class, grammar_path=grammar_path).parser
+        self.examples = examples
+
+        self.products = [rule.expansion[0].name for rule in self.parser.rules if rule.origin.name == "start"]
+
+        # the terminals as (name in the grammar files, pattern), which are duplicated per product in the grammar
+        self._terminal_keys: Dict[str, Tuple[str, str]] = {
+            definition.name: (to_path_root(definition.name), definition.pattern.to_regexp())
+            for definition in self.parser.terminals
+        }
+        self._products_by_key: Dict[Tuple[str, str], Set[str]] = defaultdict(set)
+        for rule in self.parser.rules:
+            product = self._to_product(rule.origin.name)
+            for symbol in rule.expansion:
+                if symbol.is_term and product:
+                    self._products_by_key[self._terminal_keys[symbol.name]].add(product)
+
+        self._overlaps = self._find_overlaps()
+
+    def collisions(self) -> List[TerminalCollision]:
+        """
+        Returns: the pairs of terminals of different products matching common strings
+        """
+        collisions = []
+        for (key, other_key), examples in self._overlaps.items():
+            products, other_products = self._products_by_key[key], self._products_by_key[other_key]
+            if not any(a != b for a in products for b in other_products):
+                continue
+            collisions.append(
+                TerminalCollision(key[0], tuple(sorted(products)), other_key[0], tuple(sorted(other_products)), examples)
+            )
+        return sorted(collisions)
+
+    def conflicts(self) -> Dict[str, List[LalrConflict]]:
+        """
+        Returns: the LALR(1) conflicts of each product, as {product_type: conflicts}. The conflicts between the rules
+        of several products (f.ex. between the alternatives of the start rule) are listed under each of them.
+        """
+        names = self._merge_colliding_terminals()
+        rules = [
+            Rule(
+                rule.origin,
+                [Terminal(names[symbol.name]) if symbol.is_term else symbol for symbol in rule.expansion],
+                rule.order,
+                rule.alias,
+                rule.options,
+            )
+            for rule in self.parser.rules
+        ]
+        collector = _ConflictCollector(ParserConf(rules, None, ["start"]))
+        collector.compute_lalr()
+
+        conflicts: Dict[str, List[LalrConflict]] = {product: [] for product in self.products}
+        for kind, lookahead, conflicting_rules in collector.conflicts:
+            # the start rule & the rules of the common modules belong to no product
+            origins = {self._to_product(rule.origin.name) for rule in conflicting_rules}
+            products = tuple(sorted(product for product in origins if product is not None))
+            rule_names = tuple(sorted(map(self._format_rule, conflicting_rules)))
+            conflict = LalrConflict(kind, lookahead.name, rule_names, products)
+            for product in products:
+                conflicts[product].append(conflict)
+        return {product: sorted(set(product_conflicts)) for product, product_conflicts in conflicts.items()}
+
+    def chart_sizes(self, strings: Iterable[str]) -> Dict[Optional[str], ChartStats]:
+        """
+        parses a corpus, measuring the size of the earley chart of each string
+
+        Args:
+            strings: the strings to parse
+
+        Returns: the chart sizes summed by product type parsed, as {product_type: stats}. The strings that do not
+        parse are summed under None.
+
+        """
+        earley = self.parser.parser.parser
+        predict_and_complete = earley.predict_and_complete
+        column_sizes: List[int] = []
+
+        def measure(i, to_scan, columns, transitives):
+            predict_and_complete(i, to_scan, columns, transitives)
+            column_sizes.append(len(columns[i]) + len(to_scan))
+
+        totals: Dict[Optional[str], List[int]] = defaultdict(lambda: [0, 0, 0, 0, 0])
+        earley.predict_and_complete = measure
+        try:
+            for string in strings:
+                column_sizes.clear()
+                try:
+                    product_type, error = self.parser.parse(string).children[0].data, 0
+                except Exception:
+                    product_type, error = None, 1
+                total = totals[product_type]
+                total[0] += 1
+                total[1] += len(string)
+                total[2] += sum(column_sizes)
+                total[3] = max(total[3], max(column_sizes, default=0))
+                total[4] += error
+        finally:
+            del earley.predict_and_complete
+
+        return {product_type: ChartStats(*total) for product_type, total in totals.items()}
+
+    def report(self, strings: Iterable[str] = ()) -> str:
+        """
+        Args:
+            strings: a corpus to measure the chart sizes on, the chart sizes are not reported if empty
+
+        Returns: the report of the audit as text
+
+        """
+        lines = [f"grammar audit of {self.asset_class}", "", "terminal collisions between products:"]
+        for collision in self.collisions():
+            lines.append(
+                f"  {collision.terminal} ({', '.join(collision.products)}) ~ "
+                f"{collision.other_terminal} ({', '.join(collision.other_products)}): {', '.join(collision.examples)}"
+            )
+
+        lines += ["", "LALR(1) conflicts:"]
+        for product, conflicts in self.conflicts().items():
+            lines.append(f"  {product}: {len(conflicts)}")
+            for conflict in conflicts:
+                lines.append(f"    {conflict.kind} on {conflict.terminal}")
+                lines.extend(f"      {rule}" for rule in conflict.rules)
+
+        chart_sizes = self.chart_sizes(strings)
+        if chart_sizes:
+            lines += ["", f"{'earley chart sizes:':<30}{'strings':>8}{'errors':>8}{'items/char':>12}{'max column':>12}"]
+            for product_type, stats in sorted(chart_sizes.items(), key=lambda item: -item[1].items_per_character):
+                lines.append(
+                    f"  {product_type or '(no parse)':<28}{stats.strings:>8}{stats.errors:>8}"
+                    f"{stats.items_per_character:>12.1f}{stats.max_column_items:>12}"
+                )
+        return "\n".join(lines)
+
+    def _find_overlaps(self) -> Dict[Tuple[Tuple[str, str], Tuple[str, str]], Tuple[str, ...]]:
+        keys = sorted(self._products_by_key)
+        patterns = {key: re.compile(key[1]) for key in keys}
+        examples = {key: list(islice(iter_regexp_examples(key[1]), self.examples)) for key in keys}
+
+        overlaps = {}
+        for key, other_key in combinations(keys, 2):
+            common = [example for example in examples[key] if patterns[other_key].fullmatch(example)]
+            common += [example for example in examples[other_key] if patterns[key].fullmatch(example)]
+            if common:
+                overlaps[key, other_key] = tuple(dict.fromkeys(common))[:COLLISION_EXAMPLES]
+        return overlaps
+
+    def _merge_colliding_terminals(self) -> Dict[str, str]:
+        """
+        Returns: the name of the terminal a lexer would see for each terminal of the grammar, as {name: merged name}
+        """
+        merged = {key: {key} for key in self._products_by_key}
+        for key, other_key in self._overlaps:
+            group = merged[key] | merged[other_key]
+            for member in group:
+                merged[member] = group
+        return {
+            name: "|".join(sorted({member[0] for member in merged.get(key, {key})}))
+            for name, key in self._terminal_keys.items()
+        }
+
+    def _to_product(self, name: str) -> Optional[str]:
+        if name in self.products:
+            return name
+        # NOTE: the names of inline rules start with _
+        parts = name.lstrip("_").split(PATH_DELIMITER)
+        return parts[1] if parts[0] == self.asset_class and len(parts) > 2 else None
+
+    def _format_rule(self, rule: Rule) -> str:
+        # NOTE: nonterminals are named by their path from the asset class (f.ex. swaption__time) as each product defines
+        # its own nonterminals, which conflict with each other where products share a prefix
+        expansion = " ".join(symbol.name if symbol.is_term else self._to_path(symbol.name) for symbol in rule.expansion)
+        return f"{self._to_path(rule.origin.name)}: {expansion}"
+
+    def _to_path(self, name: str) -> str:
+        parts = name.lstrip("_").split(PATH_DELIMITER, 1)
+        return parts[1] if parts[0] == self.asset_class and len(parts) > 1 else name
@@ -0,0 +1,95 @@
+from functools import lru_cache
+import time
+from typing import Dict, Iterable, List, Optional
+
+from lark.grammar import NonTerminal, Rule
+from lark.lexer import TerminalDef
+from lark.utils import get_regexp_width
+
+from .grammar_analysis import Grammar
+
+
+__all__ = ["ParseBudgetExceededError", "InputTooLongError", "BudgetedText", "max_string_lengths", "MAX_TOKEN_LENGTH"]
+
+# the number of characters counted for a terminal whose pattern matches strings of any length (f.ex. NOTIONAL_NUMBER)
+MAX_TOKEN_LENGTH = 16
+
+
+class ParseBudgetExceededError(RuntimeError):
+    """ raised when parsing a string takes more time or more steps than its budget """
+
+
+class InputTooLongError(ValueError):
+    """ raised when a string is longer than any string the grammar can parse """
+
+
+class BudgetedText(str):
+    """
+    a string to parse along with its budget: the parser counts a step each time it matches a terminal at a position
+    of the string, and aborts when the steps or the time spent are over the budget.
+
+    The budget travels with the string so that a parser shared by several threads enforces the budget of each call.
+    """
+
+    max_seconds: Optional[float]
+    max_steps: Optional[int]
+    # the time.perf_counter() after which the parse is aborted, None if unlimited
+    deadline: Optional[float]
+    # the steps spent so far
+    steps: int
+
+    def __new__(cls, string: str, *, max_seconds: Optional[float] = None, max_steps: Optional[int] = None):
+        """
+
+        Args:
+            string: the string to parse
+            max_seconds: the time the parser may spend on the string, unlimited if None
+            max_steps: the number of terminal matches the parser may attempt, unlimited if None
+
+        """
+        text = super().__new__(cls, string)
+        text.max_seconds = max_seconds
+        text.max_steps = max_steps
+        text.deadline = None if max_seconds is None else time.perf_counter() + max_seconds
+        text.steps = 0
+        return text
+
+    def spend(self) -> None:
+        """ counts a step, raising a ParseBudgetExceededError if over the budget """
+        self.steps += 1
+        if self.max_steps is not None and self.steps > self.max_steps:
+            raise ParseBudgetExceededError(f"Parsing took more than {self.max_steps} steps: {str(self)!r}.")
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise ParseBudgetExceededError(f"Parsing took more than {self.max_seconds}s: {str(self)!r}.")
+
+
+def max_string_lengths(rules: Iterable[Rule], terminals: Iterable[TerminalDef]) -> Dict[str, int]:
+    """
+    computes the length of the longest string of each product of a grammar: its maximum number of tokens, each token
+    counting for the length of the longest string its terminal matches (or MAX_TOKEN_LENGTH if unbounded).
+
+    Args:
+        rules: the rules of the grammar, whose start rule has an alternative per product
+        terminals: the definitions of the terminals of the grammar
+
+    Returns: the length of each product as {product_type: length}
+
+    """
+    grammar = Grammar(rules)
+    widths = {
+        definition.name: min(get_regexp_width(definition.pattern.to_regexp())[1], MAX_TOKEN_LENGTH)
+        for definition in terminals
+    }
+
+    @lru_cache(maxsize=None)
+    def max_length(symbol: NonTerminal) -> int:
+        lengths: List[int] = []
+        for rule in grammar.rules_by_origin[symbol]:
+            lengths.append(sum(widths[child.name] if child.is_term else max_length(child) for child in rule.expansion))
+        return max(lengths)
+
+    # NOTE: the grammars have no recursive rules (lists are spelled out, f.ex. _double_years), so the recursion ends
+    return {
+        rule.expansion[0].name: max_length(rule.expansion[0])
+        for rule in grammar.rules_by_origin[NonTerminal("start")]
+    }
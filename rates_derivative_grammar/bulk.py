@@ -0,0 +1,64 @@
+from contextlib import contextmanager
+import gc
+from threading import Lock
+from typing import Iterator, Optional, Tuple
+
+__all__ = ["bulk_mode", "BULK_GC_THRESHOLD"]
+
+# the number of allocations between two collections of the youngest generation in bulk mode (700 by default)
+BULK_GC_THRESHOLD = 50_000
+
+_lock = Lock()
+# the number of batches in bulk mode, and the settings to restore when the last one ends as (thresholds, enabled,
+# frozen)
+_depth = 0
+_previous: Optional[Tuple[Tuple[int, ...], bool, bool]] = None
+
+
+@contextmanager
+def bulk_mode(*, threshold: int = BULK_GC_THRESHOLD, freeze: bool = True) -> Iterator[None]:
+    """
+    tunes the cyclic garbage collector for the duration of a batch of parses or formats, which create many short-lived
+    trees, tokens & dicts:
+     - the objects alive when the batch starts (f.ex. the compiled grammars and the caches) are frozen, so that the
+     collections during the batch do not scan them
+     - the youngest generation is only collected every threshold allocations instead of 700. A threshold of 0 pauses
+     collection altogether, the garbage being collected when the batch ends.
+    Note that earley parsing creates cyclic garbage (about 2000 objects per parse), so that collection should only be
+    paused for small batches.
+
+    The previous settings are restored when the batch ends. Batches can be nested or run concurrently by several
+    threads: the settings are changed when the first batch starts and restored when the last one ends.
+
+    Args:
+        threshold: the number of allocations between two collections of the youngest generation, 0 to pause
+        collection
+        freeze: if True, the objects alive when the batch starts are frozen
+
+    """
+    global _depth, _previous
+    with _lock:
+        if _depth == 0:
+            # NOTE: the objects frozen by the caller are left frozen
+            frozen = freeze and gc.get_freeze_count() == 0
+            _previous = gc.get_threshold(), gc.isenabled(), frozen
+            if frozen:
+                gc.freeze()
+            if threshold:
+                gc.set_threshold(threshold, *_previous[0][1:])
+            else:
+                gc.disable()
+        _depth += 1
+    try:
+        yield
+    finally:
+        with _lock:
+            _depth -= 1
+            if _depth == 0:
+                thresholds, enabled, frozen = _previous
+                gc.set_threshold(*thresholds)
+                if frozen:
+                    gc.unfreeze()
+                if enabled and not gc.isenabled():
+                    gc.enable()
+                    gc.collect(0)
@@ -0,0 +1,319 @@
+import hashlib
+import json
+import os
+import sqlite3
+import struct
+import sys
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional, Tuple
+import zlib
+
+from .codec import ParseResultCodec, CODEC_VERSION
+
+if TYPE_CHECKING:
+    from multiprocessing.shared_memory import SharedMemory
+
+__all__ = ["PersistentParseCache", "SharedMemoryParseCache", "grammar_fingerprint"]
+
+ParseResult = Tuple[str, Dict[str, Any]]
+
+# the packages whose code determines the value of the attributes parsed
+SOURCE_PACKAGES = ("conversion", "processing", "custom_types")
+
+
+def grammar_fingerprint(grammar_path: str) -> str:
+    """
+
+    Args:
+        grammar_path: the folder containing the grammar files
+
+    Returns: a hash of the content of the grammar files and of the code converting the parsed tokens. It changes
+    whenever a change to either could change the result of a parse.
+
+    """
+    package_path = os.path.dirname(__file__)
+    folders = [grammar_path] + [os.path.join(package_path, package) for package in SOURCE_PACKAGES]
+
+    digest = hashlib.sha256()
+    for folder in folders:
+        for root, dirs, files in os.walk(folder):
+            dirs.sort()
+            for file_name in sorted(files):
+                if file_name.endswith((".lark", ".py")):
+                    path = os.path.join(root, file_name)
+                    digest.update(os.path.relpath(path, folder).encode())
+                    with open(path, "rb") as f:
+                        digest.update(f.read())
+    return digest.hexdigest()
+
+
+class PersistentParseCache:
+    """
+    maps strings to their parse result in a sqlite database so that results survive the process.
+
+    The results are encoded with the ParseResultCodec and namespaced by asset class, by the version of the codec, by
+    the fingerprint of the grammar and by the options of the parser shaping the results (intern_tenors): a change to
+    the grammar files, to the converters or to the codec makes the results cached before the change invisible (see
+    prune to delete them), and parsers with different options do not share results.
+    Lookups and inserts are done in bulk so that a batch of strings costs a single query.
+    """
+
+    def __init__(
+        self, path: str, asset_class: str, *, grammar_path: Optional[str] = None, intern_tenors: bool = False
+    ):
+        """
+
+        Args:
+            path: the path of the sqlite database
+            asset_class: the asset class of the results cached
+            grammar_path: the folder containing the grammar files, defaults to the grammar of the package
+            intern_tenors: whether the results cached are parsed with interned tenors (see AssetClassParser). Only
+            parsers with the same option can use the cache.
+
+        """
+        from .parsers import GRAMMAR_PATH
+
+        self.path = path
+        self.asset_class = asset_class
+        self.intern_tenors = intern_tenors
+        # the results of a previous version of the grammar or of the codec are pruned, whatever the options
+        self.version = f"{asset_class}:{CODEC_VERSION}:{grammar_fingerprint(grammar_path or GRAMMAR_PATH)}"
+        self.namespace = f"{self.version}:{'interned' if intern_tenors else 'plain'}"
+        self.codec = ParseResultCodec(asset_class)
+
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS parse_results "
+                "(namespace TEXT, string TEXT, result BLOB, PRIMARY KEY (namespace, string)) WITHOUT ROWID"
+            )
+
+    def get_many(self, strings: Iterable[str]) -> Dict[str, ParseResult]:
+        """
+
+        Args:
+            strings: the strings to look up
+
+        Returns: the cached results of the strings found in the cache as {string: (product_type, attributes_dict)}
+
+        """
+        # the strings are passed as a single json array so that the lookup does not hit sqlite's limit on the number
+        # of parameters of a query
+        cursor = self.connection.execute(
+            "SELECT string, result FROM parse_results WHERE namespace = ? AND string IN (SELECT value FROM json_each(?))",
+            (self.namespace, json.dumps(list(strings))),
+        )
+        return {string: self.codec.decode(result) for string, result in cursor}
+
+    def put_many(self, results: Iterable[Tuple[str, ParseResult]]) -> None:
+        """
+
+        Args:
+            results: the results to cache as (string, (product_type, attributes_dict))
+
+        """
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO parse_results VALUES (?, ?, ?)",
+                ((self.namespace, string, self.codec.encode(result)) for string, result in results),
+            )
+
+    def prune(self) -> int:
+        """
+        deletes the results cached for the asset class under a previous version of the grammar
+
+        Returns: the number of results deleted
+
+        """
+        with self.connection:
+            cursor = self.connection.execute(
+                "DELETE FROM parse_results WHERE substr(namespace, 1, ?) = ? AND substr(namespace, 1, ?) != ?",
+                (len(self.asset_class) + 1, f"{self.asset_class}:", len(self.version) + 1, f"{self.version}:"),
+            )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> "PersistentParseCache":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class SharedMemoryParseCache:
+    """
+    maps strings to their parse result in a fixed-capacity open-addressing hash table held in shared memory, so that
+    all the processes parsing a batch share the results: a string parsed by one worker is a hit for all the others.
+
+    Each slot of the table is laid out as: sequence number, checksum, hash of the string, length of the string, length
+    of the result, string & result encoded with the ParseResultCodec. The table is never resized and slots are never
+    freed: when the slots probed for a string are all taken the result is simply not cached.
+
+    Reads take no lock: a reader checks that the sequence number of a slot is even (no write in progress) and
+    unchanged after reading, and that the checksum matches, so a slot being written is read as a miss.
+    Writes follow a simple protocol: the writer makes the sequence number odd, writes the slot and makes it even again.
+    Two processes writing the same slot at the same time at worst leave it with a bad checksum, which is also read as
+    a miss.
+
+    NOTE: shared memory requires python 3.8, it is imported when a cache is created or attached.
+    """
+
+    MAGIC = b"RDGC"
+    HEADER = struct.Struct("<4sBII32s")
+    SLOT_HEADER = struct.Struct("<IIQHH")
+    SEQUENCE = struct.Struct("<I")
+    MAX_PROBES = 8
+
+    def __init__(self, shared_memory: "SharedMemory"):
+        self.shared_memory = shared_memory
+        self.buffer = shared_memory.buf
+
+        magic, version, self.capacity, self.slot_size, asset_class = self.HEADER.unpack_from(self.buffer, 0)
+        if magic != self.MAGIC:
+            raise ValueError(f"Shared memory {shared_memory.name} does not hold a parse cache.")
+        if version != CODEC_VERSION:
+            raise ValueError(f"Shared memory {shared_memory.name} holds results encoded with version {version}.")
+
+        self.asset_class = asset_class.rstrip(b"\0").decode()
+        self.codec = ParseResultCodec(self.asset_class)
+
+        # statistics of the current process
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def create(
+        cls, asset_class: str, capacity: int = 1 << 16, *, slot_size: int = 192, name: Optional[str] = None
+    ) -> "SharedMemoryParseCache":
+        """
+
+        Args:
+            asset_class: the asset class of the results cached
+            capacity: the number of slots of the table
+            slot_size: the size in bytes of a slot. Results larger than the slot are not cached.
+            name: the name of the shared memory block, generated if not specified
+
+        Returns: a new, empty cache. The caller owns the shared memory and must unlink it when done.
+
+        """
+        from multiprocessing.shared_memory import SharedMemory
+
+        shared_memory = SharedMemory(name=name, create=True, size=cls.HEADER.size + capacity * slot_size)
+        shared_memory.buf[: shared_memory.size] = bytes(shared_memory.size)
+        cls.HEADER.pack_into(
+            shared_memory.buf, 0, cls.MAGIC, CODEC_VERSION, capacity, slot_size, asset_class.encode()
+        )
+        return cls(shared_memory)
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedMemoryParseCache":
+        """
+
+        Args:
+            name: the name of the shared memory of a cache created by another process
+
+        Returns: the cache
+
+        """
+        from multiprocessing.shared_memory import SharedMemory
+
+        # NOTE: from python 3.13 the resource tracker can be told not to destroy the shared memory when the attached
+        # process exits
+        kwargs = {"track": False} if sys.version_info >= (3, 13) else {}
+        return cls(SharedMemory(name=name, **kwargs))
+
+    @property
+    def name(self) -> str:
+        return self.shared_memory.name
+
+    def __reduce__(self):
+        # processes receiving the cache attach to the same shared memory
+        return type(self).attach, (self.name,)
+
+    def get_many(self, strings: Iterable[str]) -> Dict[str, ParseResult]:
+        """
+
+        Args:
+            strings: the strings to look up
+
+        Returns: the cached results of the strings found in the cache as {string: (product_type, attributes_dict)}
+
+        """
+        results = {}
+        for string in strings:
+            value = self._get(string.encode())
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                results[string] = self.codec.decode(value)
+        return results
+
+    def put_many(self, results: Iterable[Tuple[str, ParseResult]]) -> None:
+        """
+
+        Args:
+            results: the results to cache as (string, (product_type, attributes_dict))
+
+        """
+        for string, result in results:
+            self._put(string.encode(), self.codec.encode(result))
+
+    def close(self) -> None:
+        self.buffer = None
+        self.shared_memory.close()
+
+    def unlink(self) -> None:
+        self.shared_memory.unlink()
+
+    def _iter_slots(self, key: bytes) -> Iterable[Tuple[int, int]]:
+        hash_ = int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+        for probe in range(min(self.MAX_PROBES, self.capacity)):
+            yield hash_, self.HEADER.size + ((hash_ + probe) % self.capacity) * self.slot_size
+
+    def _get(self, key: bytes) -> Optional[bytes]:
+        buffer = self.buffer
+        for hash_, offset in self._iter_slots(key):
+            sequence, checksum, slot_hash, key_length, value_length = self.SLOT_HEADER.unpack_from(buffer, offset)
+            if sequence == 0:
+                # an empty slot ends the chain of probes
+                return None
+            if sequence % 2 or slot_hash != hash_ or key_length != len(key):
+                continue
+
+            start = offset + self.SLOT_HEADER.size
+            payload = bytes(buffer[start : start + key_length + value_length])
+            if self.SEQUENCE.unpack_from(buffer, offset)[0] != sequence or zlib.crc32(payload) != checksum:
+                continue
+            if payload[:key_length] == key:
+                return payload[key_length:]
+        return None
+
+    def _put(self, key: bytes, value: bytes) -> bool:
+        if self.SLOT_HEADER.size + len(key) + len(value) > self.slot_size:
+            return False
+
+        buffer = self.buffer
+        for hash_, offset in self._iter_slots(key):
+            sequence, _, slot_hash, key_length, _ = self.SLOT_HEADER.unpack_from(buffer, offset)
+            if sequence != 0 and (slot_hash != hash_ or key_length != len(key)):
+                continue
+
+            # an odd sequence number flags the write in progress. A slot already odd (being written by another process,
+            # or left so by a writer that died) is not skipped but taken over and overwritten, its sequence number
+            # moving to the next odd value: if the other writer is still alive the slot is at worst left with a bad
+            # checksum, read as a miss.
+            writing = sequence + 1 if sequence % 2 == 0 else sequence + 2
+            if writing >= 0xFFFFFFFF:
+                writing = 1
+            self.SEQUENCE.pack_into(buffer, offset, writing)
+
+            payload = key + value
+            start = offset + self.SLOT_HEADER.size
+            buffer[start : start + len(payload)] = payload
+            self.SLOT_HEADER.pack_into(buffer, offset, writing, zlib.crc32(payload), hash_, len(key), len(value))
+
+            self.SEQUENCE.pack_into(buffer, offset, writing + 1)
+            return True
+        return False
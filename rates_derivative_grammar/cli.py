@@ -0,0 +1,394 @@
+import argparse
+from collections import Counter, defaultdict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import csv
+from datetime import date
+from enum import Enum
+from itertools import islice
+import json
+import math
+import os
+import re
+import sys
+import time
+from typing import Any, Callable, Dict, IO, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from .audit import GrammarAudit
+from .bulk import bulk_mode
+from .codec import get_enum_types
+from .coverage import CoverageCollector
+from .parsers import AssetClassParser, AssetClassFormatter
+from .utils import default_workers
+
+__all__ = ["main"]
+
+PARSE, NORMALIZE, FORMAT, AUDIT = "parse", "normalize", "format", "audit"
+JSONL, CSV = "jsonl", "csv"
+THREAD, PROCESS = "thread", "process"
+
+ISO_DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}")
+PERCENTILES = (50, 90, 99)
+
+# the columns written for each command in csv
+CSV_FIELDS = {
+    PARSE: ["line", "string", "product_type", "attributes", "error"],
+    NORMALIZE: ["line", "string", "product_type", "normalized", "error"],
+    FORMAT: ["line", "product_type", "string", "error"],
+}
+
+
+class Row(NamedTuple):
+    line_number: int
+    # the line read
+    string: str
+    product_type: Optional[str]
+    # the attributes parsed (parse) or the string formatted (normalize & format)
+    output: Any
+    error: Optional[str]
+    # the time taken to process the line in seconds
+    elapsed: float
+
+
+def to_json_value(value: Any) -> Any:
+    """
+    converts an attribute value to json: enums are written as "Enum.MEMBER" and dates in iso format
+    """
+    if isinstance(value, Enum):
+        return f"{type(value).__name__}.{value.name}"
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        return list(map(to_json_value, value))
+    return value
+
+
+def from_json_value(value: Any, enum_types: Dict[str, Any]) -> Any:
+    """
+    converts back a value written by to_json_value
+    """
+    if isinstance(value, list):
+        return [from_json_value(item, enum_types) for item in value]
+    if isinstance(value, str):
+        if ISO_DATE_PATTERN.fullmatch(value):
+            return date.fromisoformat(value)
+        type_name, _, member = value.partition(".")
+        if type_name in enum_types and member in enum_types[type_name].__members__:
+            return enum_types[type_name][member]
+    return value
+
+
+class Worker:
+    """
+    processes chunks of lines for a command. A worker is shared by the threads of the thread backend and instantiated
+    once per process by the process backend.
+    """
+
+    def __init__(
+        self,
+        command: str,
+        asset_class: str,
+        coverage: Optional[CoverageCollector] = None,
+        max_seconds: Optional[float] = None,
+    ):
+        self.command = command
+        self.parser: Optional[AssetClassParser] = None
+        if command in (PARSE, NORMALIZE):
+            self.parser = AssetClassParser(asset_class, coverage=coverage, max_seconds=max_seconds)
+        self.formatter: Optional[AssetClassFormatter] = (
+            AssetClassFormatter(asset_class) if command in (NORMALIZE, FORMAT) else None
+        )
+        self.enum_types = {enum.__name__: enum for enum in get_enum_types()}
+
+    def run(self, lines: Sequence[Tuple[int, str]]) -> List[Row]:
+        """
+
+        Args:
+            lines: the lines to process as (line_number, line)
+
+        Returns: a row for each line. Errors are returned as strings so that rows can be sent between processes.
+
+        """
+        rows = []
+        # the collector is tuned for the many short-lived objects created by parsing & formatting
+        with bulk_mode():
+            for line_number, string in lines:
+                start = time.perf_counter()
+                product_type = None
+                output: Any
+                try:
+                    if self.command == FORMAT:
+                        assert self.formatter is not None
+                        record = json.loads(string)
+                        product_type = record["product_type"]
+                        if "attributes" not in record:
+                            raise ValueError(f"No attributes to format: {record.get('error', '')}")
+                        attributes = {
+                            k: from_json_value(v, self.enum_types) for k, v in record["attributes"].items()
+                        }
+                        output = self.formatter.format(product_type, attributes)
+                    else:
+                        assert self.parser is not None
+                        product_type, output = self.parser.parse(string)
+                        if self.command == NORMALIZE:
+                            assert self.formatter is not None
+                            output = self.formatter.format(product_type, output)
+                    error = None
+                except Exception as e:
+                    # lark's errors span several lines: only their first line is kept
+                    message = str(e).strip().partition("\n")[0]
+                    output, error = None, f"{type(e).__name__}: {message}"
+                rows.append(Row(line_number, string, product_type, output, error, time.perf_counter() - start))
+        return rows
+
+
+_worker: Optional[Worker] = None
+
+
+def _init_process(command: str, asset_class: str, coverage: bool, max_seconds: Optional[float]) -> None:
+    global _worker
+    _worker = Worker(command, asset_class, CoverageCollector() if coverage else None, max_seconds)
+
+
+def _run_in_process(lines: Sequence[Tuple[int, str]]) -> Tuple[List[Row], Optional[Counter]]:
+    # the coverage collected by the process is sent back with the rows of each chunk
+    assert _worker is not None, "the process was not initialized"
+    coverage = _worker.parser.coverage if _worker.parser else None
+    rows = _worker.run(lines)
+    return rows, coverage.pop() if coverage else None
+
+
+def iter_rows(
+    lines: Iterable[str],
+    command: str,
+    asset_class: str,
+    *,
+    workers: int,
+    backend: str,
+    batch_size: int,
+    coverage: Optional[CoverageCollector] = None,
+    max_seconds: Optional[float] = None,
+) -> Iterator[Row]:
+    """
+    processes lines in batches, each batch being split in chunks processed in parallel, so that the input is streamed.
+    Empty lines are skipped.
+
+    Args:
+        coverage: a collector of the coverage of the grammar by the lines parsed, including the lines parsed in other
+        processes
+        max_seconds: the time budget of parsing a line, the lines over their budget are returned as errors
+
+    Returns: the rows in the order of the lines
+
+    """
+    numbered = ((i, line.rstrip("\r\n")) for i, line in enumerate(lines, 1))
+    numbered = ((i, line) for i, line in numbered if line.strip())
+
+    executor: Optional[Executor] = None
+    run: Callable[[Sequence[Tuple[int, str]]], Tuple[List[Row], Optional[Counter]]]
+    if workers > 1 and backend == PROCESS:
+        initargs = (command, asset_class, coverage is not None, max_seconds)
+        executor = ProcessPoolExecutor(workers, initializer=_init_process, initargs=initargs)
+        run = _run_in_process
+    else:
+        worker = Worker(command, asset_class, coverage, max_seconds)
+
+        def run_in_thread(chunk: Sequence[Tuple[int, str]]) -> Tuple[List[Row], Optional[Counter]]:
+            return worker.run(chunk), None
+
+        run = run_in_thread
+
+        if workers > 1:
+            executor = ThreadPoolExecutor(workers)
+
+    try:
+        while True:
+            batch = list(islice(numbered, batch_size))
+            if not batch:
+                return
+            if executor is None:
+                results: Iterable[Tuple[List[Row], Optional[Counter]]] = [run(batch)]
+            else:
+                chunk_size = -(-len(batch) // (workers * 4))
+                chunks = [batch[i : i + chunk_size] for i in range(0, len(batch), chunk_size)]
+                results = executor.map(run, chunks)
+            for rows, counts in results:
+                if counts and coverage is not None:
+                    coverage.merge(counts)
+                yield from rows
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def to_record(row: Row, command: str) -> Dict[str, Any]:
+    """
+    Returns: the row as written to the output
+    """
+    if command == PARSE:
+        record = {"line": row.line_number, "string": row.string, "product_type": row.product_type}
+        if row.error is None:
+            record["attributes"] = {k: to_json_value(v) for k, v in row.output.items()}
+    elif command == NORMALIZE:
+        record = {"line": row.line_number, "string": row.string, "product_type": row.product_type}
+        if row.error is None:
+            record["normalized"] = row.output
+    else:
+        record = {"line": row.line_number, "product_type": row.product_type}
+        if row.error is None:
+            record["string"] = row.output
+    if row.error is not None:
+        record["error"] = row.error
+    return record
+
+
+def percentile(values: Sequence[float], p: float) -> float:
+    """
+    Returns: the p-th percentile of the sorted values (nearest rank)
+    """
+    return values[max(math.ceil(p / 100 * len(values)) - 1, 0)]
+
+
+class Report:
+    """ collects the statistics of a run """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.rows = 0
+        self.errors: Counter = Counter()
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+
+    def add(self, row: Row) -> None:
+        self.rows += 1
+        if row.error is not None:
+            self.errors[row.error.partition(":")[0]] += 1
+        elif row.product_type is not None:
+            self.latencies[row.product_type].append(row.elapsed)
+
+    def write(self, out: IO[str]) -> None:
+        elapsed = time.perf_counter() - self.start
+        rate = self.rows / elapsed if elapsed else 0.0
+        error_count = sum(self.errors.values())
+        print(f"{self.rows} rows in {elapsed:.2f}s ({rate:.0f} rows/s), {error_count} errors", file=out)
+        for error, count in self.errors.most_common():
+            print(f"  {error}: {count}", file=out)
+
+        header = " ".join(f"p{p:<7}" for p in PERCENTILES)
+        print(f"{'product_type':<28}{'rows':>8}  {header}(ms)", file=out)
+        for product_type, latencies in sorted(self.latencies.items()):
+            latencies.sort()
+            values = " ".join(f"{percentile(latencies, p) * 1000:<8.2f}" for p in PERCENTILES)
+            print(f"{product_type:<28}{len(latencies):>8}  {values}", file=out)
+
+
+def make_argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="rdg", description="Parses, normalises and formats rates derivatives.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    descriptions = {
+        PARSE: "parses each line into its product type and attributes",
+        NORMALIZE: "parses each line and formats it back into its canonical string",
+        FORMAT: "formats json lines {product_type, attributes} (as written by parse) into strings",
+    }
+    for command, description in descriptions.items():
+        subparser = subparsers.add_parser(command, help=description, description=description)
+        subparser.add_argument("input", nargs="?", default="-", help="the file to read, defaults to stdin")
+        subparser.add_argument("-a", "--asset-class", default="linear_rate", help="the grammar of the products")
+        subparser.add_argument("-o", "--output", default="-", help="the file to write, defaults to stdout")
+        subparser.add_argument("-f", "--output-format", choices=[JSONL, CSV], default=JSONL)
+        subparser.add_argument(
+            "-w",
+            "--workers",
+            type=int,
+            help="the number of workers, defaults to the number of cpus (1 thread on builds with a GIL)",
+        )
+        subparser.add_argument(
+            "-b",
+            "--backend",
+            choices=[THREAD, PROCESS],
+            default=THREAD,
+            help="run the workers in threads (only parallel on free-threaded builds) or in processes",
+        )
+        subparser.add_argument("--batch-size", type=int, default=10_000, help="the number of lines read at once")
+        subparser.add_argument("-q", "--quiet", action="store_true", help="do not report statistics on stderr")
+        if command != FORMAT:
+            subparser.add_argument(
+                "--coverage", help="write the hits of the rules & terminals of the grammar parsed to this json file"
+            )
+            subparser.add_argument(
+                "--max-seconds", type=float, help="the time budget of parsing a line, the lines over it are errors"
+            )
+
+    description = "reports the terminal collisions, LALR conflicts and earley chart sizes of the grammar"
+    subparser = subparsers.add_parser(AUDIT, help=description, description=description)
+    subparser.add_argument("input", nargs="?", help="a corpus to measure the chart sizes on, one product per line")
+    subparser.add_argument("-a", "--asset-class", default="linear_rate", help="the grammar to audit")
+    return parser
+
+
+def audit(asset_class: str, corpus: Optional[str]) -> int:
+    strings: List[str] = []
+    if corpus:
+        with open(corpus, encoding="utf-8") as f:
+            strings = [line.strip() for line in f if line.strip()]
+    print(GrammarAudit(asset_class).report(strings))
+    return 0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    entry point of the rdg command
+
+    Returns: the exit status: 1 if any line could not be processed
+
+    """
+    args = make_argument_parser().parse_args(argv)
+    if args.command == AUDIT:
+        return audit(args.asset_class, args.input)
+
+    workers = args.workers
+    if workers is None:
+        workers = (os.cpu_count() or 1) if args.backend == PROCESS else default_workers()
+
+    input_file = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    output_file = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    report = Report()
+    coverage = CoverageCollector() if getattr(args, "coverage", None) else None
+    try:
+        if args.output_format == CSV:
+            writer = csv.DictWriter(output_file, CSV_FIELDS[args.command])
+            writer.writeheader()
+
+        rows = iter_rows(
+            input_file,
+            args.command,
+            args.asset_class,
+            workers=workers,
+            backend=args.backend,
+            batch_size=args.batch_size,
+            coverage=coverage,
+            max_seconds=getattr(args, "max_seconds", None),
+        )
+        for row in rows:
+            report.add(row)
+            record = to_record(row, args.command)
+            if args.output_format == CSV:
+                if "attributes" in record:
+                    record["attributes"] = json.dumps(record["attributes"])
+                writer.writerow(record)
+            else:
+                output_file.write(json.dumps(record) + "\n")
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+
+    if coverage is not None:
+        coverage.dump(args.coverage)
+    if not args.quiet:
+        report.write(sys.stderr)
+    return 1 if report.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
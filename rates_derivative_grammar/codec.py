@@ -0,0 +1,305 @@
+from datetime import date
+from enum import Enum
+from functools import lru_cache
+from operator import attrgetter
+import re
+import struct
+from typing import Any, Callable, Dict, Iterable, List, Tuple, Type, Union
+
+from .conversion import TokenConverterRegistry
+from .conversion._generic import EnumConverter, DictConverter
+from .custom_types import Tenor
+from .processing import processors_registry
+
+
+__all__ = ["ParseResultCodec", "CODEC_VERSION"]
+
+CODEC_VERSION = 2
+
+ParseResult = Tuple[str, Dict[str, Any]]
+Buffer = Union[bytes, bytearray, memoryview]
+
+# value tags
+FALSE, TRUE, FLOAT, INT, DATE, ENUM, TENOR, IMM, STRING, LIST, NONE, INTERNED, TUPLE = range(13)
+
+TENOR_UNITS = "DBWMY"
+IMM_MONTH_CODES = "FGHJKMNQUVXZ"
+TENOR_PATTERN = re.compile(r"(0|[1-9][0-9]*)(\.25|\.5|\.75)?([DBWMY])")
+IMM_PATTERN = re.compile(r"([FGHJKMNQUVXZ])([0-9])")
+
+U8 = struct.Struct("<B")
+U16 = struct.Struct("<H")
+U32 = struct.Struct("<I")
+I64 = struct.Struct("<q")
+F64 = struct.Struct("<d")
+ENUM_MEMBER = struct.Struct("<BB")
+HEADER = struct.Struct("<BI")
+RECORD_HEADER = struct.Struct("<BH")
+
+
+def get_enum_types() -> List[Type[Enum]]:
+    """
+    Returns: the enums the converters registered convert tokens to, sorted by name
+    """
+    enums = set()
+    for converter in TokenConverterRegistry._registry.values():
+        if issubclass(converter, EnumConverter):
+            enums.add(converter.enum)
+        elif issubclass(converter, DictConverter):
+            enums.update(type(value) for value in converter.mapping.values() if isinstance(value, Enum))
+    return sorted(enums, key=attrgetter("__name__"))
+
+
+@lru_cache(maxsize=4096)
+def _encode_string(value: str) -> bytes:
+    match = TENOR_PATTERN.fullmatch(value)
+    if match:
+        count, quarter, unit = match.groups()
+        quarters = int(count) * 4 + {None: 0, ".25": 1, ".5": 2, ".75": 3}[quarter]
+        if quarters < 1 << 13:
+            return U8.pack(TENOR) + U16.pack(quarters << 3 | TENOR_UNITS.index(unit))
+
+    match = IMM_PATTERN.fullmatch(value)
+    if match:
+        month_code, digit = match.groups()
+        return U8.pack(IMM) + U8.pack(IMM_MONTH_CODES.index(month_code) * 10 + int(digit))
+
+    encoded = value.encode()
+    return U8.pack(STRING) + U16.pack(len(encoded)) + encoded
+
+
+@lru_cache(maxsize=None)
+def _decode_tenor(packed: int) -> str:
+    quarters, unit = packed >> 3, TENOR_UNITS[packed & 7]
+    count = quarters // 4 if quarters % 4 == 0 else quarters / 4
+    return f"{count}{unit}"
+
+
+@lru_cache(maxsize=None)
+def _decode_imm(packed: int) -> str:
+    month_code, digit = divmod(packed, 10)
+    return f"{IMM_MONTH_CODES[month_code]}{digit}"
+
+
+class ParseResultCodec:
+    """
+    encodes parse results (product_type, attributes_dict) of an asset class into a compact binary format, used to move
+    results between processes and into caches.
+
+    A record is made of the index of the product type (1 byte), a bitmap of the attributes present in the order of the
+    attribute_names of the product's processor (2 bytes), followed by the value of each attribute present. Each value
+    is a tag (1 byte) followed by:
+     - enums: the index of the enum type and the value of the member (1 byte each)
+     - dates: the day ordinal (4 bytes)
+     - floats: a double (8 bytes)
+     - tenors (f.ex. 10Y, 4.25Y): the count in quarters and the unit packed in 2 bytes
+     - imm codes (f.ex. H0): the month code and the year digit packed in 1 byte
+     - lists & tuples: their length (1 byte) followed by their values
+    Strings that are neither tenors nor imm codes, as well as integers, are stored as is. Interned tenors (see
+    AssetClassParser's intern_tenors) are tagged so that they are decoded as Tenor values rather than plain strings.
+
+    Buffers encoded by encode_many start with the version of the codec so that a change of format is detected.
+    """
+
+    def __init__(self, asset_class: str):
+        self.asset_class = asset_class
+
+        processors = sorted(
+            (processor for processor in processors_registry.values() if processor.grammar == asset_class),
+            key=attrgetter("product_type"),
+        )
+        if not processors:
+            raise ValueError(f"No product registered for asset class: {asset_class}.")
+
+        self.product_types = [processor.product_type for processor in processors]
+        self.product_indices = {product_type: i for i, product_type in enumerate(self.product_types)}
+        self.attribute_names = [processor.attribute_names for processor in processors]
+        self.attribute_sets = [frozenset(attribute_names) for attribute_names in self.attribute_names]
+        if max(map(len, self.attribute_names)) > 16:
+            raise ValueError("The codec can only encode products with up to 16 attributes.")
+
+        self.enum_types = get_enum_types()
+        self.enum_indices = {enum: i for i, enum in enumerate(self.enum_types)}
+
+        # decoders of values indexed by tag
+        self._decoders: List[Callable[[memoryview, int], Tuple[Any, int]]] = [
+            lambda buffer, offset: (False, offset),
+            lambda buffer, offset: (True, offset),
+            lambda buffer, offset: (F64.unpack_from(buffer, offset)[0], offset + F64.size),
+            lambda buffer, offset: (I64.unpack_from(buffer, offset)[0], offset + I64.size),
+            lambda buffer, offset: (date.fromordinal(U32.unpack_from(buffer, offset)[0]), offset + U32.size),
+            self._decode_enum,
+            lambda buffer, offset: (_decode_tenor(U16.unpack_from(buffer, offset)[0]), offset + U16.size),
+            lambda buffer, offset: (_decode_imm(buffer[offset]), offset + 1),
+            self._decode_str,
+            self._decode_list,
+            lambda buffer, offset: (None, offset),
+            self._decode_interned,
+            self._decode_tuple,
+        ]
+
+    def encode(self, result: ParseResult) -> bytes:
+        """
+
+        Args:
+            result: the result to encode as (product_type, attributes_dict)
+
+        Returns: the encoded result, prefixed with the version of the codec
+
+        """
+        out = bytearray(U8.pack(CODEC_VERSION))
+        self._encode_record(result, out)
+        return bytes(out)
+
+    def decode(self, buffer: Buffer) -> ParseResult:
+        """
+
+        Args:
+            buffer: a result encoded by encode
+
+        Returns: the result as (product_type, attributes_dict)
+
+        """
+        buffer = memoryview(buffer)
+        self._check_version(U8.unpack_from(buffer, 0)[0])
+        return self._decode_record(buffer, U8.size)[0]
+
+    def encode_many(self, results: Iterable[ParseResult]) -> bytearray:
+        """
+
+        Args:
+            results: the results to encode as (product_type, attributes_dict)
+
+        Returns: the results encoded back to back, prefixed with the version of the codec & the number of results
+
+        """
+        out = bytearray(HEADER.size)
+        count = 0
+        for result in results:
+            self._encode_record(result, out)
+            count += 1
+        HEADER.pack_into(out, 0, CODEC_VERSION, count)
+        return out
+
+    def decode_many(self, buffer: Buffer) -> List[ParseResult]:
+        """
+
+        Args:
+            buffer: results encoded by encode_many. The buffer is read in place.
+
+        Returns: the results as (product_type, attributes_dict)
+
+        """
+        buffer = memoryview(buffer)
+        version, count = HEADER.unpack_from(buffer, 0)
+        self._check_version(version)
+
+        results, offset = [], HEADER.size
+        for _ in range(count):
+            result, offset = self._decode_record(buffer, offset)
+            results.append(result)
+        return results
+
+    @staticmethod
+    def _check_version(version: int) -> None:
+        if version != CODEC_VERSION:
+            raise ValueError(f"Cannot decode version {version} of the codec: current version is {CODEC_VERSION}.")
+
+    def _encode_record(self, result: ParseResult, out: bytearray) -> None:
+        product_type, attributes_dict = result
+        index = self.product_indices[product_type]
+        attribute_names = self.attribute_names[index]
+
+        if not self.attribute_sets[index].issuperset(attributes_dict):
+            unknown = attributes_dict.keys() - self.attribute_sets[index]
+            raise ValueError(f"Unknown attributes for product type {product_type}: {sorted(unknown)}.")
+
+        bitmap = 0
+        for i, name in enumerate(attribute_names):
+            if name in attributes_dict:
+                bitmap |= 1 << i
+        out += RECORD_HEADER.pack(index, bitmap)
+
+        # NOTE: the attributes are written in the order of attribute_names, so the decoded dict may list its keys in
+        # a different order than the dict encoded (it still compares equal)
+        for name in attribute_names:
+            if name in attributes_dict:
+                self._encode_value(attributes_dict[name], out)
+
+    def _encode_value(self, value: Any, out: bytearray) -> None:
+        if type(value) is str:
+            out += _encode_string(value)
+        elif value is True:
+            out.append(TRUE)
+        elif value is False:
+            out.append(FALSE)
+        elif value is None:
+            out.append(NONE)
+        elif isinstance(value, float):
+            out.append(FLOAT)
+            out += F64.pack(value)
+        elif isinstance(value, int):
+            out.append(INT)
+            out += I64.pack(value)
+        elif isinstance(value, date):
+            out.append(DATE)
+            out += U32.pack(value.toordinal())
+        elif isinstance(value, Enum):
+            out.append(ENUM)
+            out += ENUM_MEMBER.pack(self.enum_indices[type(value)], value.value)
+        elif isinstance(value, Tenor):
+            out.append(INTERNED)
+            out += _encode_string(value)
+        elif isinstance(value, str):
+            out += _encode_string(value)
+        elif isinstance(value, (list, tuple)):
+            out.append(TUPLE if isinstance(value, tuple) else LIST)
+            out += U8.pack(len(value))
+            for item in value:
+                self._encode_value(item, out)
+        else:
+            raise TypeError(f"Cannot encode {value!r}.")
+
+    def _decode_record(self, buffer: memoryview, offset: int) -> Tuple[ParseResult, int]:
+        index, bitmap = RECORD_HEADER.unpack_from(buffer, offset)
+        offset += RECORD_HEADER.size
+
+        attributes_dict = {}
+        for i, name in enumerate(self.attribute_names[index]):
+            if bitmap >> i & 1:
+                attributes_dict[name], offset = self._decode_value(buffer, offset)
+        return (self.product_types[index], attributes_dict), offset
+
+    def _decode_value(self, buffer: memoryview, offset: int) -> Tuple[Any, int]:
+        try:
+            decoder = self._decoders[buffer[offset]]
+        except IndexError:
+            raise ValueError(f"Unknown tag {buffer[offset]} at offset {offset}.")
+        return decoder(buffer, offset + 1)
+
+    def _decode_enum(self, buffer: memoryview, offset: int) -> Tuple[Enum, int]:
+        enum_index, value = ENUM_MEMBER.unpack_from(buffer, offset)
+        return self.enum_types[enum_index](value), offset + ENUM_MEMBER.size
+
+    @staticmethod
+    def _decode_str(buffer: memoryview, offset: int) -> Tuple[str, int]:
+        length = U16.unpack_from(buffer, offset)[0]
+        offset += U16.size
+        return str(buffer[offset : offset + length], "utf-8"), offset + length
+
+    def _decode_list(self, buffer: memoryview, offset: int) -> Tuple[List[Any], int]:
+        values = []
+        length = buffer[offset]
+        offset += 1
+        for _ in range(length):
+            value, offset = self._decode_value(buffer, offset)
+            values.append(value)
+        return values, offset
+
+    def _decode_tuple(self, buffer: memoryview, offset: int) -> Tuple[Tuple[Any, ...], int]:
+        values, offset = self._decode_list(buffer, offset)
+        return tuple(values), offset
+
+    def _decode_interned(self, buffer: memoryview, offset: int) -> Tuple[Tenor, int]:
+        value, offset = self._decode_value(buffer, offset)
+        return Tenor(value), offset
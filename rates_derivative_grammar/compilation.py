@@ -0,0 +1,73 @@
+from functools import lru_cache
+import re
+from typing import Iterable, List, NamedTuple, Pattern, Sequence
+
+from lark.common import ParserConf
+from lark.grammar import Rule
+from lark.lexer import TerminalDef
+from lark.load_grammar import import_grammar
+from lark.parsers import earley
+from lark.reconstruct import Reconstructor, WriteTokensTransformer, best_from_group
+
+from .utils import imported_grammars
+
+__all__ = ["CompiledGrammar", "GrammarReconstructor", "compile_grammar", "compile_pattern"]
+
+
+class CompiledGrammar(NamedTuple):
+    """ the terminals & rules of a grammar file compiled by lark """
+
+    terminals: List[TerminalDef]
+    rules: List[Rule]
+
+
+def compile_grammar(grammar_path: str, file_name: str, start: Sequence[str] = ("start",)) -> CompiledGrammar:
+    """
+    compiles a grammar file of a grammar folder against the modules of the folder already loaded.
+
+    The file is imported through the memo of the grammars imported from the folder (see imported_grammars), which the
+    parsers of the folder fill as well: the file & the common modules it imports are only read and parsed once for all
+    the parsers & formatters of the folder, and only the rules used from the start rules are compiled. Unlike
+    Lark.open, no earley parser is built for the grammar.
+
+    Args:
+        grammar_path: the folder containing the grammar files
+        file_name: the name of the grammar file in the folder (f.ex. linear_rate__fra.lark)
+        start: the start rules of the grammar
+
+    Returns: the terminals & the rules of the grammar
+
+    """
+    with imported_grammars(grammar_path):
+        grammar = import_grammar(file_name, base_paths=[grammar_path])
+        terminals, rules, _ = grammar.compile(list(start))
+    return CompiledGrammar(terminals, rules)
+
+
+@lru_cache(maxsize=None)
+def compile_pattern(regexp: str) -> Pattern:
+    """
+    Returns: the regexp compiled, shared by the terminals of all the grammars with the same pattern (f.ex. the
+    terminals of the common modules imported by every product)
+    """
+    return re.compile(regexp)
+
+
+class GrammarReconstructor(Reconstructor):
+    """
+    lark's reconstructor made from a compiled grammar, instead of compiling the grammar of a parser again
+    """
+
+    def __init__(self, grammar: CompiledGrammar, start: Iterable[str] = ("start",)):
+        # NOTE: same as Reconstructor.__init__
+        start = list(start)
+        self.write_tokens = WriteTokensTransformer({t.name: t for t in grammar.terminals}, {})
+        self.rules = list(self._build_recons_rules(grammar.rules))
+        self.rules.reverse()
+
+        # the best rule from each group of {rule => [rule.alias]}, since only one derivation is needed
+        self.rules = best_from_group(self.rules, lambda r: r, lambda r: -len(r.expansion))
+
+        self.rules.sort(key=lambda r: len(r.expansion))
+        callbacks = {rule: rule.alias for rule in self.rules}
+        self.parser = earley.Parser(ParserConf(self.rules, callbacks, start), self._match, resolve_ambiguity=True)
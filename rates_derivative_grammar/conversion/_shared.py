@@ -1,5 +1,7 @@
 from datetime import datetime, date
-from typing import ClassVar
+from functools import lru_cache
+import re
+from typing import ClassVar, Dict, Iterable, List
 
 from bidict import bidict
 from lark import Token
@@ -35,7 +37,7 @@ class DateConverter(TokenConverter[date]):
     @classmethod
     def from_token(cls, token: Token) -> date:
         try:
-            return datetime.strptime(token, cls.format).date()
+            return _parse_date(str(token))
         except Exception as e:
             raise TokenConversionError(str(e))
 
@@ -43,7 +45,62 @@ class DateConverter(TokenConverter[date]):
     def to_token(cls, name: str, obj: date) -> Token:
         if not isinstance(obj, date):
             raise TokenConversionError(f"{cls.__qualname__} can only format dates.")
-        return Token(name, obj.strftime(cls.format).upper().lstrip("0"))
+        return Token(name, _format_date(obj))
+
+    @classmethod
+    def from_tokens(cls, tokens: Iterable[str]) -> List[date]:
+        """
+        converts a column of tokens: each distinct token is only converted once
+        """
+        dates: Dict[str, date] = {}
+        results = []
+        for token in tokens:
+            try:
+                results.append(dates[token])
+            except KeyError:
+                dates[token] = cls.from_token(token)
+                results.append(dates[token])
+        return results
+
+    @classmethod
+    def to_tokens(cls, name: str, objs: Iterable[date]) -> List[Token]:
+        """
+        converts a column of dates: each distinct date is only converted once
+        """
+        tokens: Dict[date, Token] = {}
+        results = []
+        for obj in objs:
+            try:
+                results.append(tokens[obj])
+            except KeyError:
+                tokens[obj] = cls.to_token(name, obj)
+                results.append(tokens[obj])
+        return results
+
+
+# NOTE: the grammar's DATE terminal is fixed (DAY UPPER_MONTH SHORT_YEAR) so dates are converted with a table of months
+# instead of strptime/strftime, which are slow and depend on the locale. Tokens that do not match the terminal are
+# still converted by strptime so that the conversion of any token is unchanged.
+MONTHS = ("JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC")
+MONTH_NUMBERS = {month: i for i, month in enumerate(MONTHS, 1)}
+DATE_PATTERN = re.compile(r"(3[01]|[12][0-9]|0[1-9]|[1-9])([A-Za-z]{3})([0-9]{2})")
+
+
+@lru_cache(maxsize=4096)
+def _parse_date(token: str) -> date:
+    match = DATE_PATTERN.fullmatch(token)
+    month = match and MONTH_NUMBERS.get(match.group(2).upper())
+    if not month:
+        return datetime.strptime(token, DateConverter.format).date()
+
+    # two-digit years follow the POSIX convention of strptime: 69-99 are 1969-1999, 00-68 are 2000-2068
+    year = int(match.group(3))
+    return date(year + (1900 if year >= 69 else 2000), month, int(match.group(1)))
+
+
+@lru_cache(maxsize=4096)
+def _format_date(obj: date) -> str:
+    return f"{obj.day}{MONTHS[obj.month - 1]}{obj.year % 100:02d}"
 
 
 class TenorIntConverter(TokenConverter[str]):
@@ -0,0 +1,232 @@
+from datetime import date, timedelta
+from itertools import accumulate, islice
+from random import Random
+from typing import Any, Callable, Dict, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Union
+
+from lark import Token
+from lark.grammar import NonTerminal, Rule
+
+from .conversion import DateConverter
+from .grammar_analysis import Grammar
+from .parsers import AssetClassParser
+from .utils import Node, iter_regexp_examples, to_path_root
+
+
+__all__ = ["CorpusGenerator", "Sample", "DEFAULT_VALUES"]
+
+# the values of a terminal: a list of values drawn uniformly, a dict of values to their weight, or a function drawing a
+# value with the random generator passed
+Values = Union[Sequence[str], Mapping[str, float], Callable[[Random], str]]
+
+# the number of examples of its pattern drawn from for a terminal without values
+EXAMPLES = 100
+
+
+def _random_date(rng: Random) -> str:
+    return DateConverter.to_token("DATE", date(2019, 1, 1) + timedelta(days=rng.randrange(6000)))
+
+
+def _random_strike(rng: Random) -> str:
+    return f"{rng.uniform(-0.5, 4.0):.{rng.choice((1, 2, 3))}f}"
+
+
+def _random_basis_points(rng: Random) -> str:
+    return str(rng.choice((-50, -25, -10, 0, 5, 10, 25, 50, 100)))
+
+
+# the values of the terminals, by name in the grammar files, weighted as on a typical blotter. The terminals not listed
+# are drawn from the first examples of their pattern.
+DEFAULT_VALUES: Dict[str, Values] = {
+    "CURRENCY": {"EUR": 35, "USD": 35, "GBP": 10, "JPY": 5, "CHF": 5, "SEK": 4, "DKK": 3, "NOK": 3},
+    "FLOAT_TENOR": {"1Y": 8, "2Y": 12, "3Y": 6, "5Y": 15, "7Y": 5, "10Y": 20, "15Y": 4, "20Y": 5, "30Y": 8, "6M": 3},
+    "YEAR_INT": {"1": 6, "2": 10, "3": 6, "5": 15, "7": 6, "10": 20, "15": 5, "20": 6, "30": 10},
+    "MONTH_INT": {"1": 5, "3": 15, "6": 20, "9": 10, "12": 15, "15": 5, "18": 5, "24": 5},
+    "NOTIONAL_NUMBER": {"1": 10, "5": 10, "10": 20, "25": 15, "50": 15, "100": 20, "250": 5, "12.5": 5},
+    "DATE": _random_date,
+    "STRIKE_PCT": _random_strike,
+    "STRIKE_BP": _random_basis_points,
+    "FULL_STRIKE_BP": _random_basis_points,
+}
+
+
+class Sample(NamedTuple):
+    string: str
+    # the type & attributes of the product the string was derived from, None when not computed (see expected)
+    product_type: str
+    attributes_dict: Optional[Dict[str, Any]]
+
+
+class CorpusGenerator:
+    """
+    generates a synthetic corpus of valid strings by random derivation over the rules of the grammar of an asset
+    class, along with the product type & attributes each string was derived from.
+
+    Each string is derived from the start of a product down to its terminals:
+     - the alternatives of a rule (f.ex. the expansions of its optional groups [" " strike]) are drawn with the weight
+     optional_weight ** k * (1 - optional_weight) ** (n - k), where k is the number of symbols the alternative has
+     beyond the shortest one and n the difference between the longest and the shortest ones: each optional symbol is
+     kept with probability optional_weight.
+     - terminals are drawn from their values (see DEFAULT_VALUES)
+    The attributes expected are computed by running the tree derived through the same transformations as parse.
+
+    The corpus is infinite and lazy, and it is deterministic: iterating over the generator again yields the same
+    samples. When the attributes are computed, the samples whose tree is rejected by the processor of their product are
+    drawn again, as are the ambiguous strings the parser resolves to another product or other attributes than the ones
+    they were derived from (f.ex. "USD 3X9I 2.0" derived with a strike of 0.02 is parsed with a size of 2): the samples
+    are then an oracle of parse. The strings generated without the attributes may include such ambiguous strings.
+    """
+
+    def __init__(
+        self,
+        asset_class: str,
+        *,
+        grammar_path: Optional[str] = None,
+        seed: int = 0,
+        products: Optional[Mapping[str, float]] = None,
+        values: Optional[Mapping[str, Values]] = None,
+        optional_weight: float = 0.5,
+        optional_weights: Optional[Mapping[str, float]] = None,
+        duplicates: float = 0.0,
+        skew: float = 1.0,
+        pool_size: int = 100_000,
+        expected: bool = True,
+    ):
+        """
+
+        Args:
+            asset_class: the asset class of the products to generate
+            grammar_path: the folder containing the grammar files
+            seed: the seed of the random generator
+            products: the weight of each product type generated, defaults to the same weight for all products
+            values: the values of the terminals by terminal name, in addition to (or in place of) DEFAULT_VALUES
+            optional_weight: the probability of each optional symbol to be generated
+            optional_weights: the optional_weight of some rules, by rule name (f.ex. {"schedule": 0.1})
+            duplicates: the share of the samples repeating a sample generated before, as products traded several
+            times do on a blotter
+            skew: the skew of the samples repeated: 1 repeats samples uniformly, larger values concentrate repeats on a
+            few popular samples
+            pool_size: the number of distinct samples kept to be repeated
+            expected: if False, the attributes of the samples are not computed (which is faster)
+
+        """
+        self.asset_class = asset_class
+        self.seed = seed
+        self.duplicates = duplicates
+        self.skew = skew
+        self.pool_size = pool_size
+        self.expected = expected
+
+        self.parser = AssetClassParser(asset_class, grammar_path=grammar_path)
+        lark = self.parser.parser
+        self._callbacks = lark.parser.parser.callbacks
+        grammar = Grammar(lark.rules)
+
+        all_products = [rule.expansion[0].name for rule in grammar.rules_by_origin[NonTerminal("start")]]
+        weights = dict.fromkeys(all_products, 1.0) if products is None else dict(products)
+        unknown = set(weights) - set(all_products)
+        if unknown:
+            raise ValueError(f"Unknown product types for {asset_class}: {', '.join(sorted(unknown))}.")
+        self.products = list(weights)
+        self._product_weights = list(accumulate(weights.values()))
+
+        optional_weights = optional_weights or {}
+        self._alternatives = {
+            origin: self._weigh(rules, optional_weights.get(to_path_root(origin.name), optional_weight))
+            for origin, rules in grammar.rules_by_origin.items()
+        }
+
+        values = {**DEFAULT_VALUES, **(values or {})}
+        self._samplers = {
+            definition.name: self._make_sampler(
+                values.get(to_path_root(definition.name)), definition.pattern.to_regexp()
+            )
+            for definition in lark.terminals
+        }
+
+    def __iter__(self) -> Iterator[Sample]:
+        rng = Random(self.seed)
+        pool: List[Sample] = []
+        while True:
+            if pool and rng.random() < self.duplicates:
+                yield pool[int(len(pool) * rng.random() ** self.skew)]
+                continue
+
+            sample = self._sample(rng)
+            if self.duplicates:
+                if len(pool) < self.pool_size:
+                    pool.append(sample)
+                else:
+                    pool[rng.randrange(self.pool_size)] = sample
+            yield sample
+
+    def generate(self, count: int) -> Iterator[Sample]:
+        """
+        Returns: the first count samples of the corpus
+        """
+        return islice(self, count)
+
+    def strings(self, count: int) -> Iterator[str]:
+        """
+        Returns: the strings of the first count samples of the corpus
+        """
+        return (sample.string for sample in self.generate(count))
+
+    def _sample(self, rng: Random) -> Sample:
+        while True:
+            product_type = rng.choices(self.products, cum_weights=self._product_weights)[0]
+            parts: List[str] = []
+            tree = self._derive(rng, NonTerminal(product_type), parts)
+            if not self.expected:
+                return Sample("".join(parts), product_type, None)
+
+            string = "".join(parts)
+            transformer, visitor = self.parser._make_pipeline(product_type)
+            try:
+                attributes_dict = visitor(transformer.transform(tree))
+                parsed = self.parser.parse(string)
+            except Exception:
+                # the tree is valid for the grammar but not for the processor of the product
+                continue
+            if parsed != (product_type, attributes_dict):
+                # the string is ambiguous and the parser resolves it to another derivation
+                continue
+            return Sample(string, product_type, attributes_dict)
+
+    def _derive(self, rng: Random, symbol: NonTerminal, parts: List[str]) -> Node:
+        rules, cum_weights = self._alternatives[symbol]
+        rule = rules[0] if len(rules) == 1 else rng.choices(rules, cum_weights=cum_weights)[0]
+
+        children = []
+        for child in rule.expansion:
+            if child.is_term:
+                value = self._samplers[child.name](rng)
+                parts.append(value)
+                children.append(Token(child.name, value))
+            else:
+                children.append(self._derive(rng, child, parts))
+        # NOTE: the callbacks of the parser build the tree as parsing does (f.ex. filtering anonymous tokens out and
+        # inlining the children of inline rules)
+        return self._callbacks[rule](children)
+
+    @staticmethod
+    def _weigh(rules: List[Rule], optional_weight: float):
+        lengths = [sum(1 for symbol in rule.expansion if not getattr(symbol, "filter_out", False)) for rule in rules]
+        shortest, longest = min(lengths), max(lengths)
+        weights = [
+            optional_weight ** (length - shortest) * (1 - optional_weight) ** (longest - length) for length in lengths
+        ]
+        if not any(weights):
+            weights = [1.0] * len(rules)
+        return rules, list(accumulate(weights))
+
+    @staticmethod
+    def _make_sampler(values: Optional[Values], pattern: str) -> Callable[[Random], str]:
+        if callable(values):
+            return values
+        if values is None:
+            values = list(islice(iter_regexp_examples(pattern), EXAMPLES))
+        if isinstance(values, Mapping):
+            choices, cum_weights = list(values), list(accumulate(values.values()))
+            return lambda rng: rng.choices(choices, cum_weights=cum_weights)[0]
+        choices = list(values)
+        return lambda rng: choices[rng.randrange(len(choices))]
@@ -0,0 +1,171 @@
+from collections import Counter, defaultdict
+import json
+from threading import Lock
+from typing import Dict, List, Mapping, Tuple
+
+from lark import Tree
+
+from .utils import PATH_DELIMITER, to_name
+
+
+__all__ = ["CoverageCollector", "CoverageKey"]
+
+# the key counted for a hit: (product_type, node, alternative). The alternative of a rule is the names of the children
+# of its node separated by spaces (f.ex. "DATE" or "FLOAT_TENOR" for start_time), and is empty for terminals.
+CoverageKey = Tuple[str, str, str]
+
+
+class CoverageCollector:
+    """
+    counts the alternatives of the grammar rules and the terminals of the trees parsed, per product type. Pass it to an
+    AssetClassParser to collect the coverage of its parses (see AssetClassParser's coverage argument).
+
+    Rules are identified by their path from the product (f.ex. start_time or common__shared__size) and their
+    alternatives by the names of the children of their nodes. As the children of inline rules (f.ex. ?time) are
+    inlined in their parent, their alternatives are counted in the alternatives of their parent.
+    The product node itself is counted as a rule, so that the number of parses of a product is the number of hits
+    of its node.
+
+    Collectors are thread safe, and their counts are plain Counters so that the counts of collectors in other processes
+    can be sent back and merged (see pop & merge).
+    """
+
+    def __init__(self):
+        self.counts: Counter = Counter()
+        self._lock = Lock()
+        # the path from the product of each node name, by (product_type, name)
+        self._paths: Dict[Tuple[str, str], str] = {}
+
+    def record(self, product: Tree) -> None:
+        """
+        counts the rules & terminals of the tree of a product, before it is transformed
+
+        Args:
+            product: the tree of the product parsed (the child of the start node)
+
+        """
+        product_type = product.data
+        keys: List[CoverageKey] = []
+        to_visit = [product]
+        while to_visit:
+            node = to_visit.pop()
+            alternative = []
+            for child in node.children:
+                path = self._to_path(product_type, to_name(child))
+                alternative.append(path)
+                if isinstance(child, Tree):
+                    to_visit.append(child)
+                else:
+                    keys.append((product_type, path, ""))
+            keys.append((product_type, self._to_path(product_type, node.data), " ".join(alternative)))
+
+        with self._lock:
+            self.counts.update(keys)
+
+    def parses(self) -> Counter:
+        """
+        Returns: the number of parses of each product type
+        """
+        parses: Counter = Counter()
+        for (product_type, node, _), count in self.counts.items():
+            if node == product_type:
+                parses[product_type] += count
+        return parses
+
+    def merge(self, counts: Mapping[CoverageKey, int]) -> None:
+        """
+        adds counts to the collector (f.ex. the counts popped from the collector of a worker process)
+        """
+        with self._lock:
+            self.counts.update(counts)
+
+    def pop(self) -> Counter:
+        """
+        Returns: the counts collected so far, the counts of the collector being reset
+        """
+        with self._lock:
+            counts, self.counts = self.counts, Counter()
+        return counts
+
+    def hot_paths(self, share: float = 0.99) -> Dict[str, Dict[str, List[str]]]:
+        """
+        computes the subset of the grammar exercised by the bulk of the parses: the most hit alternatives of each rule
+        that together account for share of its hits. The rules and alternatives left out are candidates for pruning,
+        and the ones kept the ones to optimise.
+
+        Args:
+            share: the share of the hits of each rule covered by its alternatives kept
+
+        Returns: the alternatives kept as {product_type: {rule: alternatives}}, ranked by hits
+
+        """
+        alternatives: Dict[Tuple[str, str], Counter] = defaultdict(Counter)
+        for (product_type, node, alternative), count in self.counts.items():
+            if alternative:
+                alternatives[product_type, node][alternative] += count
+
+        hot: Dict[str, Dict[str, List[str]]] = defaultdict(dict)
+        for (product_type, rule), counts in sorted(alternatives.items()):
+            total, covered, kept = sum(counts.values()), 0, []
+            for alternative, count in counts.most_common():
+                if covered >= share * total:
+                    break
+                kept.append(alternative)
+                covered += count
+            hot[product_type][rule] = kept
+        return dict(hot)
+
+    def report(self) -> str:
+        """
+        Returns: the coverage as text: for each product (ranked by parses) the hits of its rules with the share of each
+        of their alternatives, then the hits of its terminals, ranked by hits
+        """
+        rules: Dict[str, Dict[str, Counter]] = defaultdict(lambda: defaultdict(Counter))
+        terminals: Dict[str, Counter] = defaultdict(Counter)
+        for (product_type, node, alternative), count in self.counts.items():
+            if alternative:
+                rules[product_type][node][alternative] += count
+            else:
+                terminals[product_type][node] += count
+
+        lines = []
+        for product_type, parses in self.parses().most_common():
+            lines.append(f"{product_type}: {parses} parses")
+            product_rules = rules[product_type]
+            for rule in sorted(product_rules, key=lambda r: -sum(product_rules[r].values())):
+                alternatives = product_rules[rule]
+                total = sum(alternatives.values())
+                lines.append(f"  {rule}: {total} hits")
+                for alternative, count in alternatives.most_common():
+                    lines.append(f"    {count / total:>7.1%}  {alternative}")
+            lines.append("  terminals:")
+            for terminal, count in terminals[product_type].most_common():
+                lines.append(f"    {count:>7}  {terminal}")
+        return "\n".join(lines)
+
+    def dump(self, path: str) -> None:
+        """
+        writes the counts to a json file
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump([[*key, count] for key, count in sorted(self.counts.items())], f)
+
+    @classmethod
+    def load(cls, path: str) -> "CoverageCollector":
+        """
+        Returns: a collector with the counts of a json file written by dump
+        """
+        collector = cls()
+        with open(path, encoding="utf-8") as f:
+            collector.merge({tuple(item[:3]): item[3] for item in json.load(f)})
+        return collector
+
+    def _to_path(self, product_type: str, name: str) -> str:
+        try:
+            return self._paths[product_type, name]
+        except KeyError:
+            pass
+        # f.ex. linear_rate__swap_curve__common__shared__size -> common__shared__size
+        prefix = f"{product_type}{PATH_DELIMITER}"
+        path = name.partition(prefix)[2] if prefix in name else name
+        return self._paths.setdefault((product_type, name), path)
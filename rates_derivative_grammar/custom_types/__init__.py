@@ -1 +1,2 @@
 from ._enums import *
+from ._tenor import *
@@ -0,0 +1,85 @@
+import re
+from typing import ClassVar, Dict, Optional, Union
+
+__all__ = ["Tenor"]
+
+TENOR_PATTERN = re.compile(r"([0-9]+(?:\.[0-9]+)?)([DBWMY])")
+IMM_PATTERN = re.compile(r"([FGHJKMNQUVXZ])([0-9])")
+IMM_MONTH_CODES = "FGHJKMNQUVXZ"
+
+# the number of months of the units that are a whole number of months
+MONTHS_BY_UNIT = {"M": 1, "Y": 12}
+
+
+class Tenor(str):
+    """
+    a tenor (f.ex. 10Y, 4.25Y, 6M, 1W) or an imm code (f.ex. U8).
+
+    Tenors are flyweights: there is a single instance of each distinct tenor, whatever the number of products holding
+    it. A tenor is a str so that it can be used wherever the string of the tenor is: it compares equal to & hashes as
+    its string. As a consequence 12M != 1Y: use months to compare or group tenors by duration.
+
+    Attributes:
+        unit: the unit of the tenor (D, B, W, M or Y), None for imm codes
+        quantity: the number of units of the tenor, None for imm codes
+        months: the duration of the tenor in months when the unit is a whole number of months (M or Y), else None
+        imm_month: the month of an imm code (1 to 12), None for tenors
+        imm_year: the last digit of the year of an imm code, None for tenors
+    """
+
+    # NOTE: the attributes must not shadow a method of str (f.ex. count)
+    unit: Optional[str]
+    quantity: Optional[Union[int, float]]
+    months: Optional[Union[int, float]]
+    imm_month: Optional[int]
+    imm_year: Optional[int]
+
+    _instances: ClassVar[Dict[str, "Tenor"]] = {}
+
+    def __new__(cls, value: str) -> "Tenor":
+        try:
+            return cls._instances[value]
+        except KeyError:
+            pass
+
+        self = super().__new__(cls, value)
+        attributes = dict(unit=None, quantity=None, months=None, imm_month=None, imm_year=None)
+
+        match = TENOR_PATTERN.fullmatch(value)
+        if match:
+            quantity, unit = match.groups()
+            quantity = float(quantity) if "." in quantity else int(quantity)
+            months = MONTHS_BY_UNIT.get(unit)
+            attributes.update(unit=unit, quantity=quantity, months=quantity * months if months else None)
+        else:
+            match = IMM_PATTERN.fullmatch(value)
+            if not match:
+                raise ValueError(f"Invalid tenor: {value}.")
+            month_code, year = match.groups()
+            attributes.update(imm_month=IMM_MONTH_CODES.index(month_code) + 1, imm_year=int(year))
+
+        for name, attribute in attributes.items():
+            object.__setattr__(self, name, attribute)
+
+        # NOTE: setdefault keeps a single instance when two threads create the same tenor concurrently
+        return cls._instances.setdefault(str(value), self)
+
+    @property
+    def is_imm(self) -> bool:
+        return self.imm_month is not None
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable.")
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({str(self)!r})"
+
+    def __reduce__(self):
+        # unpickled tenors are interned again
+        return type(self), (str(self),)
+
+    def __copy__(self) -> "Tenor":
+        return self
+
+    def __deepcopy__(self, memo) -> "Tenor":
+        return self
@@ -0,0 +1,88 @@
+from collections import OrderedDict
+import mmap
+from typing import Any, Dict, Iterator, NamedTuple, Optional, Tuple
+
+from .parsers import AssetClassParser
+
+
+__all__ = ["LineResult", "parse_file"]
+
+
+class LineResult(NamedTuple):
+    # the number of the line in the file, starting at 1
+    line_number: int
+    # the offset in bytes of the start of the line
+    start: int
+    # the offset in bytes of the start of the next line: parsing can resume from there
+    end: int
+    # the result of the parse as (product_type, attributes_dict) or None if parsing failed
+    result: Optional[Tuple[str, Dict[str, Any]]]
+    # the exception raised while parsing or decoding the line, if any
+    error: Optional[Exception]
+
+
+def parse_file(
+    parser: AssetClassParser,
+    path: str,
+    *,
+    offset: int = 0,
+    line_number: int = 1,
+    encoding: str = "utf-8",
+    memo_size: int = 4096,
+) -> Iterator[LineResult]:
+    """
+    parses a file of product descriptions, one per line, lazily
+
+    The file is memory-mapped and split into lines without being read into memory: a line is only decoded and parsed
+    when the generator reaches it, so memory stays flat whatever the size of the file. Lines are deduplicated by their
+    bytes: the results of the last memo_size distinct lines are reused instead of parsing them again (the result of
+    identical lines is then the same object). Lines are stripped of surrounding whitespace, and blank lines are skipped.
+
+    Args:
+        parser: the parser to parse the lines with
+        path: the path of the file
+        offset: the offset in bytes to start from (f.ex. the end of the last line processed before a crash)
+        line_number: the number of the line at offset
+        encoding: the encoding of the file
+        memo_size: the number of distinct lines whose result is memoized
+
+    Returns: the result of each line in order of the file
+
+    """
+    with open(path, "rb") as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files cannot be mapped
+            return
+
+    memo: "OrderedDict[bytes, Tuple[Any, Any]]" = OrderedDict()
+    with mapped:
+        size = len(mapped)
+        start = offset
+        while start < size:
+            end = mapped.find(b"\n", start)
+            end = size if end == -1 else end + 1
+
+            line = mapped[start:end].strip()
+            if line:
+                try:
+                    result, error = memo[line]
+                    memo.move_to_end(line)
+                except KeyError:
+                    result, error = _parse_line(parser, line, encoding)
+                    memo[line] = result, error
+                    if len(memo) > memo_size:
+                        memo.popitem(last=False)
+
+                yield LineResult(line_number, start, end, result, error)
+
+            start = end
+            line_number += 1
+
+
+def _parse_line(parser: AssetClassParser, line: bytes, encoding: str) -> Tuple[Any, Any]:
+    try:
+        return parser.parse(line.decode(encoding)), None
+    except Exception as e:
+        return None, e
@@ -0,0 +1,149 @@
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+
+__all__ = ["EquivalenceIndex", "DEFAULT_TOLERANCES"]
+
+ParseResult = Tuple[str, Dict[str, Any]]
+
+# the tolerance of the float attributes: sizes are in units of currency and strikes in fractions (1e-7 = 0.001bp)
+DEFAULT_TOLERANCES = {"size": 1.0, "strike": 1e-7}
+
+
+class _Ids(list):
+    """ the ids of the products sharing a key, when there are more than one """
+
+
+class EquivalenceIndex:
+    """
+    indexes parse results (product_type, attributes_dict) by a canonical key, so that the products describing the
+    same instrument are found in constant time whatever the string they were parsed from.
+
+    The key of a product is its type and its attributes sorted by name, where:
+     - the float attributes with a tolerance (see DEFAULT_TOLERANCES) are rounded to the nearest multiple of their
+     tolerance: two values are equivalent when they round to the same multiple. Unlike "within tolerance" this is an
+     equivalence relation, so values within tolerance of each other but on either side of a half-multiple do not match.
+     - lists are turned into tuples (f.ex. the sizes of a curve)
+     - the attributes ignored are left out (f.ex. the size to match instruments whatever the notional)
+
+    Results that are exceptions (f.ex. returned by parse_many with return_exceptions) are skipped.
+    """
+
+    def __init__(self, *, tolerances: Optional[Mapping[str, float]] = None, ignore: Iterable[str] = ()):
+        self.tolerances = dict(DEFAULT_TOLERANCES if tolerances is None else tolerances)
+        self.ignore = frozenset(ignore)
+
+        # the id of the products by key. Keys shared by several products map to an _Ids list, which saves a list per
+        # product on large indices where most keys are unique.
+        self._ids: Dict[Hashable, Any] = {}
+        self._size = 0
+        # the default id of the next result added: its position among all the results added, exceptions included
+        self._next_id = 0
+
+    @classmethod
+    def build(
+        cls, results: Iterable[Union[ParseResult, Exception]], ids: Optional[Iterable[Any]] = None, **kwargs
+    ) -> "EquivalenceIndex":
+        """
+
+        Args:
+            results: the results to index
+            ids: the id of each result, defaults to its position
+            **kwargs: the arguments of the index
+
+        Returns: the index of the results
+
+        """
+        index = cls(**kwargs)
+        index.add_many(results, ids)
+        return index
+
+    def __len__(self) -> int:
+        return self._size
+
+    def key(self, product_type: str, attributes_dict: Dict[str, Any]) -> Tuple:
+        """
+
+        Args:
+            product_type: the type of the product
+            attributes_dict: the attributes of the product
+
+        Returns: the canonical key of the product
+
+        """
+        items = []
+        for name in sorted(attributes_dict):
+            if name not in self.ignore:
+                items.append((name, self._freeze(attributes_dict[name], self.tolerances.get(name))))
+        return (product_type, *items)
+
+    def add_many(self, results: Iterable[Union[ParseResult, Exception]], ids: Optional[Iterable[Any]] = None) -> None:
+        """
+
+        Args:
+            results: the results to index
+            ids: the id of each result, defaults to the number of results added before it (exceptions included)
+
+        """
+        index = self._ids
+        for id_, result in zip(range(self._next_id, 2 ** 63) if ids is None else ids, results):
+            self._next_id += 1
+            if isinstance(result, Exception):
+                continue
+            key = self.key(*result)
+            current = index.get(key, _Ids)
+            if current is _Ids:
+                index[key] = id_
+            elif isinstance(current, _Ids):
+                current.append(id_)
+            else:
+                index[key] = _Ids((current, id_))
+            self._size += 1
+
+    def probe(self, product_type: str, attributes_dict: Dict[str, Any]) -> List[Any]:
+        """
+        Returns: the ids of the products indexed equivalent to the product specified
+        """
+        ids = self._ids.get(self.key(product_type, attributes_dict), _Ids)
+        if ids is _Ids:
+            return []
+        return list(ids) if isinstance(ids, _Ids) else [ids]
+
+    def probe_many(self, results: Iterable[Union[ParseResult, Exception]]) -> List[List[Any]]:
+        """
+        Returns: the ids of the products indexed equivalent to each of the results, in the order of the results
+        """
+        return [[] if isinstance(result, Exception) else self.probe(*result) for result in results]
+
+    def join(
+        self, results: Iterable[Union[ParseResult, Exception]], ids: Optional[Iterable[Any]] = None
+    ) -> Iterator[Tuple[Any, Any]]:
+        """
+        matches a corpus of results against the index, as an inner join on the key of the products
+
+        Args:
+            results: the results to match
+            ids: the id of each result, defaults to its position in results
+
+        Returns: the pairs (id of the result, id of the product indexed) of equivalent products
+
+        """
+        index = self._ids
+        for id_, result in zip(range(2 ** 63) if ids is None else ids, results):
+            if isinstance(result, Exception):
+                continue
+            matches = index.get(self.key(*result), _Ids)
+            if matches is _Ids:
+                continue
+            if isinstance(matches, _Ids):
+                for match in matches:
+                    yield id_, match
+            else:
+                yield id_, matches
+
+    def _freeze(self, value: Any, tolerance: Optional[float]) -> Hashable:
+        if isinstance(value, (list, tuple)):
+            return tuple(self._freeze(item, tolerance) for item in value)
+        if tolerance and isinstance(value, (float, int)) and not isinstance(value, bool):
+            # NOTE: the rounded value is an int so that f.ex. -0.0 and 0.0 fall in the same bucket
+            return round(value / tolerance)
+        return value
@@ -0,0 +1,158 @@
+from collections import Counter
+from typing import Any, Dict, Hashable, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from .bulk import bulk_mode
+from .parsers import AssetClassParser, AssetClassFormatter
+from .utils import freeze_attributes
+
+
+__all__ = ["Normalizer", "Normalized"]
+
+
+class Normalized(NamedTuple):
+    # the canonical string of the product
+    string: str
+    product_type: str
+    attributes_dict: Dict[str, Any]
+
+
+class Normalizer:
+    """
+    normalizes the string representations of products to their canonical string (the one formatted from their
+    attributes), f.ex. "5y10y 100.0m", "5Y10Y 100M" and "5Y10Y 100m" to "5Y10Y 100M".
+
+    Results are memoized by raw string and by parsed value: each string is only parsed once, and each product only
+    formatted once whatever the number of its variants. The memos are never evicted (see clear).
+    The results of the variants of a product share the same attributes dict, which must not be mutated.
+    """
+
+    def __init__(
+        self,
+        asset_class: str,
+        *,
+        grammar_path: Optional[str] = None,
+        case_sensitive: bool = False,
+    ):
+        self.asset_class = asset_class
+        self.case_sensitive = case_sensitive
+        self.parser = AssetClassParser(asset_class, grammar_path=grammar_path)
+        self.formatter = AssetClassFormatter(asset_class, grammar_path=grammar_path)
+
+        # the results by raw string
+        self._by_string: Dict[str, Normalized] = {}
+        # the results by (product_type, frozen attributes)
+        self._by_key: Dict[Tuple[str, Hashable], Normalized] = {}
+
+        self.metrics: Counter = Counter()
+
+    @property
+    def variants(self) -> Dict[str, str]:
+        """
+        Returns: the canonical string of each string normalized as {string: canonical string}
+        """
+        return {string: result.string for string, result in self._by_string.items()}
+
+    def normalize(self, string: str) -> Normalized:
+        """
+
+        Args:
+            string: the string to normalize
+
+        Returns: the canonical string of the product along with its type & attributes
+
+        """
+        try:
+            result = self._by_string[string]
+        except KeyError:
+            pass
+        else:
+            self.metrics["string_hits"] += 1
+            return result
+
+        product_type, attributes_dict = self.parser.parse(self._clean(string))
+        self.metrics["parses"] += 1
+        key = self._make_key(product_type, attributes_dict)
+        normalized = self._by_key.get(key) if key is not None else None
+        if normalized is None:
+            normalized = Normalized(self.formatter.format(product_type, attributes_dict), product_type, attributes_dict)
+            self.metrics["formats"] += 1
+        return self._memoize(string, key, normalized)
+
+    def normalize_many(
+        self, strings: Iterable[str], *, workers: Optional[int] = None, return_exceptions: bool = False
+    ) -> List[Union[Normalized, Exception]]:
+        """
+        normalizes strings in bulk: the strings not yet memoized are parsed with parse_many, and the products not yet
+        memoized formatted with format_many, with the garbage collector tuned for the batch (see bulk_mode).
+
+        Args:
+            strings: the strings to normalize
+            workers: the number of threads to parse with (see AssetClassParser.parse_many)
+            return_exceptions: if True, the exception raised while normalizing a string is returned in place of its
+            result instead of being raised.
+
+        Returns: the result of normalize for each string, in the order of the strings
+
+        """
+        with bulk_mode():
+            strings = list(strings)
+            to_parse = [string for string in dict.fromkeys(strings) if string not in self._by_string]
+            self.metrics["string_hits"] += len(strings) - len(to_parse)
+
+            parsed = self.parser.parse_many(map(self._clean, to_parse), workers=workers, return_exceptions=True)
+            self.metrics["parses"] += len(to_parse)
+
+            # format the products whose canonical string is not memoized yet
+            errors: Dict[str, Exception] = {}
+            to_format: Dict[Any, Tuple[str, Dict[str, Any]]] = {}
+            for string, result in zip(to_parse, parsed):
+                if isinstance(result, Exception):
+                    errors[string] = result
+                    continue
+                key = self._make_key(*result)
+                if key is None or key not in self._by_key:
+                    to_format.setdefault(key if key is not None else string, result)
+
+            formatted = dict(zip(to_format, self.formatter.format_many(to_format.values(), return_exceptions=True)))
+            self.metrics["formats"] += len(to_format)
+
+            for string, result in zip(to_parse, parsed):
+                if isinstance(result, Exception):
+                    continue
+                product_type, attributes_dict = result
+                key = self._make_key(product_type, attributes_dict)
+                normalized = self._by_key.get(key) if key is not None else None
+                if normalized is None:
+                    canonical = formatted[key if key is not None else string]
+                    if isinstance(canonical, Exception):
+                        errors[string] = canonical
+                        continue
+                    normalized = Normalized(canonical, product_type, attributes_dict)
+                self._memoize(string, key, normalized)
+
+            if errors and not return_exceptions:
+                raise next(iter(errors.values()))
+            return [errors[string] if string in errors else self._by_string[string] for string in strings]
+
+    def clear(self) -> None:
+        """ empties the memos """
+        self._by_string.clear()
+        self._by_key.clear()
+
+    def _clean(self, string: str) -> str:
+        string = string.strip()
+        return string if self.case_sensitive else string.upper()
+
+    def _make_key(self, product_type: str, attributes_dict: Dict[str, Any]) -> Optional[Tuple[str, Hashable]]:
+        try:
+            # the attributes are sorted so that the key does not depend on the order in which they were parsed
+            return product_type, freeze_attributes(dict(sorted(attributes_dict.items())))
+        except TypeError:
+            # unhashable values: the product is not memoized by value
+            return None
+
+    def _memoize(self, string: str, key: Optional[Tuple[str, Hashable]], result: Normalized) -> Normalized:
+        if key is not None:
+            self._by_key.setdefault(key, result)
+        self._by_string[string] = result
+        return result
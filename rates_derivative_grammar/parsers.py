@@ -1,24 +1,51 @@
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 from glob import glob
 from functools import lru_cache
+from io import StringIO
 import os
-import re
-from typing import Optional, Dict, Any, Tuple, Iterable, List
+import time
+from typing import Optional, Dict, Any, Callable, Tuple, Iterable, List, NamedTuple, Union, FrozenSet
+
+from lark.visitors import TransformerChain
 
 from lark import Lark, Token, Tree
 from lark.grammar import NonTerminal, Terminal
 from lark.lexer import TerminalDef
+from lark.parser_frontends import XEarley
+from lark.parsers import xearley
+from lark.parsers.earley import Parser
 from lark.load_grammar import EXT, IMPORT_PATHS
-from lark.reconstruct import Reconstructor
+from lark.reconstruct import Reconstructor, WriteTokensTransformer
 
+from .budget import BudgetedText, InputTooLongError, ParseBudgetExceededError, max_string_lengths
+from .bulk import bulk_mode
+from .compilation import CompiledGrammar, GrammarReconstructor, compile_grammar, compile_pattern
+from .coverage import CoverageCollector
 from .conversion import TokenConverterRegistry, TokenConversionError, TokenConverterRegistrationError
 from .grammar_analysis import Grammar
-from .processing import processors_registry, to_processor_key
-from .transformers import RenameNodeTransformer, FromTokenConversionTransformer
-from .utils import to_path_root, normalize, PATH_DELIMITER, make_parser, to_name, denormalize, Node
+from .recognition import Recognizer, Rejection
+from .shadow import ShadowComparator
+from .processing import PreProcess, PreProcessPlan, processors_registry, to_processor_key
+from .transformers import RenameNodeTransformer, FromTokenConversionTransformer, TenorInterningTransformer
+from .utils import (
+    to_path_root,
+    normalize,
+    PATH_DELIMITER,
+    make_parser,
+    to_name,
+    denormalize,
+    freeze_attributes,
+    Node,
+    SlimTree,
+    PredictOnceParser,
+    default_workers,
+    imported_grammars,
+)
 from .visitors import AttributeVisitor
 
-__all__ = ["AssetClassParser", "AssetClassFormatter", "GRAMMAR_PATH"]
+__all__ = ["AssetClassParser", "AssetClassFormatter", "BoundFormatter", "GRAMMAR_PATH"]
 
 GRAMMAR_PATH = os.path.join(os.path.dirname(__file__), "grammar")
 if GRAMMAR_PATH not in IMPORT_PATHS:
@@ -26,29 +53,167 @@ if GRAMMAR_PATH not in IMPORT_PATHS:
 
 UNKNOWN = "UNKNOWN"
 
+# the (normalized) names of the tokens whose value is a tenor or an imm code once converted
+TENOR_TOKEN_NAMES = ("float_tenor", "imm_tenor", "quarterly_imm_tenor", "month_int", "year_int", "tenor_freq")
+
+
+@lru_cache(maxsize=None)
+def _to_attribute_name(name: str) -> str:
+    # f.ex. linear_rate__fra__common__shared__DATE -> date, memoized as the grammar has a few hundred names
+    return normalize(to_path_root(name))
+
 
 class AssetClassParser:
     """ The parser parses strings """
 
-    def __init__(self, asset_class: str, *, grammar_path: Optional[str] = None):
+    def __init__(
+        self,
+        asset_class: str,
+        *,
+        grammar_path: Optional[str] = None,
+        intern_tenors: bool = False,
+        coverage: Optional[CoverageCollector] = None,
+        parser_options: Optional[Dict[str, Any]] = None,
+        max_seconds: Optional[float] = None,
+        max_steps: Optional[int] = None,
+        max_length: Optional[int] = None,
+    ):
+        """
+
+        Args:
+            asset_class: the asset class of the products to parse
+            grammar_path: the folder containing the grammar files
+            intern_tenors: if True, tenors & imm codes are parsed as interned Tenor values
+            coverage: a collector counting the rules & terminals of the products parsed, coverage is not collected if
+            None
+            parser_options: the options of the lark parser (f.ex. {"parser": "lalr"}), defaults to lark's earley parser
+            max_seconds: the default time budget of a parse in seconds, unlimited if None (see parse)
+            max_steps: the default step budget of a parse, unlimited if None (see parse)
+            max_length: the length of the longest string parsed, defaults to the length of the longest string of the
+            grammar (see max_string_lengths)
+
+        """
 
         self.asset_class = asset_class
         self.grammar_path = grammar_path or GRAMMAR_PATH
+        self.intern_tenors = intern_tenors
+        self.coverage = coverage
+        self.parser_options = dict(parser_options or {})
+        # the comparator of the results with another parser (see shadow)
+        self.shadow: Optional[ShadowComparator] = None
         self.parser = self._make_parser(self.grammar_path, self.asset_class)
 
-    def parse(self, string: str) -> Tuple[str, Dict[str, Any]]:
+        self.max_seconds = max_seconds
+        self.max_steps = max_steps
+        self._max_length = max_length
+        self.max_length = max_length or max(max_string_lengths(self.parser.rules, self.parser.terminals).values())
+        # counters of the parses aborted
+        self.metrics: Counter = Counter()
+
+    def parse(
+        self, string: str, *, max_seconds: Optional[float] = None, max_steps: Optional[int] = None
+    ) -> Tuple[str, Dict[str, Any]]:
         """
         parses the string specified according to the grammar defined in the Parser
+
+        Earley parsing is cubic in the worst case, so that a pathological string (f.ex. free text, or a long run of
+        digits that the terminals can split in many ways) can take a long time to parse. Parsing aborts with an
+        InputTooLongError if the string is longer than max_length, and with a ParseBudgetExceededError if it takes
+        more than max_seconds or max_steps. A step is a terminal matched at a position of the string, the budgets are
+        only enforced by earley parsers with the dynamic lexer (lark's default).
+
         Args:
             string: the string to parse
+            max_seconds: the time budget of the parse in seconds, defaults to the parser's max_seconds
+            max_steps: the step budget of the parse, defaults to the parser's max_steps
 
         Returns: A tuple of the type of product parsed and a dict of the attribute parsed as
         {attribute_name: attribute value}
 
         """
+        if self.shadow is None:
+            return self._parse(string, max_seconds, max_steps)
+
+        start = time.perf_counter()
+        try:
+            result = self._parse(string, max_seconds, max_steps)
+        except Exception as e:
+            self.shadow.submit(string, e, time.perf_counter() - start)
+            raise
+        self.shadow.submit(string, result, time.perf_counter() - start)
+        return result
+
+    def start_shadow(self, parser_options: Dict[str, Any], **kwargs) -> ShadowComparator:
+        """
+        starts comparing the results of the parser with a parser configured with other options (f.ex. another lark
+        backend) on a sample of the strings parsed, in a background thread. The results returned are always the ones
+        of this parser.
+
+        Args:
+            parser_options: the options of the lark parser to compare with (f.ex. {"parser": "lalr"})
+            **kwargs: the arguments of the ShadowComparator (f.ex. sample_rate & max_overhead)
+
+        Returns: the comparator, whose report gives the mismatches found & the relative latency of the parsers
+
+        """
+        self.stop_shadow()
+        secondary = AssetClassParser(
+            self.asset_class,
+            grammar_path=self.grammar_path,
+            intern_tenors=self.intern_tenors,
+            parser_options=parser_options,
+        )
+        self.shadow = ShadowComparator(secondary, **kwargs)
+        return self.shadow
+
+    def stop_shadow(self) -> None:
+        """ stops comparing results, once the results sampled are compared """
+        shadow, self.shadow = self.shadow, None
+        if shadow is not None:
+            shadow.close()
+
+    def reload(self, product_types: Optional[Iterable[str]] = None) -> None:
+        """
+        compiles the grammar of the asset class again from its grammar files, and swaps it in once compiled: the
+        parses in flight finish with the previous grammar. The grammar files imported are memoized per grammar folder,
+        so that only the files evicted from the memo are read & compiled again (see GrammarReloader), the grammars of
+        the other products being reused.
+
+        Args:
+            product_types: the product types whose grammar files changed, for information as the parser of the asset
+            class is made of all its products
+
+        """
+        parser = self._make_parser(self.grammar_path, self.asset_class)
+        max_length = self._max_length or max(max_string_lengths(parser.rules, parser.terminals).values())
+        self.parser, self.max_length = parser, max_length
+
+        shadow = self.shadow
+        if shadow is not None:
+            shadow.secondary.reload(product_types)
+
+    def _parse(
+        self, string: str, max_seconds: Optional[float], max_steps: Optional[int]
+    ) -> Tuple[str, Dict[str, Any]]:
+
+        if len(string) > self.max_length:
+            self.metrics["aborted_too_long"] += 1
+            raise InputTooLongError(
+                f"The string is longer than the {self.max_length} characters of the longest {self.asset_class} "
+                f"product: {len(string)} characters."
+            )
+
+        max_seconds = self.max_seconds if max_seconds is None else max_seconds
+        max_steps = self.max_steps if max_steps is None else max_steps
+        if max_seconds is not None or max_steps is not None:
+            string = BudgetedText(string, max_seconds=max_seconds, max_steps=max_steps)
 
         # parse string
-        parsed = self.parser.parse(string)
+        try:
+            parsed = self.parser.parse(string)
+        except ParseBudgetExceededError:
+            self.metrics["aborted_over_budget"] += 1
+            raise
 
         # get product tree
         if len(parsed.children) != 1:
@@ -58,31 +223,161 @@ class AssetClassParser:
         product = parsed.children[0]
         product_type = product.data
 
-        # make transformers and transform tree
+        if self.coverage is not None:
+            self.coverage.record(product)
+
+        # transform tree
         # NOTE: I am using lark's Transformer class to apply transformations to the tree in place while resolving (for
         # example converting the tokens retrieved to desired types) in place while resolving.
         # It is more efficient than parsing first and transforming afterwards.
+        transformer, visitor = self._make_pipeline(product_type)
+        transformed = transformer.transform(product)
+
+        # visit tree and return attributes dict
+        attributes_dict = visitor(transformed)
+
+        # return result
+        return product_type, attributes_dict
+
+    def parse_many(
+        self,
+        strings: Iterable[str],
+        *,
+        workers: Optional[int] = None,
+        return_exceptions: bool = False,
+        cache: Optional[Any] = None,
+    ) -> List[Union[Tuple[str, Dict[str, Any]], Exception]]:
+        """
+        parses the strings specified in a pool of threads sharing the compiled parser of the AssetClassParser, with the
+        garbage collector tuned for the batch (see bulk_mode)
+
+        The parsing pipeline holds no per-call state so that the threads do not need to be synchronised. Note that the
+        threads only parse in parallel on a free-threaded build of python: on builds with a GIL the strings are parsed
+        serially by default.
+
+        Args:
+            strings: the strings to parse
+            workers: the number of threads to parse with. Defaults to the number of cpus on free-threaded builds and
+            to 1 otherwise.
+            return_exceptions: if True, the exception raised while parsing a string is returned in place of its result
+            instead of being raised.
+            cache: a cache of parse results (f.ex. a PersistentParseCache) looked up in bulk before parsing and updated
+            in bulk with the strings parsed. Identical strings are only parsed once and share their result. A cache
+            holding its intern_tenors option must hold the option of the parser.
+
+        Returns: the results of parse for each string, in the order of the strings
+
+        """
+        if cache is not None and getattr(cache, "intern_tenors", self.intern_tenors) != self.intern_tenors:
+            raise ValueError(f"The cache does not hold results parsed with intern_tenors={self.intern_tenors}.")
+
+        with bulk_mode():
+            strings = list(strings)
+            if cache is None:
+                return self._parse_many(strings, workers, return_exceptions)
+
+            results = cache.get_many(set(strings))
+            to_parse = [string for string in dict.fromkeys(strings) if string not in results]
+            parsed = dict(zip(to_parse, self._parse_many(to_parse, workers, True)))
+            cache.put_many((string, result) for string, result in parsed.items() if not isinstance(result, Exception))
+            results.update(parsed)
+
+            if not return_exceptions:
+                for result in parsed.values():
+                    if isinstance(result, Exception):
+                        raise result
+            return [results[string] for string in strings]
+
+    def _parse_many(
+        self, strings: List[str], workers: Optional[int], return_exceptions: bool
+    ) -> List[Union[Tuple[str, Dict[str, Any]], Exception]]:
+        parse = self._parse_or_return_exception if return_exceptions else self.parse
+        return self._map(parse, strings, workers)
+
+    @staticmethod
+    def _map(func, strings: List[str], workers: Optional[int]) -> List[Any]:
+        workers = default_workers() if workers is None else workers
+
+        if workers <= 1 or len(strings) <= 1:
+            return list(map(func, strings))
+
+        # submitting chunks instead of single strings keeps the overhead of the executor low
+        chunk_size = -(-len(strings) // (workers * 4))
+        chunks = [strings[i : i + chunk_size] for i in range(0, len(strings), chunk_size)]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return [result for chunk in executor.map(lambda c: list(map(func, c)), chunks) for result in chunk]
+
+    def validate(self, string: str) -> Union[str, Rejection]:
+        """
+        checks whether the string is a valid product without parsing it: only the earley chart of the string is built,
+        without building its tree nor converting its values into attributes (see Recognizer). The values are still
+        checked by their converter (f.ex. 31FEB20 is not a valid date).
+
+        Note that the strings whose tree is rejected by the processor of their product are valid, though they cannot
+        be parsed.
+
+        Args:
+            string: the string to validate
+
+        Returns: the type of the product if the string is valid, otherwise a Rejection (which is falsy) holding the
+        position at which the string stops being valid and the terminals expected there
+
+        """
+        if len(string) > self.max_length:
+            return Rejection(self.max_length, (), f"The string is longer than {self.max_length} characters.")
+        return self._make_recognizer(self.parser).recognize(string)
+
+    def validate_many(self, strings: Iterable[str], *, workers: Optional[int] = None) -> List[Union[str, Rejection]]:
+        """
+        validates the strings specified in a pool of threads sharing the recognizer (see validate & parse_many).
+        Identical strings are only validated once.
+
+        Args:
+            strings: the strings to validate
+            workers: the number of threads to validate with, defaults as in parse_many
+
+        Returns: the results of validate for each string, in the order of the strings
+
+        """
+        strings = list(strings)
+        unique = list(dict.fromkeys(strings))
+        results = dict(zip(unique, self._map(self.validate, unique, workers)))
+        return [results[string] for string in strings]
+
+    @lru_cache(maxsize=4)
+    def _make_recognizer(self, parser: Lark) -> Recognizer:
+        # NOTE: the recognizer is made from the parser passed, so that it is made again when the grammar is reloaded
+        return Recognizer.from_parser(parser)
+
+    def _parse_or_return_exception(self, string: str) -> Union[Tuple[str, Dict[str, Any]], Exception]:
+        try:
+            return self.parse(string)
+        except Exception as e:
+            return e
+
+    @lru_cache(maxsize=32)
+    def _make_pipeline(self, product_type: str) -> Tuple[TransformerChain, AttributeVisitor]:
+        """
+        instantiate the transformers and the visitor turning the parsed tree of a product into its attributes. They
+        hold no state so they are shared by all calls to parse.
+        """
 
         # converts a node value with the converter registered for the node
         token_converter = FromTokenConversionTransformer()
 
         # convert from node name in the grammar to attribute name (take token name only instead of full path & normalize
         # terminal names from upper case to lower case.
-        node_renamer = RenameNodeTransformer(lambda s: normalize(to_path_root(s)))
+        node_renamer = RenameNodeTransformer(_to_attribute_name)
 
         # reduces the tree nodes when relevant (see processor documentation for more info)
         processor = processors_registry[to_processor_key(self.asset_class, product_type)]()
 
-        transformed = (token_converter * node_renamer * processor).transform(product)
-
-        # visit tree and return attributes dict
-        visitor = AttributeVisitor(processor.attribute_names)
-        attributes_dict = visitor(transformed)
+        transformer = token_converter * node_renamer
+        if self.intern_tenors:
+            transformer *= TenorInterningTransformer(TENOR_TOKEN_NAMES)
 
-        # return result
-        return product_type, attributes_dict
+        return transformer * processor, AttributeVisitor(processor.attribute_names)
 
-    @lru_cache(maxsize=32)
     def _make_parser(self, grammar_path: str, asset_class: str) -> Lark:
         """
         instantiate an instance of the grammar parser
@@ -95,12 +390,49 @@ class AssetClassParser:
             products.append(product)
 
         grammar.append(f"start: {' | '.join(products)}")
-        return Lark("\n".join(grammar))
+
+        # NOTE: the grammar is named after a file of the grammar folder so that its relative imports are resolved in
+        # the folder (lark resolves the imports of an unnamed grammar next to the __main__ script).
+        source = StringIO("\n".join(grammar))
+        source.name = os.path.join(grammar_path, f"{asset_class}{EXT}")
+
+        # NOTE: lark memoizes the grammars imported, so that the rules of the common grammar files are shared by all
+        # parsers of the folder. Some options update the rules in place (f.ex. parser="lalr" drops the priorities of
+        # the rules, which changes how earley parsers resolve ambiguities) so the grammars are imported again for this
+        # parser.
+        options = dict(self.parser_options)
+        # NOTE: lark writes the positions propagated in the meta of the trees, which SlimTree does not allocate
+        if not options.get("propagate_positions"):
+            options.setdefault("tree_class", SlimTree)
+        with imported_grammars(None if self.parser_options else grammar_path):
+            return self._enforce_budgets(Lark(source, **options))
+
+    @staticmethod
+    def _enforce_budgets(parser: Lark) -> Lark:
+        """
+        makes the earley parser spend a step of the budget of the string parsed (see BudgetedText) each time it
+        matches a terminal, and predict each symbol once per column (see PredictOnceParser)
+        """
+        frontend = parser.parser
+        if not isinstance(frontend, XEarley):
+            return parser
+
+        if type(frontend.parser) is xearley.Parser:
+            frontend.parser.__class__ = PredictOnceParser
+        regexps = frontend.regexps
+
+        def match(terminal: Terminal, text: str, index: int = 0):
+            if isinstance(text, BudgetedText):
+                text.spend()
+            return regexps[terminal.name].match(text, index)
+
+        frontend.parser.term_matcher = match
+        return parser
 
 
 class TokenMatcher:
     def __init__(self, terminals: Iterable[TerminalDef]):
-        self.terminals_dict = {Terminal(def_.name): re.compile(def_.pattern.to_regexp()) for def_ in terminals}
+        self.terminals_dict = {Terminal(def_.name): compile_pattern(def_.pattern.to_regexp()) for def_ in terminals}
 
     def match(self, terminal: Terminal, token: Token) -> bool:
         """
@@ -129,6 +461,17 @@ class TokenMatcher:
         return bool(pattern.match(value))
 
 
+class FormatTools(NamedTuple):
+    """ the tools formatting a product type, made from a version of its grammar files """
+
+    # the version of the grammar files, increased each time they are reloaded
+    version: int
+    analyser: Grammar
+    reconstructor: Reconstructor
+    # the pre-processing of the attributes, compiled from the processor (see Processor.compile_pre_process)
+    pre_process: Union[PreProcessPlan, PreProcess]
+
+
 class AssetClassFormatter:
     """ The formatter formats attributes """
 
@@ -136,6 +479,14 @@ class AssetClassFormatter:
         self.asset_class = asset_class
         self.grammar_path = grammar_path or GRAMMAR_PATH
 
+        # the version of the grammar of each product type formatted (see reload)
+        self._versions: Dict[str, int] = {}
+        # parsers of the grammar trimmed to the attributes formatted by (product_type, version, node names)
+        self._trimmed_parsers: Dict[Tuple[str, int, FrozenSet[str]], Parser] = {}
+
+        # counters of the caches' effectiveness
+        self.metrics: Counter = Counter()
+
     @staticmethod
     def _make_converted_tree(rule, children):
         """
@@ -175,7 +526,7 @@ class AssetClassFormatter:
                 nodes.append(Token(denormalize(name), val))
         return nodes
 
-    def format(self, product_type: str, attributes_dict: Dict[str, Any]):
+    def format(self, product_type: str, attributes_dict: Dict[str, Any]) -> str:
         """
         formats attribute dictionary into a grammar string according to the grammar defined in the Formatter
 
@@ -191,58 +542,215 @@ class AssetClassFormatter:
         Returns: The formatted string
 
         """
+        return self._format(product_type, attributes_dict, self._get_format_tools(product_type))
 
-        # get grammar analysing tools
-        grammar, analyser, reconstructor, token_matcher = self._make_grammar_tools(product_type)
+    def format_many(
+        self, records: Iterable[Tuple[str, Dict[str, Any]]], *, return_exceptions: bool = False
+    ) -> List[Union[str, Exception]]:
+        """
+        formats records grouped by product type: the grammar tools and the processor of a product type are resolved
+        once for all its records, and identical records are only formatted once. The garbage collector is tuned for
+        the batch (see bulk_mode).
+
+        Args:
+            records: the records to format as (product_type, attributes_dict)
+            return_exceptions: if True, the exception raised while formatting a record is returned in place of its
+            string instead of being raised.
+
+        Returns: the formatted string of each record, in the order of the records
+
+        """
+        with bulk_mode():
+            records = list(records)
+            indices_by_product_type: Dict[str, List[int]] = {}
+            for i, (product_type, _) in enumerate(records):
+                indices_by_product_type.setdefault(product_type, []).append(i)
+
+            results: List[Union[str, Exception]] = [""] * len(records)
+            for product_type, indices in indices_by_product_type.items():
+                try:
+                    tools = self._get_format_tools(product_type)
+                except Exception as e:
+                    if not return_exceptions:
+                        raise
+                    for i in indices:
+                        results[i] = e
+                    continue
+
+                formatted: Dict[Any, Union[str, Exception]] = {}
+                for i in indices:
+                    attributes_dict = records[i][1]
+                    try:
+                        key = freeze_attributes(attributes_dict)
+                        results[i] = formatted[key]
+                        continue
+                    except KeyError:
+                        pass
+                    except TypeError:
+                        # unhashable values: the record is formatted without being memoized
+                        key = None
+
+                    try:
+                        result: Union[str, Exception] = self._format(product_type, attributes_dict, tools)
+                    except Exception as e:
+                        if not return_exceptions:
+                            raise
+                        result = e
+                    if key is not None:
+                        formatted[key] = result
+                    results[i] = result
+
+            return results
+
+    def bind(self, product_type: str, attributes_dict: Dict[str, Any]) -> "BoundFormatter":
+        """
+        binds the formatter to a product whose attributes are updated over time (f.ex. its size or strike)
+
+        Args:
+            product_type: the type of product to format
+            attributes_dict: the initial attributes of the product as {attribute_name: attribute_value}
+
+        Returns: a handle formatting the product incrementally (see BoundFormatter)
+
+        """
+        return BoundFormatter(self, product_type, attributes_dict)
+
+    def reload(self, product_types: Optional[Iterable[str]] = None) -> None:
+        """
+        makes the grammar tools of product types again from their grammar files, and swaps them in once made: the
+        formats in flight finish with the previous tools, and bound formatters switch to the new ones on their next
+        update. The tools of the product types not formatted yet are made when they are first formatted.
+
+        Args:
+            product_types: the product types whose grammar files changed, defaults to all the product types formatted
+
+        """
+        for product_type in list(self._versions) if product_types is None else product_types:
+            version = self._versions.get(product_type)
+            if version is None:
+                continue
+
+            # NOTE: the tools of a product whose grammar file was removed are not made, so that formatting it fails
+            if os.path.exists(self._to_grammar_file(product_type)):
+                self._make_format_tools(product_type, version + 1)
+            self._versions[product_type] = version + 1
+
+            for key in [key for key in self._trimmed_parsers if key[0] == product_type and key[1] <= version]:
+                self._trimmed_parsers.pop(key, None)
+
+    def _format(self, product_type: str, attributes_dict: Dict[str, Any], tools: FormatTools) -> str:
+        nodes = self._make_nodes(attributes_dict, tools.analyser, tools.pre_process)
+        nodes = [self._resolve_node(product_type, node, tools.version) for node in nodes]
+        tree = self._make_tree(product_type, nodes, tools)
+
+        # reconstruct
+        # NOTE: for some reason reconstructor.reconstruct appends a space between all alphanumerical characters so
+        # I had to use ._reconstruct instead.
+        string = "".join(tools.reconstructor._reconstruct(tree))
+
+        return string
+
+    def _make_nodes(
+        self, attributes_dict: Dict[str, Any], analyser: Grammar, pre_process: Union[PreProcessPlan, PreProcess]
+    ) -> List[Node]:
+        """
+        Returns: the nodes representing the attributes, before they are resolved against the grammar
+        """
 
         # make nodes from attribute names
         nodes = self._make_attributes_nodes(attributes_dict, analyser.rules_by_origin.keys())
 
         # pre-process nodes: used for example if some transformation of attributes is needed before attributes can be
         # formatted by the grammar
-        processor = processors_registry[to_processor_key(self.asset_class, product_type)]
-        nodes = list(processor.pre_process(nodes))
+        return pre_process(nodes)
+
+    def _resolve_node(self, product_type: str, node: Node, version: int) -> Node:
+        """
+        Returns: the node converted to a token, or re-parsed into its sub-tree if it is a non-terminal
+        """
 
-        # we create a parser for the sub-grammar that defines each non-terminal attribute nodes and recreate its
+        # we use the parser for the sub-grammar that defines each non-terminal attribute nodes and recreate its
         # sub-tree
-        for i, node in enumerate(nodes):
-            if isinstance(node, Tree):
-                rules = list(analyser.get_rules(node.data))
-                token_parser = make_parser(
-                    rules,
-                    start_symbol=node.data,
-                    match=token_matcher.match,
-                    callbacks={rule: partial(self._make_converted_tree, rule) for rule in rules},
-                )
-                nodes[i] = token_parser.parse(node.children, start=node.data)
-            else:
-                nodes[i] = TokenConverterRegistry.get(node.type).to_token(node.type, node.value)
+        if isinstance(node, Tree):
+            token_parser = self._make_token_parser(product_type, node.data, version)
+            return token_parser.parse(node.children, start=node.data)
+        return TokenConverterRegistry.get(node.type).to_token(node.type, node.value)
 
-        # Trim the grammar to the nodes that have been resolved by the parsers
-        trimmed_rules = analyser.trim(map(to_name, nodes))
+    def _make_tree(self, product_type: str, nodes: List[Node], tools: FormatTools) -> Tree:
+        """
+        Returns: the tree of the product pieced together from the resolved nodes
+        """
 
         # NOTE: this part is actually interesting. We use the power of the parsing logic to parse the list of sub-trees
         # according to the grammar (instead of a string i.e. list of characters).
         # The match criteria used is the name of the node. This allows us to finalize the reconstruction of the tree
         # used to parse the
-        parser = make_parser(trimmed_rules, match=lambda term, nod: to_name(nod) == term.name)
-        tree = parser.parse(nodes, start="start")
+        parser = self._get_trimmed_parser(product_type, frozenset(map(to_name, nodes)), tools)
+        return parser.parse(nodes, start="start")
 
-        # reconstruct
-        # NOTE: for some reason reconstructor.reconstruct appends a space between all alphanumerical characters so
-        # I had to use ._reconstruct instead.
-        string = "".join(reconstructor._reconstruct(tree))
+    def _get_trimmed_parser(self, product_type: str, node_names: FrozenSet[str], tools: FormatTools) -> Parser:
+        """
+        returns the parser of the grammar trimmed to the nodes that have been resolved by the token parsers. The trimmed
+        grammar only depends on the names of the nodes present, of which there are a few combinations per product, so
+        the parsers are cached by product type, version of the grammar & node names.
+        """
+        key = (product_type, tools.version, node_names)
+        try:
+            parser = self._trimmed_parsers[key]
+        except KeyError:
+            self.metrics["trimmed_parser_misses"] += 1
+            parser = make_parser(tools.analyser.trim(node_names), match=lambda term, nod: to_name(nod) == term.name)
+            self._trimmed_parsers[key] = parser
+        else:
+            self.metrics["trimmed_parser_hits"] += 1
+        return parser
+
+    def _get_format_tools(self, product_type: str) -> FormatTools:
+        """
+        resolves the tools made from the current version of the grammar of a product type
+        """
+        version = self._versions.get(product_type, 0)
+        tools = self._make_format_tools(product_type, version)
+        # NOTE: the version is only recorded once the tools are made, so that reload skips the unknown product types
+        self._versions.setdefault(product_type, version)
+        return tools
 
-        return string
+    @lru_cache(maxsize=32)
+    def _make_format_tools(self, product_type: str, version: int) -> FormatTools:
+        """
+        resolves the grammar analyser, the reconstructor and the pre-processing of the processor used to format a
+        product type
+        """
+        _, analyser, reconstructor, _ = self._make_grammar_tools(product_type, version)
+        processor = processors_registry[to_processor_key(self.asset_class, product_type)]
+        return FormatTools(version, analyser, reconstructor, processor.compile_pre_process())
+
+    @lru_cache(maxsize=256)
+    def _make_token_parser(self, product_type: str, rule_name: str, version: int) -> Parser:
+        """
+        instantiate the parser of the sub-grammar defining a non-terminal attribute of a product type. It holds no
+        per-call state so it is shared by all calls to format.
+        """
+        _, analyser, _, token_matcher = self._make_grammar_tools(product_type, version)
+        rules = list(analyser.get_rules(rule_name))
+        return make_parser(
+            rules,
+            start_symbol=rule_name,
+            match=token_matcher.match,
+            callbacks={rule: partial(self._make_converted_tree, rule) for rule in rules},
+        )
 
     @lru_cache(maxsize=32)
-    def _make_grammar_tools(self, product_type: str) -> Tuple[Lark, Grammar, Reconstructor, TokenMatcher]:
+    def _make_grammar_tools(
+        self, product_type: str, version: int
+    ) -> Tuple[CompiledGrammar, Grammar, Reconstructor, TokenMatcher]:
         """
-        instantiate an instance of the grammar parser, the "Grammar" analyser tool, and the reconstructor
+        compiles the grammar of the product type, then instantiate the "Grammar" analyser tool, the reconstructor and
+        the token matcher, which share the compiled grammar. The version of the grammar files is part of the key of
+        the cache, so that the tools are made again when they are reloaded.
         """
-        # get grammar analyser
-        path = os.path.join(self.grammar_path, f"{self.asset_class}{PATH_DELIMITER}{product_type}{EXT}")
-        grammar = Lark.open(path)
+        # compile the grammar, the modules it imports being shared with the other products (see compile_grammar)
+        grammar = compile_grammar(self.grammar_path, os.path.basename(self._to_grammar_file(product_type)))
 
         # make analyser
         analyser = Grammar(grammar.rules)
@@ -250,9 +758,145 @@ class AssetClassFormatter:
         analyser = Grammar(expanded_rules)
 
         # make reconstructor
-        reconstructor = Reconstructor(grammar)
+        reconstructor = GrammarReconstructor(grammar)
 
         # make token matcher
         token_matcher = TokenMatcher(grammar.terminals)
 
         return grammar, analyser, reconstructor, token_matcher
+
+    def _to_grammar_file(self, product_type: str) -> str:
+        return os.path.join(self.grammar_path, f"{self.asset_class}{PATH_DELIMITER}{product_type}{EXT}")
+
+
+class BoundFormatter:
+    """
+    formats a product incrementally as its attributes change.
+
+    The formatted string is made of one segment per node of the product (the nodes are the attributes once
+    pre-processed), pieced together by a template holding the characters of the grammar between the nodes. The template
+    only depends on the names of the nodes, and a segment only depends on its node, so when some attributes change
+    only the segments of the nodes whose value changed are formatted again. When the names of the nodes change (f.ex.
+    an optional attribute is added or removed) or the grammar of the product is reloaded, the product is formatted from
+    scratch.
+
+    The string formatted is always the one returned by AssetClassFormatter.format. A handle is not thread-safe.
+    """
+
+    def __init__(self, formatter: AssetClassFormatter, product_type: str, attributes_dict: Dict[str, Any]):
+        self.formatter = formatter
+        self.product_type = product_type
+        self.attributes_dict: Dict[str, Any] = {}
+        self.string = ""
+
+        self._tools = formatter._get_format_tools(product_type)
+        self._writer = self._make_writer(self._tools)
+        self._names: List[str] = []
+        self._keys: List[Tuple] = []
+        self._segments: List[str] = []
+        # the template as strings and indices of the segments
+        self._template: List[Union[str, int]] = []
+
+        self.update(**attributes_dict)
+
+    def update(self, **changes: Any) -> str:
+        """
+        updates the attributes of the product. An attribute updated to None is removed.
+
+        Args:
+            **changes: the attributes that changed as attribute_name=attribute_value
+
+        Returns: the formatted string of the product with its updated attributes
+
+        """
+        attributes_dict = {**self.attributes_dict, **changes}
+        attributes_dict = {name: value for name, value in attributes_dict.items() if value is not None}
+
+        tools = self.formatter._get_format_tools(self.product_type)
+        if tools is not self._tools:
+            # the grammar of the product was reloaded: it is formatted from scratch with the new tools
+            self._tools, self._writer, self._names = tools, self._make_writer(tools), []
+
+        nodes = self.formatter._make_nodes(attributes_dict, tools.analyser, tools.pre_process)
+        names = list(map(to_name, nodes))
+        keys = list(map(self._make_key, nodes))
+
+        if names != self._names:
+            segments, template = self._render(nodes)
+        else:
+            segments, template = list(self._segments), self._template
+            for i, (node, key) in enumerate(zip(nodes, keys)):
+                if key != self._keys[i]:
+                    resolved = self.formatter._resolve_node(self.product_type, node, tools.version)
+                    segments[i] = self._render_node(resolved)
+
+        # the state of the handle is only updated once the product is formatted, so that it is left unchanged by
+        # attributes that cannot be formatted
+        self.attributes_dict, self._names, self._keys = attributes_dict, names, keys
+        self._segments, self._template = segments, template
+        self.string = "".join(item if isinstance(item, str) else segments[item] for item in template)
+        self.formatter.metrics["bound_updates"] += 1
+        return self.string
+
+    @staticmethod
+    def _make_writer(tools: FormatTools) -> "SegmentTokensWriter":
+        write_tokens = tools.reconstructor.write_tokens
+        return SegmentTokensWriter(write_tokens.tokens, write_tokens.term_subs)
+
+    @staticmethod
+    def _make_key(node: Node) -> Tuple:
+        # the type of the values is part of the key as f.ex. True == 1
+        if isinstance(node, Tree):
+            return (node.data,) + tuple((type(child.value), child.value) for child in node.children)
+        return node.type, type(node.value), node.value
+
+    def _render(self, nodes: List[Node]) -> Tuple[List[str], List[Union[str, int]]]:
+        """
+        Returns: the segments & the template of the product formatted from scratch
+        """
+        resolved = [self.formatter._resolve_node(self.product_type, node, self._tools.version) for node in nodes]
+        segments = list(map(self._render_node, resolved))
+
+        # NOTE: the tokens of the tree are its nodes themselves while its sub-trees are copied when the tree is
+        # reconstructed, so the sub-trees of the nodes are marked in their meta to be found in the tree.
+        token_indices = {}
+        for i, node in enumerate(resolved):
+            if isinstance(node, Tree):
+                node.meta.segment = i
+            else:
+                token_indices[id(node)] = i
+
+        tree = self.formatter._make_tree(self.product_type, resolved, self._tools)
+        template = list(self._make_template(tree, token_indices))
+        self.formatter.metrics["bound_full_formats"] += 1
+        return segments, template
+
+    def _render_node(self, node: Node) -> str:
+        if isinstance(node, Tree):
+            return "".join(self._tools.reconstructor._reconstruct(node))
+        return str(node)
+
+    def _make_template(self, tree: Tree, token_indices: Dict[int, int]) -> Iterable[Union[str, int]]:
+        """
+        reconstructs the tree as Reconstructor._reconstruct does, except that the nodes of the product are replaced by
+        the index of their segment
+        """
+        unreduced_tree = self._tools.reconstructor.parser.parse(tree.children, tree.data)
+        for item in self._writer.transform(unreduced_tree):
+            if isinstance(item, Tree):
+                segment = getattr(item.meta, "segment", None)
+                if segment is None:
+                    yield from self._make_template(item, token_indices)
+                else:
+                    yield segment
+            else:
+                yield token_indices.get(id(item), item)
+
+
+class SegmentTokensWriter(WriteTokensTransformer):
+    """ inserts the discarded tokens of a tree as WriteTokensTransformer, except in sub-trees marked as segments """
+
+    def __default__(self, data, children, meta):
+        if getattr(meta, "segment", None) is not None:
+            return Tree(data, [], meta)
+        return super().__default__(data, children, meta)
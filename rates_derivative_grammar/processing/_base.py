@@ -1,17 +1,44 @@
-from typing import Dict, Type, Iterable, Tuple
+from functools import lru_cache
+from typing import Callable, Dict, Type, Iterable, List, NamedTuple, Optional, Tuple, Union
 
 from lark import Transformer
 
-from ..utils import PATH_DELIMITER, Node, to_name
+from ..utils import PATH_DELIMITER, Node, SlimTree, to_name
 
 
-__all__ = ["Processor", "processors_registry", "to_processor_key"]
+__all__ = ["Processor", "PreProcess", "PreProcessPlan", "processors_registry", "to_processor_key"]
 
 
 def to_processor_key(asset_class: str, product_type: str) -> str:
     return f"{asset_class}{PATH_DELIMITER}{product_type}"
 
 
+# the pre-processing of the attributes of a product (see Processor.compile_pre_process)
+PreProcess = Callable[[Iterable[Node]], List[Node]]
+
+
+class PreProcessPlan(NamedTuple):
+    """
+    the pre-processing of a processor compiled into a flat plan (see Processor.compile_pre_process): the attributes
+    are sorted by their rank, then rewritten by the rewrites of the processor's mixins in turn.
+    """
+
+    # the rank of each attribute name
+    ranks: Dict[str, int]
+    rewrites: Tuple[Callable[[List[Node]], List[Node]], ...]
+
+    def __call__(self, attributes: Iterable[Node]) -> List[Node]:
+        ranks = self.ranks
+        try:
+            nodes = sorted(attributes, key=lambda node: ranks[to_name(node).lower()])
+        except KeyError as e:
+            raise ValueError(f"{e.args[0]!r} is not an attribute of the product.") from None
+
+        for rewrite in self.rewrites:
+            nodes = rewrite(nodes)
+        return nodes
+
+
 class Processor(Transformer):
     """
     Used to reduce the parsed tree: for example [notional, notional_unit] can be reduced to [notional * unit_multiplier}
@@ -22,6 +49,12 @@ class Processor(Transformer):
     grammar = ""
     product_type = ""
     attribute_names: Tuple[str, ...] = tuple()
+    # the name of the classmethod rewriting the sorted attributes as the pre_process of the class itself (without the
+    # ones of its bases) does, which classes overriding pre_process declare so that it can be compiled
+    pre_process_rewrite: Optional[str] = None
+
+    def __default__(self, data, children, meta):
+        return SlimTree(data, children, meta)
 
     @classmethod
     def to_key(cls):
@@ -32,5 +65,32 @@ class Processor(Transformer):
         for attribute in sorted(attributes, key=lambda t: cls.attribute_names.index(to_name(t).lower())):
             yield attribute
 
+    @classmethod
+    @lru_cache(maxsize=None)
+    def compile_pre_process(cls) -> Union[PreProcessPlan, PreProcess]:
+        """
+        compiles pre_process into a flat plan, once per processor: the ranks of the attributes are computed once
+        instead of searching attribute_names for each attribute, and the rewrites of the mixins are applied in turn to
+        a list instead of chaining the generators of their pre_process.
+
+        Returns: a function returning the same attributes as pre_process, which is the plan unless a class overrides
+        pre_process without declaring its pre_process_rewrite
+
+        """
+        rewrites = []
+        for klass in reversed(cls.__mro__[: cls.__mro__.index(Processor)]):
+            if "pre_process" not in vars(klass):
+                continue
+            name = vars(klass).get("pre_process_rewrite")
+            if name is None:
+                return lambda attributes: list(cls.pre_process(attributes))
+            rewrites.append(getattr(cls, name))
+
+        ranks: Dict[str, int] = {}
+        for i, name in enumerate(cls.attribute_names):
+            # NOTE: the first occurrence of a name gives its rank, as tuple.index does
+            ranks.setdefault(name, i)
+        return PreProcessPlan(ranks, tuple(rewrites))
+
 
 processors_registry: Dict[str, Type[Processor]] = {}
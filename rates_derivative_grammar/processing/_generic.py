@@ -1,6 +1,5 @@
 # pylint: disable=no-member
 from functools import reduce
-from itertools import chain
 from operator import mul, attrgetter
 from typing import Iterable, List, Tuple
 
@@ -8,7 +7,7 @@ from lark import Tree, Token
 
 from ._base import Processor
 from ..conversion import NotionalUnitConverter, NotionalNumberConverter, IsRelativeConverter, FullStrikeBpConverter
-from ..utils import Node, to_name
+from ..utils import Node, SlimTree, to_name
 
 __all__ = [
     "SingleSizeProcessorMixin",
@@ -23,7 +22,7 @@ class BaseSizeProcessor:
     def make_size_tree(attribute_name: str, children: List[Node]) -> Tree:
         if "notional_unit" in list(map(attrgetter("type"), children)):
             children = [Token("notional", reduce(mul, map(attrgetter("value"), children)))]
-        return Tree(attribute_name, children)
+        return SlimTree(attribute_name, children)
 
     @staticmethod
     def format_size(size: Token) -> List[Token]:
@@ -36,64 +35,84 @@ class BaseSizeProcessor:
 
 class SingleSizeProcessorMixin(Processor, BaseSizeProcessor):
     attribute_names: Tuple[str, ...] = ("size",)
+    pre_process_rewrite = "format_single_size"
 
     def size(self, children: List[Node]) -> Tree:
         return self.make_size_tree("size", children)
 
     @classmethod
     def pre_process(cls, attributes: Iterable[Tree]) -> Iterable[Tree]:
-        for attribute in super().pre_process(attributes):
+        return cls.format_single_size(list(super().pre_process(attributes)))
+
+    @classmethod
+    def format_single_size(cls, attributes: List[Node]) -> List[Node]:
+        for attribute in attributes:
             if to_name(attribute) == "size":
                 attribute.children = cls.format_size(attribute.children[0])
-            yield attribute
+        return attributes
 
 
 class MultiSizeProcessorMixin(Processor, BaseSizeProcessor):
     attribute_names: Tuple[str, ...] = ("size",)
+    pre_process_rewrite = "format_multi_size"
 
     def swap_size(self, children: List[Node]) -> Tree:
         return self.make_size_tree("swap_size", children)
 
     @classmethod
     def pre_process(cls, attributes: Iterable[Tree]) -> Iterable[Tree]:
-        for attribute in super().pre_process(attributes):
+        return cls.format_multi_size(list(super().pre_process(attributes)))
+
+    @classmethod
+    def format_multi_size(cls, attributes: List[Node]) -> List[Node]:
+        for attribute in attributes:
             if to_name(attribute) == "size":
                 children = []
                 for size in attribute.children:
                     children.extend(cls.format_size(size))
                 attribute.children = children
-            yield attribute
+        return attributes
 
 
 class RelativeStrikeProcessorMixin(Processor):
     attribute_names: Tuple[str, ...] = ("is_relative", "strike")
+    pre_process_rewrite = "merge_relative_strike"
 
     def strike(self, children: List[Node]) -> Tree:
         if "is_relative" in map(attrgetter("type"), children):
-            return Tree("strike_info", [Tree("is_relative", [children.pop(0)]), Tree("strike", children)])
-        return Tree("strike", children)
+            return SlimTree("strike_info", [SlimTree("is_relative", [children.pop(0)]), SlimTree("strike", children)])
+        return SlimTree("strike", children)
 
     @classmethod
     def pre_process(cls, attributes: Iterable[Tree]) -> Iterable[Tree]:
-        iterable = iter(super().pre_process(attributes))
+        return cls.merge_relative_strike(list(super().pre_process(attributes)))
+
+    @staticmethod
+    def merge_relative_strike(attributes: List[Node]) -> List[Node]:
+        nodes = []
+        iterable = iter(attributes)
         for attribute in iterable:
             if to_name(attribute) == "IS_RELATIVE":
-                strike = next(iterable)
-                if to_name(strike) != "strike":
+                strike = next(iterable, None)
+                if strike is None or to_name(strike) != "strike":
                     raise ValueError("'is_relative' attribute must be immediately followed by 'strike' attribute.")
-                yield Tree(
-                    "strike",
-                    [
-                        Token(IsRelativeConverter.name, attribute.value),
-                        Token(FullStrikeBpConverter.name, strike.children[0].value),
-                    ],
+                nodes.append(
+                    SlimTree(
+                        "strike",
+                        [
+                            Token(IsRelativeConverter.name, attribute.value),
+                            Token(FullStrikeBpConverter.name, strike.children[0].value),
+                        ],
+                    )
                 )
             else:
-                yield attribute
+                nodes.append(attribute)
+        return nodes
 
 
 class LeverageScheduleProcessorMixin(Processor):
     attribute_names: Tuple[str, ...] = ("start_time", "end_time")
+    pre_process_rewrite = "interleave_schedule"
 
     def schedule(self, children: List[Node]) -> Tree:
         start_times: List[Token] = []
@@ -105,22 +124,26 @@ class LeverageScheduleProcessorMixin(Processor):
                 end_times.extend(child.children)
             else:
                 raise NotImplementedError()
-        children = [Tree("start_time", start_times), Tree("end_time", end_times)]
-        return Tree("schedule", children)
+        children = [SlimTree("start_time", start_times), SlimTree("end_time", end_times)]
+        return SlimTree("schedule", children)
 
     @classmethod
     def pre_process(cls, attributes: Iterable[Tree]) -> Iterable[Tree]:
-        iterable = iter(super().pre_process(attributes))
+        return cls.interleave_schedule(list(super().pre_process(attributes)))
+
+    @staticmethod
+    def interleave_schedule(attributes: List[Node]) -> List[Node]:
+        nodes = []
+        iterable = iter(attributes)
         for attribute in iterable:
             if to_name(attribute) == "start_time":
-                start_times = map(lambda t: Tree("start_time", [t]), attribute.children)
-                end_times = next(iterable)
-
-                if to_name(end_times) != "end_time":
+                end_times = next(iterable, None)
+                if end_times is None or to_name(end_times) != "end_time":
                     raise ValueError("'start_time' attribute must be immediately followed by 'end_time' attribute.")
-                end_times = map(lambda t: Tree("end_time", [t]), end_times.children)
 
-                for tree in chain.from_iterable(zip(start_times, end_times)):
-                    yield tree
+                for start_time, end_time in zip(attribute.children, end_times.children):
+                    nodes.append(SlimTree("start_time", [start_time]))
+                    nodes.append(SlimTree("end_time", [end_time]))
             else:
-                yield attribute
+                nodes.append(attribute)
+        return nodes
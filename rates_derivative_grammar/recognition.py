@@ -0,0 +1,248 @@
+from collections import defaultdict, deque
+from functools import lru_cache
+from math import isinf
+from typing import Dict, FrozenSet, List, NamedTuple, Set, Tuple, Type, Union
+
+from lark import Lark, Token
+from lark.exceptions import UnexpectedCharacters, UnexpectedEOF
+from lark.grammar import NonTerminal, Symbol
+from lark.parsers import xearley
+from lark.parsers.earley_common import Item
+
+from .conversion import TokenConverterRegistry, TokenConverterRegistrationError
+from .conversion._base import TokenConverter
+from .utils import PredictOnceParser, to_path_root
+
+
+__all__ = ["Recognizer", "Rejection"]
+
+
+class Rejection(NamedTuple):
+    """
+    the reason a string is not a valid product. Rejections are falsy, so that the result of validate can be tested as
+    a boolean.
+    """
+
+    # the position in the string at which it stops being valid (the length of the string if it ends too early)
+    position: int
+    # the terminals expected at the position, by name in the grammar files
+    expected: Tuple[str, ...]
+    message: str
+
+    def __bool__(self) -> bool:
+        return False
+
+
+@lru_cache(maxsize=65536)
+def _is_convertible(converter: Type[TokenConverter], name: str, value: str) -> bool:
+    try:
+        converter.from_token(Token(name, value))
+    except Exception:
+        return False
+    return True
+
+
+class Recognizer(PredictOnceParser):
+    """
+    an earley parser that only recognises strings: it builds the earley chart of a string, without the parse forest
+    (the SPPF nodes & tokens lark attaches to the items of the chart), then reads the product recognised from the
+    items completed over the whole string. The forest is only built when several products are recognised, to pick
+    the one parsing the string would (from the priorities of their rules).
+
+    The terminals with a converter (f.ex. DATE) only match the strings their converter accepts, so that strings such
+    as 31FEB20 are rejected like parsing them would fail.
+    The recognizer shares the compiled grammar (the predictions & the terminal patterns) of the parser it is made
+    from. Each start rule must expand to a single symbol (the product).
+    """
+
+    # the symbols of the products of each start rule
+    products: Dict[NonTerminal, FrozenSet[Symbol]]
+
+    @classmethod
+    def from_parser(cls, parser: Lark) -> "Recognizer":
+        """
+        Args:
+            parser: a lark parser with the earley parser & the dynamic lexer (lark's default)
+
+        Returns: a recognizer of the strings of the parser's grammar
+
+        """
+        frontend = parser.parser
+        if not isinstance(frontend.parser, xearley.Parser):
+            raise ValueError("Only earley parsers with the dynamic lexer can be turned into recognizers.")
+
+        recognizer = cls.__new__(cls)
+        recognizer.__dict__.update(frontend.parser.__dict__)
+
+        products: Dict[NonTerminal, Set[Symbol]] = {NonTerminal(start): set() for start in parser.options.start}
+        for rule in recognizer.parser_conf.rules:
+            if rule.origin in products:
+                if len(rule.expansion) != 1:
+                    raise ValueError(f"The start rule {rule} does not expand to a single symbol.")
+                products[rule.origin].add(rule.expansion[0])
+        recognizer.products = {start: frozenset(symbols) for start, symbols in products.items()}
+
+        regexps = frontend.regexps
+        converters: Dict[str, Type[TokenConverter]] = {}
+        for definition in parser.terminals:
+            try:
+                converters[definition.name] = TokenConverterRegistry.get(definition.name)
+            except TokenConverterRegistrationError:
+                pass
+
+        def match(terminal, text: str, index: int = 0):
+            m = regexps[terminal.name].match(text, index)
+            if m is not None and terminal.name in converters:
+                # converter classes are hashable, mypy checks their __hash__ as an instance method
+                if not _is_convertible(converters[terminal.name], terminal.name, m.group(0)):  # type: ignore[arg-type]
+                    return None
+            return m
+
+        recognizer.term_matcher = match
+        return recognizer
+
+    def parse(self, stream: str, start: str) -> str:
+        """
+        Returns: the name of the symbol of the start rule recognised (the product type)
+        """
+        start_symbol = NonTerminal(start)
+        columns, to_scan = self._predict_start(start_symbol)
+        to_scan = self._recognize(stream, columns, to_scan, start_symbol)
+
+        products = self.products[start_symbol]
+        recognised = {item.s for item in columns[-1] if item.is_complete and item.start == 0 and item.s in products}
+        if not recognised:
+            raise UnexpectedEOF([item.expect for item in to_scan])
+        if len(recognised) == 1:
+            return next(iter(recognised)).name
+        return self._resolve(stream, start_symbol)
+
+    def _predict_start(self, start_symbol: NonTerminal) -> Tuple[List[Set[Item]], Set[Item]]:
+        columns: List[Set[Item]] = [set()]
+        to_scan = set()
+        for rule in self.predictions[start_symbol]:
+            item = Item(rule, 0, 0)
+            if item.expect in self.TERMINALS:
+                to_scan.add(item)
+            else:
+                columns[0].add(item)
+        return columns, to_scan
+
+    def _recognize(
+        self, stream: str, columns: List[Set[Item]], to_scan: Set[Item], start_symbol: NonTerminal
+    ) -> Set[Item]:
+        """
+        builds the earley chart of the string in columns.
+
+        NOTE: same as xearley.Parser._parse & PredictOnceParser.predict_and_complete, except that no SPPF node nor
+        token is made: the items of the chart only depend on their rule, position & start, so the chart is the same.
+        Joop Leo's transitives are left out, as lark does not create them either.
+
+        Returns: the items expecting a terminal at the end of the string
+        """
+        terminals, non_terminals, predictions = self.TERMINALS, self.NON_TERMINALS, self.predictions
+        match, ignore, complete_lex = self.term_matcher, self.ignore, self.complete_lex
+        # the items to advance (or to carry over, past ignored characters) by end position of the terminal matched
+        delayed_matches: Dict[int, List[Tuple[Item, bool]]] = defaultdict(list)
+
+        def predict_and_complete(i: int, to_scan: Set[Item]) -> None:
+            column = columns[i]
+            # the symbols completed by an empty match at i, and the symbols predicted at i (see PredictOnceParser)
+            held_completions, predicted = set(), set()
+            items = deque(column)
+            while items:
+                item = items.pop()
+                if item.is_complete:
+                    if item.start == i:
+                        held_completions.add(item.rule.origin)
+                    new_items = [
+                        originator.advance()
+                        for originator in columns[item.start]
+                        if originator.expect is not None and originator.expect == item.s
+                    ]
+                elif item.expect in non_terminals:
+                    new_items = []
+                    if item.expect not in predicted:
+                        predicted.add(item.expect)
+                        new_items.extend(Item(rule, 0, i) for rule in predictions[item.expect])
+                    if item.expect in held_completions:
+                        new_items.append(item.advance())
+                else:
+                    continue
+
+                for new_item in new_items:
+                    if new_item.expect in terminals:
+                        to_scan.add(new_item)
+                    elif new_item not in column:
+                        column.add(new_item)
+                        items.append(new_item)
+
+        def scan(i: int, to_scan: Set[Item]) -> Set[Item]:
+            for item in set(to_scan):
+                m = match(item.expect, stream, i)
+                if m:
+                    delayed_matches[m.end()].append((item, True))
+                    if complete_lex:
+                        s = m.group(0)
+                        for j in range(1, len(s)):
+                            m = match(item.expect, s[:-j])
+                            if m:
+                                delayed_matches[i + m.end()].append((item, True))
+                    to_scan.remove(item)
+
+            for terminal in ignore:
+                m = match(terminal, stream, i)
+                if m:
+                    delayed_matches[m.end()].extend((item, False) for item in to_scan)
+                    delayed_matches[m.end()].extend(
+                        (item, False) for item in columns[i] if item.is_complete and item.s == start_symbol
+                    )
+
+            next_to_scan: Set[Item] = set()
+            next_set: Set[Item] = set()
+            columns.append(next_set)
+            for item, advance in delayed_matches.pop(i + 1, ()):
+                new_item = item.advance() if advance else item
+                if new_item.expect in terminals:
+                    next_to_scan.add(new_item)
+                else:
+                    next_set.add(new_item)
+
+            if not next_set and not delayed_matches and not next_to_scan:
+                line, column = stream.count("\n", 0, i) + 1, i - stream.rfind("\n", 0, i)
+                expected = {item.expect.name for item in to_scan}
+                raise UnexpectedCharacters(stream, i, line, column, expected, set(to_scan))
+            return next_to_scan
+
+        for i in range(len(stream)):
+            predict_and_complete(i, to_scan)
+            to_scan = scan(i, to_scan)
+        predict_and_complete(len(stream), to_scan)
+        return to_scan
+
+    def _resolve(self, stream: str, start_symbol: NonTerminal) -> str:
+        """
+        Returns: the product picked among the products recognised by the priorities of their rules, as when building
+        the tree: the parse forest of the string is built, though not converted into a tree
+        """
+        columns, to_scan = self._predict_start(start_symbol)
+        self._parse(stream, columns, to_scan, start_symbol)
+        root = next(
+            n.node for n in columns[-1] if n.is_complete and n.node is not None and n.s == start_symbol and n.start == 0
+        )
+        if self.forest_sum_visitor and root.is_ambiguous and isinf(root.priority):
+            self.forest_sum_visitor().visit(root)
+        return next(iter(root.children)).rule.expansion[0].name
+
+    def recognize(self, string: str) -> Union[str, Rejection]:
+        """
+        Returns: the product type of the string, or the reason it is rejected
+        """
+        try:
+            return self.parse(string, "start")
+        except UnexpectedCharacters as e:
+            expected = tuple(sorted({to_path_root(name) for name in e.allowed or ()}))
+            return Rejection(e.pos_in_stream, expected, f"Unexpected character {string[e.pos_in_stream]!r}.")
+        except UnexpectedEOF as e:
+            expected = tuple(sorted({to_path_root(terminal.name) for terminal in e.expected}))
+            return Rejection(len(string), expected, "Unexpected end of string.")
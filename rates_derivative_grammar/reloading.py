@@ -0,0 +1,219 @@
+from glob import glob
+import hashlib
+import os
+import re
+from threading import Event, Lock, Thread
+from typing import Dict, Iterable, Optional, Set, Tuple, Union
+from weakref import WeakSet
+
+from lark.load_grammar import EXT
+
+from .parsers import GRAMMAR_PATH, AssetClassFormatter, AssetClassParser
+from .utils import PATH_DELIMITER, evict_imported_grammars
+
+__all__ = ["GrammarReloader"]
+
+# f.ex. "%import .common.shared (time, size)" or "%import .common.custom.CURRENCY -> _currency"
+IMPORT_PATTERN = re.compile(r"^%import\s+(\.?)([\w.]+)\s*(\()?", re.MULTILINE)
+
+Target = Union[AssetClassParser, AssetClassFormatter]
+
+
+class GrammarReloader:
+    """
+    reloads the grammar of the parsers & formatters of a grammar folder when its grammar files change, without
+    restarting them.
+
+    The files are compared to the last time they were reloaded by modification time (or by content hash). Only the
+    products whose grammar file, or one of the files it imports (transitively), changed are compiled again: the files
+    changed are evicted from the memo of the grammars imported from the folder, while the grammars of the other files
+    are reused. The parsers & formatters swap in the new grammar once it is compiled, so that the calls in flight
+    finish with the previous one.
+    """
+
+    def __init__(self, grammar_path: Optional[str] = None, *, method: str = "mtime"):
+        """
+
+        Args:
+            grammar_path: the folder containing the grammar files, defaults to the grammar of the package
+            method: how changes are detected, "mtime" by modification time & size of the files or "hash" by hash of
+            their content
+
+        """
+        if method not in ("mtime", "hash"):
+            raise ValueError(f"Unknown method {method!r}, expected 'mtime' or 'hash'.")
+
+        self.grammar_path = os.path.abspath(grammar_path or GRAMMAR_PATH)
+        self.method = method
+        # the error raised by the last reload of the background thread, if it failed (see start)
+        self.last_error: Optional[Exception] = None
+
+        self._targets: WeakSet = WeakSet()
+        self._lock = Lock()
+        # the signature & the files imported of each grammar file when last reloaded, by path relative to the folder
+        self._signatures = self._scan()
+        self._imports = {path: self._read_imports(path) for path in self._signatures}
+
+        self._stopped = Event()
+        self._thread: Optional[Thread] = None
+
+    def register(self, *targets: Target) -> None:
+        """
+        registers parsers & formatters to reload. They are held by weak reference, so that registering them does not
+        keep them alive.
+
+        Args:
+            *targets: the parsers & formatters of the grammar folder
+
+        """
+        for target in targets:
+            if os.path.abspath(target.grammar_path) != self.grammar_path:
+                raise ValueError(f"The grammar of {target!r} is not in {self.grammar_path}: {target.grammar_path}.")
+            self._targets.add(target)
+
+    def changes(self) -> Set[str]:
+        """
+        Returns: the grammar files added, changed or removed since the last reload, relative to the grammar folder
+        """
+        return self._diff(self._scan())
+
+    def reload(self) -> Dict[str, Set[str]]:
+        """
+        compiles again the grammar of the products affected by the files changed since the last reload, and swaps it
+        into the parsers & formatters registered. If the grammar of a target fails to compile (f.ex. a syntax error in
+        a file) the target keeps its previous grammar, the error being raised once the other targets are reloaded.
+
+        Returns: the product types reloaded by asset class as {asset_class: {product_type}}
+
+        """
+        with self._lock:
+            signatures = self._scan()
+            changed = self._diff(signatures)
+            if not changed:
+                return {}
+
+            imports = {path: self._imports[path] for path in signatures if path not in changed}
+            imports.update((path, self._read_imports(path)) for path in changed if path in signatures)
+            # the files importing a file changed are affected, whether they import it before or after the change
+            affected = self._with_importers(changed, [self._imports, imports])
+            evict_imported_grammars(self.grammar_path, (os.path.join(self.grammar_path, path) for path in affected))
+            self._signatures, self._imports = signatures, imports
+
+            products = self._to_products(affected)
+            error = None
+            for target in list(self._targets):
+                if target.asset_class in products:
+                    try:
+                        target.reload(products[target.asset_class])
+                    except Exception as e:
+                        error = error or e
+            if error is not None:
+                raise error
+            return products
+
+    def start(self, interval: float = 1.0) -> None:
+        """
+        starts reloading the grammar files as they change, in a background thread checking them every interval
+
+        Args:
+            interval: the seconds between two checks of the grammar files
+
+        """
+        self.stop()
+        self._stopped.clear()
+        self._thread = Thread(target=self._run, args=(interval,), name="grammar-reloader", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """ stops reloading the grammar files in the background, once the reload in progress is done """
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stopped.set()
+            thread.join()
+
+    def _run(self, interval: float) -> None:
+        while not self._stopped.wait(interval):
+            try:
+                self.reload()
+            except Exception as e:
+                self.last_error = e
+
+    def _scan(self) -> Dict[str, Tuple]:
+        """
+        Returns: the signature of each grammar file of the folder as {path relative to the folder: signature}
+        """
+        signatures = {}
+        for file_path in glob(os.path.join(self.grammar_path, "**", f"*{EXT}"), recursive=True):
+            path = os.path.relpath(file_path, self.grammar_path)
+            try:
+                if self.method == "hash":
+                    with open(file_path, "rb") as f:
+                        signatures[path] = (hashlib.sha1(f.read()).digest(),)
+                else:
+                    stat = os.stat(file_path)
+                    signatures[path] = (stat.st_mtime_ns, stat.st_size)
+            except FileNotFoundError:
+                # removed while scanning
+                pass
+        return signatures
+
+    def _diff(self, signatures: Dict[str, Tuple]) -> Set[str]:
+        paths = signatures.keys() | self._signatures.keys()
+        return {path for path in paths if signatures.get(path) != self._signatures.get(path)}
+
+    def _read_imports(self, path: str) -> Set[str]:
+        """
+        Returns: the grammar files of the folder imported by a grammar file, relative to the folder
+        """
+        file_path = os.path.join(self.grammar_path, path)
+        try:
+            with open(file_path, encoding="utf8") as f:
+                text = f.read()
+        except FileNotFoundError:
+            return set()
+
+        imports = set()
+        for relative, dotted_path, multi in IMPORT_PATTERN.findall(text):
+            # NOTE: the last name of a single import is the name of the rule or terminal imported
+            parts = dotted_path.split(".") if multi else dotted_path.split(".")[:-1]
+            # relative imports are resolved next to the importing file, library imports in the folder (lark's
+            # library, f.ex. common.DIGIT, is not watched)
+            base_path = os.path.dirname(file_path) if relative else self.grammar_path
+            imported = os.path.join(base_path, *parts) + EXT
+            if os.path.exists(imported):
+                imports.add(os.path.relpath(imported, self.grammar_path))
+        return imports
+
+    @staticmethod
+    def _with_importers(paths: Set[str], graphs: Iterable[Dict[str, Set[str]]]) -> Set[str]:
+        """
+        Returns: the paths & the paths importing them, transitively, in any of the graphs of imports
+        """
+        importers: Dict[str, Set[str]] = {}
+        for graph in graphs:
+            for path, imported in graph.items():
+                for imported_path in imported:
+                    importers.setdefault(imported_path, set()).add(path)
+
+        affected, to_visit = set(paths), list(paths)
+        while to_visit:
+            for importer in importers.get(to_visit.pop(), ()):
+                if importer not in affected:
+                    affected.add(importer)
+                    to_visit.append(importer)
+        return affected
+
+    @staticmethod
+    def _to_products(paths: Iterable[str]) -> Dict[str, Set[str]]:
+        """
+        Returns: the product types of the product grammar files (f.ex. linear_rate__fra.lark) among paths, by asset
+        class
+        """
+        products: Dict[str, Set[str]] = {}
+        for path in paths:
+            name = path[: -len(EXT)]
+            if os.path.dirname(path) or PATH_DELIMITER not in name:
+                continue
+            asset_class, product_type = name.split(PATH_DELIMITER, 1)
+            products.setdefault(asset_class, set()).add(product_type)
+        return products
@@ -0,0 +1,220 @@
+from bisect import bisect_right
+import calendar
+from datetime import date, timedelta
+from functools import lru_cache
+import re
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Pattern
+
+from lark import Lark
+
+from .conversion import DateConverter
+from .parsers import GRAMMAR_PATH  # noqa: F401 (registers the grammar folder in lark's import paths)
+
+__all__ = ["TimeResolver", "BusinessDayCalendar", "third_wednesday", "TIME_TERMINALS"]
+
+# the terminals of the grammar (in common/tenors.lark) whose values are resolved to dates
+TIME_TERMINALS = ("FLOAT_TENOR", "IMM_TENOR", "RELATIVE_QUARTERLY_IMM", "ABSOLUTE_QUARTERLY_IMM")
+
+IMM_MONTH_CODES = "FGHJKMNQUVXZ"
+QUARTER_END_MONTHS = (3, 6, 9, 12)
+
+# the years covered by the precomputed tables of imm dates
+IMM_YEARS = range(1950, 2200)
+
+TENOR_PATTERN = re.compile(r"([0-9]+(?:\.[0-9]+)?)([DBWMY])")
+
+
+def third_wednesday(year: int, month: int) -> date:
+    """
+    Returns: the imm date of the month, i.e. its third wednesday
+    """
+    first = date(year, month, 1)
+    return first + timedelta(days=(calendar.WEDNESDAY - first.weekday()) % 7 + 14)
+
+
+# the imm date of each month as {(year, month): date}
+IMM_DATES = {(year, month): third_wednesday(year, month) for year in IMM_YEARS for month in range(1, 13)}
+# the quarterly imm dates, sorted
+QUARTERLY_IMM_DATES = sorted(IMM_DATES[year, month] for year in IMM_YEARS for month in QUARTER_END_MONTHS)
+
+
+@lru_cache(maxsize=None)
+def make_time_patterns() -> Dict[str, Pattern]:
+    """
+    Returns: the regular expression of each time terminal of the grammar
+    """
+    grammar = Lark(f"%import common.tenors ({', '.join(TIME_TERMINALS)})\nstart: {' | '.join(TIME_TERMINALS)}")
+    return {terminal.name: re.compile(terminal.pattern.to_regexp()) for terminal in grammar.terminals}
+
+
+class BusinessDayCalendar:
+    """
+    a calendar of business days: the days that are neither on a weekend nor a holiday.
+    """
+
+    def __init__(
+        self, holidays: Iterable[date] = (), *, weekend: Iterable[int] = (calendar.SATURDAY, calendar.SUNDAY)
+    ):
+        self.holidays: FrozenSet[date] = frozenset(holidays)
+        self.weekend: FrozenSet[int] = frozenset(weekend)
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "BusinessDayCalendar":
+        """
+
+        Args:
+            path: a file listing a holiday per line in iso format (f.ex. 2025-12-25). Empty lines and lines starting
+            with # are ignored.
+            **kwargs: the other arguments of the calendar
+
+        Returns: the calendar
+
+        """
+        holidays = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    holidays.append(date.fromisoformat(line))
+        return cls(holidays, **kwargs)
+
+    def is_business_day(self, day: date) -> bool:
+        return day.weekday() not in self.weekend and day not in self.holidays
+
+    def roll(self, day: date) -> date:
+        """
+        Returns: the day rolled to a business day following the modified following convention
+        """
+        rolled = day
+        while not self.is_business_day(rolled):
+            rolled += timedelta(days=1)
+        if rolled.month != day.month:
+            rolled = day
+            while not self.is_business_day(rolled):
+                rolled -= timedelta(days=1)
+        return rolled
+
+    def add_business_days(self, day: date, count: int) -> date:
+        """
+        Returns: the day count business days after the day specified
+        """
+        while count > 0:
+            day += timedelta(days=1)
+            if self.is_business_day(day):
+                count -= 1
+        return day
+
+
+def add_months(day: date, months: int) -> date:
+    """
+    Returns: the day months later, on the last day of the month when the month is shorter
+    """
+    year, month = divmod(day.month - 1 + months, 12)
+    year += day.year
+    return date(year, month + 1, min(day.day, calendar.monthrange(year, month + 1)[1]))
+
+
+class TimeResolver:
+    """
+    resolves the time attributes of products (start_time, end_time) to dates given a valuation date:
+     - tenors (f.ex. 2D, 3B, 1W, 6M, 4.25Y) are added to the valuation date
+     - imm codes (f.ex. U9) resolve to the imm date of the month in the first year ending with the digit that is not
+     before the valuation date
+     - relative quarterly imm (f.ex. IMM_1) resolve to the n-th quarterly imm date after the valuation date
+     - absolute quarterly imm (f.ex. IMM_MAR25) resolve to the imm date of the month
+     - dates are left as is
+
+    The values are recognised with the patterns of the grammar's terminals, and the imm dates are read from precomputed
+    tables. Resolved dates are memoized by (valuation_date, value).
+    When a calendar is specified, the dates resolved are rolled to business days (modified following) and business
+    day tenors count its business days. Without calendar, dates are not rolled and business days are week days.
+    """
+
+    def __init__(self, calendar: Optional[BusinessDayCalendar] = None):
+        self.calendar = calendar
+        self._business_days = calendar or BusinessDayCalendar()
+        self.patterns = make_time_patterns()
+
+    def resolve(self, valuation_date: date, value: Any) -> Any:
+        """
+
+        Args:
+            valuation_date: the date the values are relative to
+            value: a time value, or a list of time values (f.ex. the start times of a curve)
+
+        Returns: the date of the value (or the list of dates)
+
+        """
+        if isinstance(value, date):
+            return value
+        if isinstance(value, (list, tuple)):
+            return [self.resolve(valuation_date, item) for item in value]
+        return self._resolve(valuation_date, str(value))
+
+    def resolve_many(self, valuation_date: date, values: Iterable[Any]) -> List[Any]:
+        """
+        resolves a column of time values: each distinct value is only resolved once.
+
+        Args:
+            valuation_date: the date the values are relative to
+            values: the values to resolve (see resolve)
+
+        Returns: the dates of the values, in the order of the values
+
+        """
+        resolved: Dict[Any, Any] = {}
+        results = []
+        for value in values:
+            if isinstance(value, (list, tuple)):
+                results.append(self.resolve(valuation_date, value))
+                continue
+            try:
+                result = resolved[value]
+            except KeyError:
+                result = resolved[value] = self.resolve(valuation_date, value)
+            results.append(result)
+        return results
+
+    @lru_cache(maxsize=65536)
+    def _resolve(self, valuation_date: date, value: str) -> date:
+        patterns = self.patterns
+        if patterns["FLOAT_TENOR"].fullmatch(value):
+            return self._resolve_tenor(valuation_date, value)
+
+        if patterns["IMM_TENOR"].fullmatch(value):
+            month = IMM_MONTH_CODES.index(value[0]) + 1
+            year = valuation_date.year + (int(value[1]) - valuation_date.year) % 10
+            day = IMM_DATES[year, month]
+            if day < valuation_date:
+                day = IMM_DATES[year + 10, month]
+            return self._roll(day)
+
+        if patterns["RELATIVE_QUARTERLY_IMM"].fullmatch(value):
+            index = bisect_right(QUARTERLY_IMM_DATES, valuation_date) + int(value[len("IMM_") :]) - 1
+            return self._roll(QUARTERLY_IMM_DATES[index])
+
+        if patterns["ABSOLUTE_QUARTERLY_IMM"].fullmatch(value):
+            month_date = DateConverter.from_token(f"1{value[len('IMM_') :]}")
+            return self._roll(IMM_DATES[month_date.year, month_date.month])
+
+        raise ValueError(f"Cannot resolve time value: {value}.")
+
+    def _resolve_tenor(self, valuation_date: date, value: str) -> date:
+        count, unit = TENOR_PATTERN.fullmatch(value).groups()
+        count = float(count)
+
+        if unit == "Y":
+            count, unit = count * 12, "M"
+        elif unit == "W":
+            count, unit = count * 7, "D"
+        if not count.is_integer():
+            raise ValueError(f"Cannot resolve a fractional number of {unit}: {value}.")
+
+        if unit == "B":
+            return self._business_days.add_business_days(valuation_date, int(count))
+        if unit == "D":
+            return self._roll(valuation_date + timedelta(days=int(count)))
+        return self._roll(add_months(valuation_date, int(count)))
+
+    def _roll(self, day: date) -> date:
+        return day if self.calendar is None else self.calendar.roll(day)
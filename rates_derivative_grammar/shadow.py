@@ -0,0 +1,195 @@
+from queue import Full, Queue
+from random import Random
+from threading import Lock, Thread
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
+
+__all__ = ["ShadowComparator", "ShadowReport", "Mismatch"]
+
+ParseResult = Tuple[str, Dict[str, Any]]
+
+
+class Mismatch(NamedTuple):
+    string: str
+    # the results of the primary & secondary parsers, or the exceptions they raised
+    primary: Union[ParseResult, Exception]
+    secondary: Union[ParseResult, Exception]
+
+
+class ShadowReport(NamedTuple):
+    # the number of parses of the primary parser
+    parses: int
+    # the number of parses sampled, compared and dropped (as the queue was full or the overhead over its cap)
+    sampled: int
+    compared: int
+    dropped: int
+    # the number of results compared that differ (including the strings only one of the parsers could parse)
+    mismatches: int
+    # the time taken by each parser to parse the strings compared, in seconds
+    primary_seconds: float
+    secondary_seconds: float
+    # the first mismatches found
+    examples: List[Mismatch]
+
+    @property
+    def agreement(self) -> float:
+        """
+        Returns: the share of the results compared that agree
+        """
+        return 1 - self.mismatches / self.compared if self.compared else 1.0
+
+    @property
+    def relative_latency(self) -> float:
+        """
+        Returns: the time taken by the secondary parser relative to the primary parser on the strings compared
+        """
+        return self.secondary_seconds / self.primary_seconds if self.primary_seconds else 0.0
+
+
+class ShadowComparator:
+    """
+    compares the results of a primary parser with a secondary parser (f.ex. configured with another lark backend) on a
+    sample of the strings parsed, off the hot path.
+
+    The primary parser submits its results, and a sample of them is queued to a background thread that parses their
+    string again with the secondary parser and compares the results. Submitting never blocks nor raises: the samples
+    are dropped when the queue is full, or when the time spent parsing with the secondary parser is over max_overhead
+    of the time spent parsing with the primary parser.
+    Strings that neither parser can parse agree, whatever the exceptions raised.
+    """
+
+    def __init__(
+        self,
+        secondary: Any,
+        *,
+        sample_rate: float = 0.01,
+        max_overhead: float = 0.1,
+        queue_size: int = 1000,
+        max_examples: int = 100,
+        seed: Optional[int] = None,
+    ):
+        """
+
+        Args:
+            secondary: the parser to compare with (an AssetClassParser)
+            sample_rate: the share of the strings parsed that are compared
+            max_overhead: the cap on the time spent in the secondary parser, as a share of the time spent in the primary
+            parser
+            queue_size: the number of samples waiting to be compared above which samples are dropped
+            max_examples: the number of mismatches kept as examples
+            seed: the seed of the sampling
+
+        """
+        self.secondary = secondary
+        self.sample_rate = sample_rate
+        self.max_overhead = max_overhead
+        self.max_examples = max_examples
+
+        self._random = Random(seed)
+        self._queue: Queue = Queue(queue_size)
+        self._lock = Lock()
+        self._thread: Optional[Thread] = None
+
+        self._parses = self._sampled = self._compared = self._dropped = self._mismatches = 0
+        # the time spent in the primary parser, on all parses and on the parses compared
+        self._primary_total = self._primary_seconds = 0.0
+        self._secondary_seconds = 0.0
+        self._examples: List[Mismatch] = []
+
+    def submit(self, string: str, result: Union[ParseResult, Exception], elapsed: float) -> None:
+        """
+        submits a result of the primary parser, which is compared if sampled
+
+        Args:
+            string: the string parsed
+            result: the result of the primary parser, or the exception it raised
+            elapsed: the time taken by the primary parser in seconds
+
+        """
+        with self._lock:
+            self._parses += 1
+            self._primary_total += elapsed
+            if self._random.random() >= self.sample_rate:
+                return
+            self._sampled += 1
+            if self._secondary_seconds > self.max_overhead * self._primary_total:
+                self._dropped += 1
+                return
+
+        if not isinstance(result, Exception):
+            # the attributes are copied as the caller may update them before they are compared
+            product_type, attributes_dict = result
+            result = product_type, {k: list(v) if isinstance(v, list) else v for k, v in attributes_dict.items()}
+
+        self._start()
+        try:
+            self._queue.put_nowait((string, result, elapsed))
+        except Full:
+            with self._lock:
+                self._dropped += 1
+
+    def report(self) -> ShadowReport:
+        """
+        Returns: the comparisons made so far
+        """
+        with self._lock:
+            return ShadowReport(
+                self._parses,
+                self._sampled,
+                self._compared,
+                self._dropped,
+                self._mismatches,
+                self._primary_seconds,
+                self._secondary_seconds,
+                list(self._examples),
+            )
+
+    def flush(self) -> None:
+        """ waits until the samples queued are compared """
+        self._queue.join()
+
+    def close(self) -> None:
+        """ compares the samples queued and stops the background thread """
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _start(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = Thread(target=self._run, name="shadow-comparator", daemon=True)
+                    self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._compare(*item)
+            finally:
+                self._queue.task_done()
+
+    def _compare(self, string: str, primary: Union[ParseResult, Exception], elapsed: float) -> None:
+        start = time.perf_counter()
+        try:
+            secondary: Union[ParseResult, Exception] = self.secondary.parse(string)
+        except Exception as e:
+            secondary = e
+        secondary_elapsed = time.perf_counter() - start
+
+        if isinstance(primary, Exception) or isinstance(secondary, Exception):
+            agree = isinstance(primary, Exception) and isinstance(secondary, Exception)
+        else:
+            agree = primary == secondary
+
+        with self._lock:
+            self._compared += 1
+            self._primary_seconds += elapsed
+            self._secondary_seconds += secondary_elapsed
+            if not agree:
+                self._mismatches += 1
+                if len(self._examples) < self.max_examples:
+                    self._examples.append(Mismatch(string, primary, secondary))
@@ -1,31 +1,46 @@
-from typing import Callable
+from typing import Callable, Iterable
 
 from lark import Tree, Transformer, Token
 
 from .conversion import TokenConverterRegistry, TokenConverterRegistrationError
+from .custom_types import Tenor
+from .utils import SlimTree
 
 
-__all__ = ["RenameNodeTransformer", "FromTokenConversionTransformer"]
+__all__ = ["RenameNodeTransformer", "FromTokenConversionTransformer", "TenorInterningTransformer"]
 
 
-class RenameNodeTransformer(Transformer):
+class _NodeTransformer(Transformer):
     """
-    renames the nodes of the tree according to rename_func
+    a transformer of the tree parsed into SlimTrees. The tokens are transformed along with their parent in __default__,
+    so that they are not visited on their own.
+    """
+
+    def __init__(self):
+        super().__init__(visit_tokens=False)
+
+
+class RenameNodeTransformer(_NodeTransformer):
+    """
+    renames the nodes below the root of the tree according to rename_func. Tokens are copied instead of renamed in
+    place, while the subtrees renamed in place are the SlimTrees the transformer made from the subtrees of the tree
+    transformed (transformers rebuild the tree bottom up): the tree transformed is left untouched.
     """
 
     def __init__(self, rename_func: Callable[[str], str]):
+        super().__init__()
         self.rename_func = rename_func
 
     def __default__(self, data, children, meta):
-        for child in children:
+        for i, child in enumerate(children):
             if isinstance(child, Token):
-                child.type = self.rename_func(child.type)
+                children[i] = Token.new_borrow_pos(self.rename_func(child.type), child.value, child)
             elif isinstance(child, Tree):
                 child.data = self.rename_func(child.data)
-        return Tree(data, children, meta)
+        return SlimTree(data, children, meta)
 
 
-class FromTokenConversionTransformer(Transformer):
+class FromTokenConversionTransformer(_NodeTransformer):
     """
     converts the node values according to the converter registered. Value remains unchanged if no converter is
     registered for the node.
@@ -39,4 +54,22 @@ class FromTokenConversionTransformer(Transformer):
                 except TokenConverterRegistrationError:
                     pass
 
-        return Tree(data, children, meta)
+        return SlimTree(data, children, meta)
+
+
+class TenorInterningTransformer(_NodeTransformer):
+    """
+    replaces the values of the tokens specified by their interned Tenor, so that the products parsed share a single
+    instance of each tenor.
+    """
+
+    def __init__(self, token_names: Iterable[str]):
+        super().__init__()
+        self.token_names = frozenset(token_names)
+
+    def __default__(self, data, children, meta):
+        for i, child in enumerate(children):
+            if isinstance(child, Token) and child.type in self.token_names:
+                children[i] = Token.new_borrow_pos(child.type, Tenor(child.value), child)
+
+        return SlimTree(data, children, meta)
@@ -1,9 +1,25 @@
-from typing import Union, Iterable, Callable, Optional, Dict
+from collections import deque
+from contextlib import contextmanager
+from itertools import chain
+import os
+import string
+import sys
+from threading import RLock
+from typing import Any, Union, Iterable, Iterator, Callable, Optional, Dict, List, Tuple
 
-from lark import Token, Tree
+try:
+    from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:  # python < 3.11
+    import sre_parse  # type: ignore
+    import sre_constants  # type: ignore
+
+from lark import Token, Tree, load_grammar
 from lark.common import ParserConf
 from lark.grammar import Rule, Terminal
+from lark.parsers import xearley
 from lark.parsers.earley import Parser
+from lark.parsers.earley_common import Item
+from lark.parsers.earley_forest import SymbolNode
 from lark.parse_tree_builder import ParseTreeBuilder
 from lark.utils import classify
 from lark.reconstruct import is_discarded_terminal
@@ -11,19 +27,107 @@ from lark.reconstruct import is_discarded_terminal
 
 __all__ = [
     "Node",
+    "SlimTree",
+    "PredictOnceParser",
     "normalize",
     "denormalize",
     "to_name",
     "to_value",
+    "freeze_attributes",
     "to_path_root",
     "make_parser",
     "PATH_DELIMITER",
     "classify",
     "is_discarded_terminal",
     "is_inline_rule",
+    "is_gil_enabled",
+    "default_workers",
+    "imported_grammars",
+    "evict_imported_grammars",
+    "iter_regexp_examples",
 ]
 
 
+class SlimTree(Tree):
+    """
+    a lark Tree whose meta is never allocated: lark's Tree allocates an empty Meta whenever its meta is read (f.ex. by
+    each transformer rebuilding the tree), while the meta of a SlimTree is None unless one is passed. Parsers
+    propagating positions build lark's Trees, as lark writes the positions in the meta.
+
+    NOTE: the tree is not slotted, lark's Tree having no __slots__ each instance keeps its __dict__ anyway. It remains a
+    Tree so that lark's transformers, visitors & reconstructor handle it.
+    """
+
+    @property
+    def meta(self):
+        return self._meta
+
+
+class PredictOnceParser(xearley.Parser):
+    """
+    lark's earley parser with the dynamic lexer, predicting each symbol once per column of the chart: lark predicts
+    the rules of a symbol for every item expecting it, making an item per rule each time only to drop those already in
+    the column. The predictions of a symbol only depend on the symbol & the column, so the chart is the same.
+    """
+
+    def predict_and_complete(self, i, to_scan, columns, transitives):
+        # NOTE: same as earley.Parser.predict_and_complete, except for the symbols predicted. Joop Leo's transitives
+        # are left out as lark does not create them.
+        terminals, non_terminals, predictions = self.TERMINALS, self.NON_TERMINALS, self.predictions
+        node_cache: Dict[Tuple, SymbolNode] = {}
+        held_completions: Dict[Any, SymbolNode] = {}
+        predicted = set()
+
+        def to_node(label: Tuple) -> SymbolNode:
+            node = node_cache.get(label)
+            if node is None:
+                node = node_cache[label] = SymbolNode(*label)
+            return node
+
+        column = columns[i]
+        items = deque(column)
+        while items:
+            item = items.pop()
+
+            if item.is_complete:
+                if item.node is None:
+                    item.node = to_node((item.s, item.start, i))
+                    item.node.add_family(item.s, item.rule, item.start, None, None)
+
+                if item.start == i:
+                    held_completions[item.rule.origin] = item.node
+
+                new_items = []
+                for originator in [o for o in columns[item.start] if o.expect is not None and o.expect == item.s]:
+                    new_item = originator.advance()
+                    new_item.node = to_node((new_item.s, originator.start, i))
+                    new_item.node.add_family(new_item.s, new_item.rule, i, originator.node, item.node)
+                    new_items.append(new_item)
+
+            elif item.expect in non_terminals:
+                new_items = []
+                if item.expect not in predicted:
+                    predicted.add(item.expect)
+                    new_items.extend(Item(rule, 0, i) for rule in predictions[item.expect])
+
+                if item.expect in held_completions:
+                    new_item = item.advance()
+                    new_item.node = to_node((new_item.s, item.start, i))
+                    new_item.node.add_family(
+                        new_item.s, new_item.rule, new_item.start, item.node, held_completions[item.expect]
+                    )
+                    new_items.append(new_item)
+            else:
+                continue
+
+            for new_item in new_items:
+                if new_item.expect in terminals:
+                    to_scan.add(new_item)
+                elif new_item not in column:
+                    column.add(new_item)
+                    items.append(new_item)
+
+
 Node = Union[Token, Tree]
 
 PATH_DELIMITER = "__"
@@ -65,6 +169,23 @@ def to_value(node: Node, *, expand_single_child=True):
     raise NotImplementedError()
 
 
+def freeze_attributes(attributes_dict: Dict[str, Any]) -> Tuple:
+    """
+    Returns: a hashable key identifying the attributes, f.ex. to memoize their format. Raises a TypeError if a value
+    cannot be hashed.
+    """
+    key = tuple((name, _to_typed_key(value)) for name, value in attributes_dict.items())
+    hash(key)
+    return key
+
+
+def _to_typed_key(value: Any) -> Tuple:
+    # the type of the values is part of the key as f.ex. True == 1 == 1.0 while they do not format alike
+    if isinstance(value, (list, tuple)):
+        return type(value), tuple(map(_to_typed_key, value))
+    return type(value), value
+
+
 def make_parser(
     rules: Iterable[Rule],
     start_symbol: str = "start",
@@ -85,3 +206,141 @@ def make_parser(
         match = match_func
 
     return Parser(ParserConf(rules, callbacks, [start_symbol]), match)
+
+
+def is_gil_enabled() -> bool:
+    # sys._is_gil_enabled only exists from python 3.13: older builds always have a GIL
+    return getattr(sys, "_is_gil_enabled", lambda: True)()
+
+
+def default_workers() -> int:
+    # threads only run python code in parallel on free-threaded builds
+    return (os.cpu_count() or 1) if not is_gil_enabled() else 1
+
+
+_imported_grammars_lock = RLock()
+# the grammars imported by lark by grammar folder, as {folder: {path relative to the importing file: grammar}}
+_imported_grammars: Dict[str, Dict[str, Any]] = {}
+
+
+@contextmanager
+def imported_grammars(grammar_path: Optional[str]) -> Iterator[Dict[str, Any]]:
+    """
+    makes lark memoize the grammars imported while compiling a grammar of the folder specified. Lark memoizes the
+    grammars imported in a global dict by path relative to the importing file, which would mix up the files of two
+    grammar folders and could not be evicted for a single folder (see evict_imported_grammars). Compiling grammars is
+    serialized while the memo is swapped.
+
+    Args:
+        grammar_path: the folder of the grammar files, the grammars are imported again (in a fresh memo) if None
+
+    Returns: the memo of the folder
+
+    """
+    with _imported_grammars_lock:
+        memo = {} if grammar_path is None else _imported_grammars.setdefault(os.path.abspath(grammar_path), {})
+        previous = load_grammar._imported_grammars
+        load_grammar._imported_grammars = memo
+        try:
+            yield memo
+        finally:
+            load_grammar._imported_grammars = previous
+
+
+def evict_imported_grammars(grammar_path: str, file_paths: Iterable[str]) -> List[str]:
+    """
+    evicts grammar files from the memo of the grammars imported from a folder, so that they are read again the next
+    time they are imported. Note that the grammars memoized include the grammars they import: the files importing a
+    file evicted should be evicted too.
+
+    Args:
+        grammar_path: the folder of the grammar files
+        file_paths: the paths of the files to evict
+
+    Returns: the paths evicted, relative to their importing file as memoized by lark
+
+    """
+    file_paths = [os.path.normpath(os.path.abspath(path)) for path in file_paths]
+    with _imported_grammars_lock:
+        memo = _imported_grammars.get(os.path.abspath(grammar_path), {})
+        evicted = [key for key in memo if any(path.endswith(os.sep + os.path.normpath(key)) for path in file_paths)]
+        for key in evicted:
+            del memo[key]
+    return evicted
+
+
+# the characters generated for the parts of a regular expression matching any character (f.ex. . or [^A])
+EXAMPLE_ALPHABET = string.ascii_uppercase + string.digits + string.ascii_lowercase + " .+-/_"
+
+CATEGORY_CHARACTERS = {
+    sre_constants.CATEGORY_DIGIT: string.digits,
+    sre_constants.CATEGORY_WORD: string.ascii_letters + string.digits + "_",
+    sre_constants.CATEGORY_SPACE: " ",
+}
+
+
+def iter_regexp_examples(regexp: str, *, repeat: int = 2) -> Iterator[str]:
+    """
+    enumerates strings matching a regular expression, depth first: f.ex. "[A-C][0-9]" yields A0, A1, ..., C9.
+    The enumeration is lazy, so that the first examples of a large (or infinite) language can be taken with islice.
+
+    Args:
+        regexp: the regular expression (f.ex. the pattern of a terminal of the grammar)
+        repeat: repetitions (f.ex. [0-9]* or [0-9]{1,10}) are enumerated from their minimum to their minimum plus
+        repeat times
+
+    Returns: the strings matching the regular expression
+
+    """
+    return _iter_sequence(list(sre_parse.parse(regexp)), repeat)
+
+
+def _iter_sequence(items: List, repeat: int) -> Iterator[str]:
+    if not items:
+        yield ""
+        return
+    for prefix in _iter_item(*items[0], repeat):
+        for suffix in _iter_sequence(items[1:], repeat):
+            yield prefix + suffix
+
+
+def _iter_item(op, av, repeat: int) -> Iterator[str]:
+    if op is sre_constants.LITERAL:
+        yield chr(av)
+    elif op is sre_constants.NOT_LITERAL:
+        yield from (c for c in EXAMPLE_ALPHABET if c != chr(av))
+    elif op is sre_constants.ANY:
+        yield from EXAMPLE_ALPHABET
+    elif op is sre_constants.IN:
+        yield from _to_characters(av)
+    elif op is sre_constants.BRANCH:
+        yield from chain.from_iterable(_iter_sequence(list(branch), repeat) for branch in av[1])
+    elif op is sre_constants.SUBPATTERN:
+        yield from _iter_sequence(list(av[-1]), repeat)
+    elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+        minimum, maximum, pattern = av
+        for count in range(minimum, min(maximum, minimum + repeat) + 1):
+            yield from _iter_sequence(list(pattern) * count, repeat)
+    elif op in (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+        # anchors & lookarounds match the empty string
+        yield ""
+    else:
+        raise ValueError(f"Cannot enumerate the strings of regular expressions with {op}.")
+
+
+def _to_characters(items) -> str:
+    characters, negate = [], False
+    for op, av in items:
+        if op is sre_constants.NEGATE:
+            negate = True
+        elif op is sre_constants.LITERAL:
+            characters.append(chr(av))
+        elif op is sre_constants.RANGE:
+            characters.extend(map(chr, range(av[0], av[1] + 1)))
+        elif op is sre_constants.CATEGORY:
+            characters.extend(CATEGORY_CHARACTERS.get(av, ""))
+        else:
+            raise ValueError(f"Cannot enumerate the characters of {op}.")
+    if negate:
+        return "".join(c for c in EXAMPLE_ALPHABET if c not in characters)
+    return "".join(dict.fromkeys(characters))
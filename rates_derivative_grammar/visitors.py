@@ -1,6 +1,6 @@
 from typing import Dict, Any, Iterable
 
-from lark import Visitor, Tree, Token
+from lark import Tree
 
 from .utils import Node, to_name, to_value, normalize
 
@@ -8,25 +8,26 @@ from .utils import Node, to_name, to_value, normalize
 __all__ = ["AttributeVisitor", "get_tokens_dict"]
 
 
-class AttributeVisitor(Visitor):
+class AttributeVisitor:
     """
     Extract the nodes specified in __init__ from the parsed tree.
+
+    The visitor keeps no state between calls so that a single instance can be shared by threads.
     """
 
     def __init__(self, node_names: Iterable[str]):
-
-        self.tokens: Dict[str, Token] = {}
-        self.node_names = set(node_names)
+        self.node_names = frozenset(node_names)
 
     def __call__(self, tree: Tree) -> Dict[str, Any]:
-        self.visit(tree)
-        return self.tokens
-
-    def __default__(self, tree: Tree) -> None:
-        for child in tree.children:
-            name = to_name(child)
-            if name in self.node_names:
-                self.tokens[name] = to_value(child)
+        tokens: Dict[str, Any] = {}
+
+        # visit the sub-trees bottom-up like lark's Visitor
+        for subtree in tree.iter_subtrees():
+            for child in subtree.children:
+                name = to_name(child)
+                if name in self.node_names:
+                    tokens[name] = to_value(child)
+        return tokens
 
 
 def get_tokens_dict(node: Node) -> Dict[str, Any]:
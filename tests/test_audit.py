@@ -0,0 +1,52 @@
+from itertools import islice
+
+from rates_derivative_grammar.audit import GrammarAudit, SHIFT_REDUCE
+from rates_derivative_grammar.utils import iter_regexp_examples
+
+
+def test_iter_regexp_examples():
+    assert list(iter_regexp_examples("(?:(?:WC|WS)|S)")) == ["WC", "WS", "S"]
+    assert list(iter_regexp_examples("[A-C]X?")) == ["A", "AX", "B", "BX", "C", "CX"]
+    assert list(islice(iter_regexp_examples("[1-9][0-9]*"), 3)) == ["1", "10", "11"]
+
+
+class TestGrammarAudit:
+    @classmethod
+    def setup_class(cls):
+        cls.audit = GrammarAudit("rates_volatility")
+
+    def test_collisions(self):
+        collisions = {(c.terminal, c.other_terminal): c for c in self.audit.collisions()}
+        collision = collisions["CAP_FLOOR_STRATEGY_TYPE", "SWAPTION_TYPE"]
+        assert collision.products == ("cap_floor_strategy",)
+        assert collision.other_products == ("swaption",)
+        assert collision.examples == ("S",)
+        assert collisions["CURRENCY", "SETTLEMENT_METHOD"].examples == ("CCP",)
+
+        # the terminals shared by all products through the common grammar do not collide with themselves
+        assert all(c.terminal != c.other_terminal for c in collisions.values())
+
+    def test_conflicts(self):
+        conflicts = GrammarAudit("linear_rate").conflicts()
+        assert set(conflicts) >= {"fix_float_swap", "swap_curve", "fra"}
+
+        # a strike cannot be told apart from the first size of a curve until the separator of the sizes
+        (conflict,) = [c for c in conflicts["swap_curve"] if c.kind == SHIFT_REDUCE]
+        assert conflict.terminal == "SEP"
+        assert any(rule.startswith("swap_curve__swap_size:") for rule in conflict.rules)
+        assert conflict.products == ("swap_curve",)
+
+    def test_chart_sizes(self):
+        sizes = self.audit.chart_sizes(["10Y10Y P CASH 100M", "EUR 5Y5Y 1.25 50WS CASH", "10Y10Y P", "NOT A SWAPTION"])
+        assert sizes["swaption"].strings == 2
+        assert sizes["swaption"].characters == len("10Y10Y P CASH 100M") + len("10Y10Y P")
+        assert sizes["swaption_strategy"].items > sizes["swaption_strategy"].max_column_items > 0
+        assert sizes[None].errors == 1
+
+        # the parser is restored after measuring
+        assert "predict_and_complete" not in vars(self.audit.parser.parser.parser)
+
+    def test_report(self):
+        report = self.audit.report(["10Y10Y P CASH 100M"])
+        assert "CAP_FLOOR_STRATEGY_TYPE (cap_floor_strategy) ~ SWAPTION_TYPE (swaption): S" in report
+        assert "earley chart sizes:" in report
@@ -0,0 +1,132 @@
+from lark.exceptions import UnexpectedInput
+import pytest
+
+from rates_derivative_grammar import AssetClassParser, AssetClassFormatter
+from rates_derivative_grammar.conversion import TokenConversionError
+from rates_derivative_grammar.ingestion import parse_file
+
+
+LINEAR_RATE_STRINGS = [
+    "EUR 5Y10Y 0.1 1S ACT365 100KR",
+    "DKK 3X6I -0.36",
+    "EUR 5Y 5S10S 2/1 6S ACT365 1M/500KR",
+    "EUR 1JAN19 5S7S10S 0.5/2/1 1D ACT365 -5K/10.2K/-5KR",
+    "H02YSH22YS 3S 100M/100MR",
+    "DKKSEK MTM 5Y10Y -100M",
+    "4APR1910Y 100M",
+]
+
+
+class TestParseMany:
+    @classmethod
+    def setup_class(cls):
+        cls.parser = AssetClassParser("linear_rate")
+
+    def test_parse_many_is_serial_parse(self):
+        assert self.parser.parse_many(LINEAR_RATE_STRINGS, workers=1) == list(map(self.parser.parse, LINEAR_RATE_STRINGS))
+
+    @pytest.mark.parametrize("workers", [2, 8])
+    def test_parse_many_concurrently(self, workers):
+        # every thread shares the same compiled parser, transformers and visitors
+        strings = LINEAR_RATE_STRINGS * 10
+        expected = [self.parser.parse(string) for string in strings]
+        assert self.parser.parse_many(strings, workers=workers) == expected
+
+    def test_parse_many_return_exceptions(self):
+        results = self.parser.parse_many(["10Y", "NOT A SWAP", "5Y10Y"], workers=2, return_exceptions=True)
+        assert results[0] == ("fix_float_swap", {"end_time": "10Y"})
+        assert isinstance(results[1], UnexpectedInput)
+        assert results[2] == ("fix_float_swap", {"start_time": "5Y", "end_time": "10Y"})
+
+    def test_parse_many_raises(self):
+        with pytest.raises(UnexpectedInput):
+            self.parser.parse_many(["10Y", "NOT A SWAP"], workers=2)
+
+
+class TestFormatMany:
+    @classmethod
+    def setup_class(cls):
+        cls.parser = AssetClassParser("linear_rate")
+        cls.formatter = AssetClassFormatter("linear_rate")
+
+    def test_format_many_is_serial_format(self):
+        records = self.parser.parse_many(LINEAR_RATE_STRINGS) * 2
+        assert self.formatter.format_many(records) == [self.formatter.format(*record) for record in records]
+
+    def test_format_many_return_exceptions(self):
+        records = [("fix_float_swap", {"end_time": "10Y"}), ("fix_float_swap", {"end_time": 10}), ("foo", {})]
+        results = self.formatter.format_many(records, return_exceptions=True)
+        assert results[0] == "10Y"
+        assert isinstance(results[1], Exception)
+        assert isinstance(results[2], Exception)
+
+    @pytest.mark.parametrize("is_risk", [(True, 1), (1, True)])
+    def test_format_many_memo_is_typed(self, is_risk):
+        # True == 1 while only the bool is formatted as a risk
+        records = [("fix_float_swap", {"end_time": "10Y", "size": 10000.0, "is_risk": value}) for value in is_risk]
+        results = AssetClassFormatter("linear_rate").format_many(records, return_exceptions=True)
+        for record, result in zip(records, results):
+            if isinstance(record[1]["is_risk"], bool):
+                assert result == self.formatter.format(*record) == "10Y 10KR"
+            else:
+                assert isinstance(result, TokenConversionError)
+
+    def test_trimmed_parser_is_cached_by_attributes_present(self):
+        formatter = AssetClassFormatter("linear_rate")
+        formatter.format_many(
+            [
+                ("fix_float_swap", {"end_time": "10Y"}),
+                ("fix_float_swap", {"end_time": "5Y"}),
+                ("fix_float_swap", {"start_time": "5Y", "end_time": "10Y"}),
+            ]
+        )
+        assert formatter.metrics["trimmed_parser_misses"] == 2
+        assert formatter.metrics["trimmed_parser_hits"] == 1
+
+    def test_format_many_raises(self):
+        with pytest.raises(Exception):
+            self.formatter.format_many([("fix_float_swap", {"end_time": "10Y"}), ("fix_float_swap", {"end_time": 10})])
+
+
+class TestParseFile:
+    @classmethod
+    def setup_class(cls):
+        cls.parser = AssetClassParser("linear_rate")
+
+    @pytest.fixture
+    def blotter(self, tmp_path):
+        path = tmp_path / "blotter.txt"
+        path.write_bytes(b"10Y\r\n\nNOT A SWAP\n5Y10Y\n10Y")
+        return str(path)
+
+    def test_parse_file(self, blotter):
+        results = list(parse_file(self.parser, blotter))
+        assert [(r.line_number, r.start, r.end) for r in results] == [(1, 0, 5), (3, 6, 17), (4, 17, 23), (5, 23, 26)]
+        assert results[0].result == ("fix_float_swap", {"end_time": "10Y"}) and results[0].error is None
+        assert results[1].result is None and isinstance(results[1].error, UnexpectedInput)
+        assert results[2].result == ("fix_float_swap", {"start_time": "5Y", "end_time": "10Y"})
+        # identical lines are parsed once
+        assert results[3].result is results[0].result
+
+    def test_parse_file_resumes(self, blotter):
+        results = list(parse_file(self.parser, blotter))
+        resumed = list(parse_file(self.parser, blotter, offset=results[1].end, line_number=results[1].line_number + 1))
+        assert resumed == results[2:]
+
+    def test_blank_lines_are_skipped(self, tmp_path):
+        path = tmp_path / "blotter.txt"
+        path.write_bytes(b"  \t\r\n 10Y \n\n \r\n5Y10Y\t\r\n   ")
+        results = list(parse_file(self.parser, str(path)))
+        assert [(r.line_number, r.start, r.end, r.error) for r in results] == [(2, 5, 11, None), (5, 15, 23, None)]
+        assert results[0].result == ("fix_float_swap", {"end_time": "10Y"})
+
+    def test_stop_early(self, blotter):
+        results = parse_file(self.parser, blotter)
+        assert next(results).line_number == 1
+        # the file is unmapped once the generator is closed
+        results.close()
+
+    def test_parse_empty_file(self, tmp_path):
+        path = tmp_path / "blotter.txt"
+        path.write_bytes(b"")
+        assert list(parse_file(self.parser, str(path))) == []
@@ -0,0 +1,53 @@
+from datetime import date
+
+import pytest
+
+from rates_derivative_grammar import AssetClassFormatter
+from rates_derivative_grammar.custom_types import Currency
+
+
+@pytest.fixture(scope="module")
+def formatter():
+    return AssetClassFormatter("linear_rate")
+
+
+@pytest.mark.parametrize(
+    "changes",
+    [
+        {"size": 2_500_000.0},
+        {"strike": 0.0125, "size": -300_000.0},
+        {"currency": Currency.USD},
+        {"start_time": date(2020, 3, 4)},
+        {"strike": None},
+        {"is_risk": True},
+        {"currency": None, "start_time": None},
+    ],
+)
+def test_update_is_format(formatter, changes):
+    attributes_dict = {"currency": Currency.EUR, "start_time": "5Y", "end_time": "10Y", "strike": 0.001, "size": 1e6}
+    bound = formatter.bind("fix_float_swap", attributes_dict)
+    assert bound.string == formatter.format("fix_float_swap", attributes_dict)
+
+    expected = {**attributes_dict, **changes}
+    expected = {name: value for name, value in expected.items() if value is not None}
+    assert bound.update(**changes) == formatter.format("fix_float_swap", expected)
+    assert bound.attributes_dict == expected
+
+
+def test_update_only_formats_from_scratch_when_nodes_change(formatter):
+    bound = formatter.bind("fix_float_swap", {"end_time": "10Y", "size": 1e6})
+    full_formats = formatter.metrics["bound_full_formats"]
+
+    assert bound.update(size=2e6) == "10Y 2M"
+    assert formatter.metrics["bound_full_formats"] == full_formats
+
+    assert bound.update(strike=0.01) == "10Y 1 2M"
+    assert formatter.metrics["bound_full_formats"] == full_formats + 1
+
+
+def test_update_failure_leaves_handle_unchanged(formatter):
+    bound = formatter.bind("fix_float_swap", {"end_time": "10Y", "size": 1e6})
+    with pytest.raises(Exception):
+        bound.update(size=None, is_risk=True)
+    assert bound.string == "10Y 1M"
+    assert bound.update(size=3e6) == "10Y 3M"
@@ -0,0 +1,63 @@
+import pytest
+
+from rates_derivative_grammar import AssetClassParser
+from rates_derivative_grammar.budget import (
+    BudgetedText,
+    InputTooLongError,
+    ParseBudgetExceededError,
+    max_string_lengths,
+)
+
+STRING = "EUR 5Y10Y 100M"
+EXPECTED = ("fix_float_swap", {"start_time": "5Y", "end_time": "10Y", "currency": "EUR", "size": 100_000_000})
+
+
+class TestBudget:
+    def setup_method(self):
+        self.parser = AssetClassParser("linear_rate")
+
+    def test_max_string_lengths(self):
+        lengths = max_string_lengths(self.parser.parser.rules, self.parser.parser.terminals)
+        assert lengths["fra"] < lengths["swap_curve"] < lengths["swap_fly"]
+        assert self.parser.max_length == max(lengths.values())
+
+    def test_within_budget(self):
+        product_type, attributes = self.parser.parse(STRING, max_seconds=10.0, max_steps=10_000)
+        assert (product_type, {k: getattr(v, "name", v) for k, v in attributes.items()}) == EXPECTED
+        assert not self.parser.metrics
+
+    def test_over_step_budget(self):
+        with pytest.raises(ParseBudgetExceededError, match="steps"):
+            self.parser.parse(STRING, max_steps=10)
+        assert self.parser.metrics["aborted_over_budget"] == 1
+
+    def test_over_time_budget(self):
+        with pytest.raises(ParseBudgetExceededError, match="s:"):
+            self.parser.parse(STRING, max_seconds=0.0)
+        assert self.parser.metrics["aborted_over_budget"] == 1
+
+    def test_default_budget(self):
+        parser = AssetClassParser("linear_rate", max_steps=10)
+        results = parser.parse_many([STRING, STRING], return_exceptions=True)
+        assert all(isinstance(result, ParseBudgetExceededError) for result in results)
+        # the budget of a call overrides the parser's
+        assert parser.parse(STRING, max_steps=10_000)[0] == "fix_float_swap"
+        assert parser.metrics["aborted_over_budget"] == 2
+
+    def test_too_long(self):
+        with pytest.raises(InputTooLongError):
+            self.parser.parse("5Y10Y " + "1" * self.parser.max_length)
+        assert self.parser.metrics["aborted_too_long"] == 1
+
+        parser = AssetClassParser("linear_rate", max_length=8)
+        with pytest.raises(InputTooLongError):
+            parser.parse(STRING)
+
+    def test_budgeted_text(self):
+        text = BudgetedText(STRING, max_steps=2)
+        assert text == STRING and str(text) == STRING
+        text.spend()
+        text.spend()
+        with pytest.raises(ParseBudgetExceededError):
+            text.spend()
+        assert text.steps == 3
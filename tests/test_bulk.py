@@ -0,0 +1,88 @@
+import gc
+from threading import Barrier, Thread
+
+from rates_derivative_grammar import AssetClassFormatter, AssetClassParser
+from rates_derivative_grammar.bulk import BULK_GC_THRESHOLD, bulk_mode
+from rates_derivative_grammar.normalization import Normalizer
+
+
+class TestBulkMode:
+    def setup_method(self):
+        self.threshold = gc.get_threshold()
+
+    def teardown_method(self):
+        gc.set_threshold(*self.threshold)
+        gc.enable()
+
+    def test_settings_restored(self):
+        parser = AssetClassParser("linear_rate")
+        with bulk_mode():
+            assert gc.get_threshold() == (BULK_GC_THRESHOLD, *self.threshold[1:])
+            assert gc.get_freeze_count() > 0
+            assert gc.isenabled()
+            assert parser.parse("EUR 5Y10Y 100M")[0] == "fix_float_swap"
+        assert gc.get_threshold() == self.threshold
+        assert gc.get_freeze_count() == 0
+
+    def test_pause(self):
+        with bulk_mode(threshold=0, freeze=False):
+            assert not gc.isenabled()
+            assert gc.get_freeze_count() == 0
+        assert gc.isenabled()
+
+        gc.disable()
+        with bulk_mode(threshold=0):
+            pass
+        # collection is left disabled if it was disabled before
+        assert not gc.isenabled()
+
+    def test_nested(self):
+        with bulk_mode(threshold=0):
+            with bulk_mode():
+                assert not gc.isenabled()
+            assert not gc.isenabled()
+        assert gc.isenabled()
+
+    def test_frozen_by_caller(self):
+        gc.freeze()
+        try:
+            with bulk_mode():
+                pass
+            # the objects frozen by the caller are not unfrozen
+            assert gc.get_freeze_count() > 0
+        finally:
+            gc.unfreeze()
+
+    def test_threads(self):
+        barrier = Barrier(3)
+
+        def run():
+            with bulk_mode(threshold=0):
+                barrier.wait()
+                barrier.wait()
+
+        threads = [Thread(target=run) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        assert not gc.isenabled()
+        barrier.wait()
+        for thread in threads:
+            thread.join()
+        assert gc.isenabled()
+
+    def test_bulk_apis(self):
+        thresholds = []
+
+        def record(strings):
+            # the inputs are consumed once the batch has started
+            for string in strings:
+                thresholds.append(gc.get_threshold()[0])
+                yield string
+
+        parser = AssetClassParser("linear_rate")
+        assert parser.parse_many(record(["5Y10Y 100M"]))[0][0] == "fix_float_swap"
+        assert AssetClassFormatter("linear_rate").format_many(record([("fix_float_swap", {"end_time": "10Y"})]))
+        assert Normalizer("linear_rate").normalize_many(record(["10y"]))[0].string == "10Y"
+        assert thresholds == [BULK_GC_THRESHOLD] * 3
+        assert gc.get_threshold() == self.threshold
@@ -0,0 +1,210 @@
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+import os
+import shutil
+import subprocess
+import sys
+
+from lark.exceptions import UnexpectedInput
+import pytest
+
+from rates_derivative_grammar import AssetClassParser, GRAMMAR_PATH
+from rates_derivative_grammar.caching import PersistentParseCache, SharedMemoryParseCache, grammar_fingerprint
+from rates_derivative_grammar.codec import ParseResultCodec
+from rates_derivative_grammar.custom_types import (
+    Currency,
+    DayCount,
+    SettlementMethod,
+    SwaptionStrategy,
+    CapFloorStrategy,
+    Tenor,
+)
+
+
+class TestPersistentParseCache:
+    @classmethod
+    def setup_class(cls):
+        cls.parser = AssetClassParser("rates_volatility")
+
+    @pytest.mark.parametrize(
+        "asset_class, result",
+        [
+            (
+                "rates_volatility",
+                (
+                    "swaption",
+                    {
+                        "currency": Currency.EUR,
+                        "start_time": date(2019, 4, 13),
+                        "end_time": "5Y",
+                        "strike": 0.0135393,
+                        "contract_type": SwaptionStrategy.PAYER,
+                        "settlement_method": SettlementMethod.CASH_SETTLED_ISDA,
+                        "size": -100_000_000.0,
+                        "is_relative": True,
+                    },
+                ),
+            ),
+            (
+                "linear_rate",
+                ("swap_curve", {"fixed_daycount": DayCount.ACT365, "size": [0.1 + 0.2, 1e-17], "end_time": ["5Y", "10Y"]}),
+            ),
+        ],
+    )
+    def test_round_trip(self, tmp_path, asset_class, result):
+        with PersistentParseCache(str(tmp_path / "cache.db"), asset_class) as cache:
+            cache.put_many([("string", result)])
+        with PersistentParseCache(str(tmp_path / "cache.db"), asset_class) as cache:
+            assert cache.get_many(["string", "missing"]) == {"string": result}
+
+    def test_parse_many(self, tmp_path):
+        strings = ["10Y10Y P CASH 100M", "EUR 13APR195Y P", "10Y10Y P CASH 100M", "NOT A SWAPTION"]
+        with PersistentParseCache(str(tmp_path / "cache.db"), "rates_volatility") as cache:
+            results = self.parser.parse_many(strings, cache=cache, return_exceptions=True)
+            assert results[:3] == list(map(self.parser.parse, strings[:3]))
+            assert isinstance(results[3], UnexpectedInput)
+            assert set(cache.get_many(strings)) == set(strings[:2])
+
+            with pytest.raises(UnexpectedInput):
+                self.parser.parse_many(strings, cache=cache)
+
+    def test_namespace(self, tmp_path):
+        grammar_path = str(tmp_path / "grammar")
+        shutil.copytree(GRAMMAR_PATH, grammar_path)
+        assert grammar_fingerprint(grammar_path) == grammar_fingerprint(GRAMMAR_PATH)
+
+        path = str(tmp_path / "cache.db")
+        with PersistentParseCache(path, "rates_volatility", grammar_path=grammar_path) as cache:
+            cache.put_many([("10Y F", ("cap_floor", {"end_time": "10Y"}))])
+
+        with open(os.path.join(grammar_path, "common", "tenors.lark"), "a") as f:
+            f.write("\n// changed\n")
+
+        with PersistentParseCache(path, "rates_volatility", grammar_path=grammar_path) as cache:
+            assert cache.get_many(["10Y F"]) == {}
+            assert cache.prune() == 1
+
+    def test_intern_tenors(self, tmp_path):
+        parser = AssetClassParser("rates_volatility", intern_tenors=True)
+        path = str(tmp_path / "cache.db")
+        with PersistentParseCache(path, "rates_volatility", intern_tenors=True) as cache:
+            parser.parse_many(["10Y10Y P CASH 100M"], cache=cache)
+            product_type, attributes_dict = cache.get_many(["10Y10Y P CASH 100M"])["10Y10Y P CASH 100M"]
+            assert attributes_dict["end_time"] is Tenor("10Y")
+            with pytest.raises(ValueError):
+                self.parser.parse_many(["10Y10Y P CASH 100M"], cache=cache)
+
+        # the results parsed with interned tenors are not shared with plain parsers, nor pruned
+        with PersistentParseCache(path, "rates_volatility") as cache:
+            assert cache.get_many(["10Y10Y P CASH 100M"]) == {}
+            assert cache.prune() == 0
+
+
+
+class TestParseResultCodec:
+    @pytest.mark.parametrize(
+        "asset_class, result",
+        [
+            ("linear_rate", ("fix_float_swap", {"end_time": "10Y"})),
+            ("linear_rate", ("fix_float_swap", {"start_time": date(2037, 9, 15), "end_time": "25Y", "strike": 0.02, "size": 2})),
+            ("linear_rate", ("fra", {"currency": Currency.DKK, "start_time": "3M", "end_time": "6M", "is_imm": True})),
+            ("linear_rate", ("leverage_swap_fly", {"start_time": ["H0", "H2", "H4"], "end_time": ["1Y", "2.5Y", "4.75Y"]})),
+            ("linear_rate", ("swap_curve", {"end_time": ["5Y", "10Y"], "size": [-193_400_000.0, 1e300], "is_risk": True})),
+            ("linear_rate", ("fix_float_swap", {"start_time": "IMM_MAR25", "end_time": "0.25Y", "float_freq": "12M"})),
+            ("rates_volatility", ("cap_floor_strategy", {"width": 0.0, "contract_type": CapFloorStrategy.COLLAR})),
+        ],
+    )
+    def test_round_trip(self, asset_class, result):
+        codec = ParseResultCodec(asset_class)
+        assert codec.decode(codec.encode(result)) == result
+        assert codec.decode_many(memoryview(codec.encode_many([result] * 3))) == [result] * 3
+
+    def test_types(self):
+        codec = ParseResultCodec("linear_rate")
+        result = ("leverage_swap_fly", {"start_time": [Tenor("H0"), "H2", Tenor("4Y")], "end_time": ("1Y", Tenor("2.5Y"))})
+        decoded = codec.decode(codec.encode(result))
+        assert decoded == result
+        assert [type(value) for value in decoded[1]["start_time"]] == [Tenor, str, Tenor]
+        assert type(decoded[1]["end_time"]) is tuple and type(decoded[1]["end_time"][1]) is Tenor
+
+    def test_parsed(self):
+        parser, codec = AssetClassParser("rates_volatility"), ParseResultCodec("rates_volatility")
+        results = [parser.parse(string) for string in ["EUR 10Y10Y P 3S PHYS 100M", "0MX12M A1 C", "EUR 13APR195Y P"]]
+        assert codec.decode_many(codec.encode_many(results)) == results
+
+    def test_version(self):
+        codec = ParseResultCodec("linear_rate")
+        encoded = bytearray(codec.encode(("fix_float_swap", {"end_time": "10Y"})))
+        encoded[0] += 1
+        with pytest.raises(ValueError):
+            codec.decode(encoded)
+
+    def test_unknown_attribute(self):
+        with pytest.raises(ValueError):
+            ParseResultCodec("linear_rate").encode(("fix_float_swap", {"width": 0.1}))
+
+
+def parse_with_shared_cache(cache, strings):
+    AssetClassParser("rates_volatility").parse_many(strings, cache=cache)
+    return cache.hits, cache.misses
+
+
+class TestSharedMemoryParseCache:
+    @classmethod
+    def setup_class(cls):
+        cls.parser = AssetClassParser("rates_volatility")
+
+    def setup_method(self):
+        self.cache = SharedMemoryParseCache.create("rates_volatility", 64)
+
+    def teardown_method(self):
+        self.cache.close()
+        self.cache.unlink()
+
+    def test_round_trip(self):
+        result = ("swaption", {"start_time": date(2019, 4, 13), "end_time": "5Y", "contract_type": SwaptionStrategy.PAYER})
+        self.cache.put_many([("EUR 13APR195Y P", result)])
+        assert self.cache.get_many(["EUR 13APR195Y P", "missing"]) == {"EUR 13APR195Y P": result}
+        assert (self.cache.hits, self.cache.misses) == (1, 1)
+
+        attached = SharedMemoryParseCache.attach(self.cache.name)
+        assert attached.get_many(["EUR 13APR195Y P"]) == {"EUR 13APR195Y P": result}
+        attached.close()
+
+    def test_torn_slot_is_a_miss(self):
+        self.cache.put_many([("10Y F", ("cap_floor", {"end_time": "10Y"}))])
+        _, offset = next(self.cache._iter_slots(b"10Y F"))
+        self.cache.buffer[offset + self.cache.SLOT_HEADER.size] ^= 0xFF
+        assert self.cache.get_many(["10Y F"]) == {}
+
+    def test_slot_left_odd_is_taken_over(self):
+        result = ("cap_floor", {"end_time": "10Y"})
+        self.cache.put_many([("10Y F", result)])
+        _, offset = next(self.cache._iter_slots(b"10Y F"))
+        # a writer died while writing the slot
+        sequence = self.cache.SEQUENCE.unpack_from(self.cache.buffer, offset)[0] + 1
+        self.cache.SEQUENCE.pack_into(self.cache.buffer, offset, sequence)
+        assert self.cache.get_many(["10Y F"]) == {}
+
+        self.cache.put_many([("10Y F", result)])
+        assert self.cache.SEQUENCE.unpack_from(self.cache.buffer, offset)[0] == sequence + 3
+        assert self.cache.get_many(["10Y F"]) == {"10Y F": result}
+
+    def test_full_table(self):
+        results = [(str(i), ("cap_floor", {"size": float(i)})) for i in range(100)]
+        self.cache.put_many(results)
+        assert len(self.cache.get_many(str(i) for i in range(100))) == 64
+        assert len(self.cache.get_many([str(i) for i in range(100)] * 2)) <= 64
+
+    def test_shared_across_processes(self):
+        strings = ["10Y10Y P CASH 100M", "EUR 13APR195Y P", "USD 3MX12M S"]
+        with ProcessPoolExecutor(2) as executor:
+            assert executor.submit(parse_with_shared_cache, self.cache, strings).result() == (0, 3)
+            assert executor.submit(parse_with_shared_cache, self.cache, strings).result() == (3, 0)
+        assert self.cache.get_many(strings) == dict(zip(strings, map(self.parser.parse, strings)))
+
+
+def test_shared_memory_is_imported_lazily():
+    # NOTE: shared memory requires python 3.8, the persistent cache must not depend on it
+    code = "import sys, rates_derivative_grammar.caching; assert 'multiprocessing.shared_memory' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True)
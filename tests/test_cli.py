@@ -0,0 +1,69 @@
+import json
+
+from rates_derivative_grammar.cli import main
+from rates_derivative_grammar.coverage import CoverageCollector
+
+
+LINES = ["EUR 5Y10Y 0.1 1S ACT365 100KR", "NOT A SWAP", "", "4APR1910Y 100M"]
+
+
+def test_parse(tmp_path, capsys):
+    path = tmp_path / "in.txt"
+    path.write_text("\n".join(LINES))
+    assert main(["parse", str(path), "--workers", "2", "--quiet"]) == 1
+
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [record["line"] for record in records] == [1, 2, 4]
+    assert records[0]["attributes"]["currency"] == "Currency.EUR"
+    assert records[1]["error"].startswith("UnexpectedCharacters")
+    assert records[2]["attributes"] == {"start_time": "2019-04-04", "end_time": "10Y", "size": 100_000_000}
+
+
+def test_parse_then_format(tmp_path, capsys):
+    path = tmp_path / "in.txt"
+    path.write_text("\n".join(line for line in LINES if line != "NOT A SWAP"))
+    assert main(["parse", str(path), "--output", str(tmp_path / "parsed.jsonl"), "--quiet"]) == 0
+    assert main(["format", str(tmp_path / "parsed.jsonl"), "--output-format", "csv"]) == 0
+
+    out, err = capsys.readouterr()
+    assert out.splitlines() == [
+        "line,product_type,string,error",
+        "1,fix_float_swap,EUR 5Y10Y 0.1 1S ACT365 100KR,",
+        "2,fix_float_swap,4APR1910Y 100M,",
+    ]
+    assert err.startswith("2 rows in")
+
+
+def test_normalize_in_processes(tmp_path, capsys):
+    path = tmp_path / "in.txt"
+    path.write_text("EUR 5Y10Y 1000K\n")
+    assert main(["normalize", str(path), "--workers", "2", "--backend", "process", "--quiet"]) == 0
+    assert json.loads(capsys.readouterr().out)["normalized"] == "EUR 5Y10Y 1M"
+
+
+def test_audit(tmp_path, capsys):
+    path = tmp_path / "in.txt"
+    path.write_text("10Y10Y P CASH 100M\n")
+    assert main(["audit", "--asset-class", "rates_volatility", str(path)]) == 0
+    out = capsys.readouterr().out
+    assert "LALR(1) conflicts:" in out
+    assert "swaption" in out.split("earley chart sizes:")[1]
+
+
+def test_coverage(tmp_path, capsys):
+    path = tmp_path / "in.txt"
+    path.write_text("\n".join(LINES))
+    for backend in ("thread", "process"):
+        coverage_path = tmp_path / f"{backend}.json"
+        args = ["parse", str(path), "-w", "2", "-b", backend, "--coverage", str(coverage_path), "-q"]
+        assert main(args) == 1
+        coverage = CoverageCollector.load(str(coverage_path))
+        assert coverage.parses() == {"fix_float_swap": 2}
+        assert coverage.counts["fix_float_swap", "start_time", "common__shared__DATE"] == 1
+
+
+def test_max_seconds(tmp_path, capsys):
+    path = tmp_path / "in.txt"
+    path.write_text("EUR 5Y10Y 100M\n")
+    assert main(["parse", str(path), "--max-seconds", "0", "--quiet"]) == 1
+    assert json.loads(capsys.readouterr().out)["error"].startswith("ParseBudgetExceededError")
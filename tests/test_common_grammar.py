@@ -1,10 +1,11 @@
-from datetime import date
+from datetime import date, datetime
 
-from lark import Lark
+from lark import Lark, Token
 import lark.load_grammar as pth
 import pytest
 
 from rates_derivative_grammar import GRAMMAR_PATH
+from rates_derivative_grammar.conversion import DateConverter, TokenConversionError
 from rates_derivative_grammar.transformers import FromTokenConversionTransformer
 
 
@@ -47,6 +48,23 @@ class TestDatesGrammar:
         with pytest.raises(Exception):
             assert_interpretation(self.grammar, node, to_parse)
 
+    @pytest.mark.parametrize('to_parse', ['1MAR19', '01mar19', '29FEB20', '31DEC68', '1JAN69', '30FEB20', '0MAR19', '1MARS19'])
+    def test_date_converter_is_strptime(self, to_parse):
+        try:
+            expected = datetime.strptime(to_parse, DateConverter.format).date()
+        except ValueError:
+            with pytest.raises(TokenConversionError):
+                DateConverter.from_token(Token('DATE', to_parse))
+        else:
+            assert DateConverter.from_token(Token('DATE', to_parse)) == expected
+            assert DateConverter.to_token('DATE', expected) == expected.strftime('%d%b%y').upper().lstrip('0')
+
+    def test_date_converter_columns(self):
+        tokens = ['1MAR19', '31DEC68', '1MAR19']
+        dates = DateConverter.from_tokens(tokens)
+        assert dates == [date(2019, 3, 1), date(2068, 12, 31), date(2019, 3, 1)]
+        assert DateConverter.to_tokens('DATE', dates) == tokens
+
     @pytest.mark.parametrize('node', ['QUARTERLY_IMM_DATE'])
     @pytest.mark.parametrize('to_parse', ['MAR09', 'DEC15', 'JUN99'])
     def test_quarterly_imm_date_success(self, node, to_parse):
@@ -0,0 +1,43 @@
+import os
+
+from lark import Lark
+from lark.reconstruct import Reconstructor
+
+from rates_derivative_grammar import GRAMMAR_PATH, AssetClassFormatter
+from rates_derivative_grammar.compilation import GrammarReconstructor, compile_grammar, compile_pattern
+from rates_derivative_grammar.utils import _imported_grammars
+
+FILE_NAME = "linear_rate__fix_float_swap.lark"
+
+
+def test_compile_grammar():
+    grammar = compile_grammar(GRAMMAR_PATH, FILE_NAME)
+    lark = Lark.open(os.path.join(GRAMMAR_PATH, FILE_NAME))
+    assert {t.name: t.pattern for t in grammar.terminals} == {t.name: t.pattern for t in lark.terminals}
+    assert set(grammar.rules) == set(lark.rules)
+
+
+def test_modules_are_shared():
+    compile_grammar(GRAMMAR_PATH, FILE_NAME)
+    memo = _imported_grammars[os.path.abspath(GRAMMAR_PATH)]
+    shared, product = memo["common/shared.lark"], memo[FILE_NAME]
+
+    compile_grammar(GRAMMAR_PATH, "linear_rate__fra.lark")
+    compile_grammar(GRAMMAR_PATH, FILE_NAME)
+    assert memo["common/shared.lark"] is shared and memo[FILE_NAME] is product
+
+
+def test_patterns_are_shared():
+    formatter = AssetClassFormatter("linear_rate")
+    matchers = [formatter._make_grammar_tools(product_type, 0)[3] for product_type in ("fra", "fix_float_swap")]
+    patterns = [{t.name: p for t, p in matcher.terminals_dict.items()} for matcher in matchers]
+    assert patterns[0]["CURRENCY"] is patterns[1]["CURRENCY"]
+    assert compile_pattern("[A-Z]{3}") is compile_pattern("[A-Z]{3}")
+
+
+def test_reconstructor():
+    lark = Lark.open(os.path.join(GRAMMAR_PATH, FILE_NAME))
+    tree = lark.parse("EUR 5Y10Y 100M")
+    reconstructor = GrammarReconstructor(compile_grammar(GRAMMAR_PATH, FILE_NAME))
+    expected = "".join(Reconstructor(lark)._reconstruct(tree))
+    assert "".join(reconstructor._reconstruct(tree)) == expected == "EUR 5Y10Y 100M"
@@ -0,0 +1,51 @@
+from collections import Counter
+from itertools import islice
+
+import pytest
+
+from rates_derivative_grammar.corpus import CorpusGenerator
+
+
+class TestCorpusGenerator:
+    @classmethod
+    def setup_class(cls):
+        cls.generator = CorpusGenerator("rates_volatility", seed=42)
+
+    def test_deterministic(self):
+        strings = list(self.generator.strings(50))
+        assert list(self.generator.strings(50)) == strings
+        assert list(CorpusGenerator("rates_volatility", seed=42, expected=False).strings(50)) == strings
+        assert list(CorpusGenerator("rates_volatility", seed=43).strings(50)) != strings
+
+    @pytest.mark.parametrize("asset_class", ["linear_rate", "rates_volatility"])
+    def test_expected_attributes(self, asset_class):
+        # NOTE: about 6% of the strings derived for linear rates are ambiguous, f.ex. "USD 3X9I 2.0"
+        generator = CorpusGenerator(asset_class, seed=3)
+        samples = list(generator.generate(200))
+        results = generator.parser.parse_many([sample.string for sample in samples])
+        assert results == [(sample.product_type, sample.attributes_dict) for sample in samples]
+
+    def test_weights(self):
+        generator = CorpusGenerator(
+            "linear_rate",
+            products={"fra": 1},
+            values={"CURRENCY": ["DKK"], "MONTH_INT": {"3": 1, "6": 0}},
+            optional_weights={"fra": 1.0},
+            expected=False,
+        )
+        samples = list(generator.generate(20))
+        assert {sample.product_type for sample in samples} == {"fra"}
+        assert all(sample.string.startswith("DKK 3X3") for sample in samples)
+
+        with pytest.raises(ValueError, match="swap"):
+            CorpusGenerator("linear_rate", products={"swap": 1})
+
+    def test_duplicates(self):
+        generator = CorpusGenerator("rates_volatility", duplicates=0.9, skew=4.0, pool_size=100, expected=False)
+        counts = Counter(generator.strings(1000))
+        assert len(counts) < 200
+        assert counts.most_common(1)[0][1] > 50
+
+    def test_lazy(self):
+        generator = CorpusGenerator("linear_rate", expected=False)
+        assert len(list(islice(iter(generator), 5))) == 5
@@ -0,0 +1,43 @@
+from rates_derivative_grammar import AssetClassParser
+from rates_derivative_grammar.coverage import CoverageCollector
+
+
+class TestCoverageCollector:
+    @classmethod
+    def setup_class(cls):
+        cls.coverage = CoverageCollector()
+        parser = AssetClassParser("linear_rate", coverage=cls.coverage)
+        parser.parse_many(["EUR 5Y10Y 100M", "4APR1910Y 100M", "H25Y 1", "10Y", "5S10S 3S 100M/100MR", "10Y 1"])
+
+    def test_counts(self):
+        counts = self.coverage.counts
+        assert self.coverage.parses() == {"fix_float_swap": 5, "swap_curve": 1}
+
+        # the alternatives of the inline rule ?time are counted in the alternatives of start_time
+        assert counts["fix_float_swap", "start_time", "common__shared__FLOAT_TENOR"] == 1
+        assert counts["fix_float_swap", "start_time", "common__shared__DATE"] == 1
+        assert counts["fix_float_swap", "start_time", "common__shared__QUARTERLY_IMM_TENOR"] == 1
+        assert counts["swap_curve", "size", "swap_size swap_size"] == 1
+        assert counts["fix_float_swap", "CURRENCY", ""] == 1
+
+    def test_hot_paths(self):
+        hot_paths = self.coverage.hot_paths(share=0.5)
+        assert hot_paths["fix_float_swap"]["schedule"] == ["start_time end_time"]
+        assert hot_paths["fix_float_swap"]["fix_float_swap"] == ["schedule size"]
+        assert len(self.coverage.hot_paths(share=1.0)["fix_float_swap"]["start_time"]) == 3
+
+    def test_merge(self, tmp_path):
+        path = str(tmp_path / "coverage.json")
+        self.coverage.dump(path)
+        merged = CoverageCollector.load(path)
+        merged.merge(CoverageCollector.load(path).pop())
+        assert merged.parses() == {"fix_float_swap": 10, "swap_curve": 2}
+
+        popped = merged.pop()
+        assert sum(popped.values()) == 2 * sum(self.coverage.counts.values())
+        assert not merged.counts
+
+    def test_report(self):
+        report = self.coverage.report()
+        assert report.startswith("fix_float_swap: 5 parses")
+        assert "  start_time: 3 hits" in report
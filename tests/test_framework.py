@@ -76,6 +76,8 @@ class TestParsers:
         transformer = RenameNodeTransformer(lambda s: s.lower().replace('a', 'u') if s != 'start' else s)
         new_tree = transformer.transform(tree)
         assert get_tokens_dict(new_tree)['start'] == expected
+        # the tree transformed is left untouched
+        assert tree == self.lark.parse(to_parse)
 
 
 class TestGrammarAnalysis:
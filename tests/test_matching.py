@@ -0,0 +1,43 @@
+from rates_derivative_grammar import AssetClassParser
+from rates_derivative_grammar.matching import EquivalenceIndex
+
+
+class TestEquivalenceIndex:
+    @classmethod
+    def setup_class(cls):
+        cls.parser = AssetClassParser("linear_rate")
+
+    def test_key_tolerance(self):
+        index = EquivalenceIndex(tolerances={"size": 1.0, "strike": 1e-7})
+        key = index.key("fix_float_swap", {"end_time": "10Y", "strike": 0.001, "size": 100_000_000.0})
+        assert index.key("fix_float_swap", {"size": 100_000_000.4, "strike": 0.00100004, "end_time": "10Y"}) == key
+        assert index.key("fix_float_swap", {"size": 100_000_001.0, "strike": 0.001, "end_time": "10Y"}) != key
+        assert index.key("fix_float_swap", {"size": 100_000_000.0, "strike": 0.0010002, "end_time": "10Y"}) != key
+        assert index.key("fra", {"end_time": "10Y", "strike": 0.001, "size": 100_000_000.0}) != key
+
+    def test_join_variants(self):
+        left = self.parser.parse_many(["EUR 5Y10Y 100M", "EUR 5Y10Y 100M", "DKK 3X6I -0.36", "10Y 1"])
+        right = self.parser.parse_many(["EUR 5Y10Y 100.0M", "10Y 1", "EUR 5Y10Y 100000K", "EUR 5Y10Y 10M"])
+        index = EquivalenceIndex.build(left, ids="abcd")
+        assert len(index) == 4
+        assert sorted(index.join(right)) == [(0, "a"), (0, "b"), (1, "d"), (2, "a"), (2, "b")]
+        assert index.probe_many(right[-2:]) == [["a", "b"], []]
+
+    def test_ignore(self):
+        results = self.parser.parse_many(["EUR 5Y10Y 100M", "EUR 5Y10Y 10M", "EUR 5Y10Y"])
+        index = EquivalenceIndex.build(results[:1], ignore=["size"])
+        assert index.probe_many(results) == [[0], [0], [0]]
+
+    def test_exceptions_are_skipped(self):
+        results = self.parser.parse_many(["10Y", "NOT A SWAP"], return_exceptions=True)
+        index = EquivalenceIndex.build(results)
+        assert len(index) == 1
+        assert list(index.join(results)) == [(0, 0)]
+
+    def test_ids_across_calls(self):
+        results = self.parser.parse_many(["1Y", "NOT A SWAP", "2Y", "3Y"], return_exceptions=True)
+        index = EquivalenceIndex()
+        index.add_many(results[:2])
+        index.add_many(results[2:])
+        assert len(index) == 3
+        assert index.probe_many(results) == [[0], [], [2], [3]]
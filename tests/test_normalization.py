@@ -0,0 +1,45 @@
+from lark.exceptions import UnexpectedInput
+import pytest
+
+from rates_derivative_grammar.normalization import Normalizer
+
+
+VARIANTS = ["5Y10Y 100.0M", "5y10y 100m", " 5Y10Y 100M", "5Y10Y 100000K"]
+
+
+class TestNormalizer:
+    def test_normalize(self):
+        normalizer = Normalizer("linear_rate")
+        results = list(map(normalizer.normalize, VARIANTS + VARIANTS))
+        assert {result.string for result in results} == {"5Y10Y 100M"}
+        assert results[0] == ("5Y10Y 100M", "fix_float_swap", {"start_time": "5Y", "end_time": "10Y", "size": 1e8})
+        # each variant is parsed once and the product formatted once
+        assert normalizer.metrics["parses"] == 4
+        assert normalizer.metrics["formats"] == 1
+        assert normalizer.variants == dict.fromkeys(VARIANTS, "5Y10Y 100M")
+
+    def test_normalize_many(self):
+        normalizer = Normalizer("linear_rate")
+        strings = VARIANTS + ["DKK 3X6I -0.36"] + VARIANTS
+        assert normalizer.normalize_many(strings, workers=2) == list(map(Normalizer("linear_rate").normalize, strings))
+        assert normalizer.metrics["parses"] == 5
+        assert normalizer.metrics["formats"] == 2
+
+    def test_normalize_many_return_exceptions(self):
+        normalizer = Normalizer("linear_rate")
+        results = normalizer.normalize_many(["10y", "NOT A SWAP"], return_exceptions=True)
+        assert results[0].string == "10Y"
+        assert isinstance(results[1], UnexpectedInput)
+        with pytest.raises(UnexpectedInput):
+            normalizer.normalize_many(["10y", "NOT A SWAP"])
+
+    def test_key_is_typed(self):
+        normalizer = Normalizer("linear_rate")
+        key = normalizer._make_key("fix_float_swap", {"size": 10000.0, "is_risk": True})
+        assert key == normalizer._make_key("fix_float_swap", {"is_risk": True, "size": 10000.0})
+        # True == 1 while only the bool is formatted as a risk
+        assert key != normalizer._make_key("fix_float_swap", {"size": 10000.0, "is_risk": 1})
+        assert normalizer._make_key("fix_float_swap", {"size": [1, 2]}) != normalizer._make_key(
+            "fix_float_swap", {"size": [1.0, 2.0]}
+        )
+        assert normalizer._make_key("fix_float_swap", {"size": [{}]}) is None
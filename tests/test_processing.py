@@ -0,0 +1,62 @@
+import pytest
+from lark import Token, Tree
+
+from rates_derivative_grammar import AssetClassFormatter
+from rates_derivative_grammar.corpus import CorpusGenerator
+from rates_derivative_grammar.processing import (
+    PreProcessPlan,
+    SwaptionProcessor,
+    processors_registry,
+    to_processor_key,
+)
+from rates_derivative_grammar.processing._generic import LeverageScheduleProcessorMixin
+
+
+def to_tuple(node):
+    if isinstance(node, Tree):
+        return (node.data,) + tuple(map(to_tuple, node.children))
+    return node.type, type(node.value), node.value
+
+
+@pytest.mark.parametrize("asset_class", ["linear_rate", "rates_volatility"])
+def test_plan_is_pre_process(asset_class):
+    formatter = AssetClassFormatter(asset_class)
+    for product_type in CorpusGenerator(asset_class, expected=False).products:
+        processor = processors_registry[to_processor_key(asset_class, product_type)]
+        plan = processor.compile_pre_process()
+        assert isinstance(plan, PreProcessPlan) and processor.compile_pre_process() is plan
+
+        rule_names = formatter._get_format_tools(product_type).analyser.rules_by_origin.keys()
+        for sample in CorpusGenerator(asset_class, products={product_type: 1.0}).generate(20):
+            # the nodes are made for each call as the sizes are formatted in place
+            expected = list(processor.pre_process(formatter._make_attributes_nodes(sample.attributes_dict, rule_names)))
+            nodes = plan(formatter._make_attributes_nodes(sample.attributes_dict, rule_names))
+            assert list(map(to_tuple, nodes)) == list(map(to_tuple, expected))
+
+
+def test_mixin():
+    nodes = [Tree("end_time", ["10Y", "20Y"]), Tree("start_time", ["1Y", "2Y"])]
+    plan = LeverageScheduleProcessorMixin.compile_pre_process()
+    assert [(node.data, node.children) for node in plan(nodes)] == [
+        ("start_time", ["1Y"]),
+        ("end_time", ["10Y"]),
+        ("start_time", ["2Y"]),
+        ("end_time", ["20Y"]),
+    ]
+
+
+def test_unknown_attribute():
+    with pytest.raises(ValueError):
+        SwaptionProcessor.compile_pre_process()([Token("NOT_AN_ATTRIBUTE", 1)])
+
+
+def test_pre_process_without_rewrite():
+    class UpperCaseProcessor(SwaptionProcessor):
+        @classmethod
+        def pre_process(cls, attributes):
+            for attribute in super().pre_process(attributes):
+                yield Token(attribute.type, attribute.value.upper()) if attribute.type == "CURRENCY" else attribute
+
+    plan = UpperCaseProcessor.compile_pre_process()
+    assert not isinstance(plan, PreProcessPlan)
+    assert plan([Token("CURRENCY", "eur")]) == [Token("CURRENCY", "EUR")]
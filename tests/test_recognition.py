@@ -0,0 +1,64 @@
+import pytest
+
+from rates_derivative_grammar import AssetClassParser
+from rates_derivative_grammar.recognition import Recognizer, Rejection
+
+VALID = ["EUR 5Y10Y 100M", "3X6 0.1", "EUR 5Y10Y 2/1 1D6S ACT365 100KR", "30JAN2010Y 100M"]
+
+
+class TestRecognition:
+    def setup_method(self):
+        self.parser = AssetClassParser("linear_rate")
+
+    def test_valid(self):
+        for string in VALID:
+            assert self.parser.validate(string) == self.parser.parse(string)[0]
+
+    def test_rejection(self):
+        rejection = self.parser.validate("NOT A SWAP")
+        assert not rejection
+        assert rejection.position == 0
+        assert {"CURRENCY", "DATE", "FLOAT_TENOR"} <= set(rejection.expected)
+
+        rejection = self.parser.validate("EUR 5Y10Y 100M X")
+        assert isinstance(rejection, Rejection) and rejection.position == 14
+
+        rejection = self.parser.validate("EUR ")
+        assert isinstance(rejection, Rejection) and rejection.position == 4
+        assert rejection.message == "Unexpected end of string."
+
+    def test_converted_values(self):
+        # the pattern of dates matches 31FEB20, which is not a date
+        assert not self.parser.validate("31FEB2010Y 100M")
+        with pytest.raises(Exception):
+            self.parser.parse("31FEB2010Y 100M")
+
+    def test_too_long(self):
+        rejection = AssetClassParser("linear_rate", max_length=8).validate("EUR 5Y10Y 100M")
+        assert not rejection and rejection.position == 8
+
+    def test_validate_many(self):
+        strings = VALID + ["NOT A SWAP"] + VALID
+        results = self.parser.validate_many(strings, workers=2)
+        assert results[: len(VALID)] == [self.parser.parse(string)[0] for string in VALID]
+        assert results[len(VALID)].position == 0
+        assert results[len(VALID) + 1 :] == results[: len(VALID)]
+
+    def test_forest_is_not_built(self, monkeypatch):
+        recognizer = Recognizer.from_parser(self.parser.parser)
+
+        def parse(*args):
+            raise AssertionError("the parse forest is built")
+
+        monkeypatch.setattr(recognizer, "_parse", parse)
+        for string in VALID:
+            assert recognizer.recognize(string) == self.parser.parse(string)[0]
+        assert not recognizer.recognize("NOT A SWAP")
+
+    def test_ambiguous_products(self):
+        # the string is both a swap curve & a tenor basis swap, the priorities of their rules pick the product
+        assert self.parser.validate("Z2 3S12S") == self.parser.parse("Z2 3S12S")[0] == "swap_curve"
+
+    def test_lalr(self):
+        with pytest.raises(ValueError):
+            Recognizer.from_parser(AssetClassParser("linear_rate", parser_options={"parser": "lalr"}).parser)
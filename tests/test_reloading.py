@@ -0,0 +1,105 @@
+import os
+import shutil
+import time
+
+import pytest
+
+from rates_derivative_grammar import GRAMMAR_PATH, AssetClassFormatter, AssetClassParser
+from rates_derivative_grammar.custom_types import Currency
+from rates_derivative_grammar.reloading import GrammarReloader
+from rates_derivative_grammar.utils import _imported_grammars
+
+ATTRIBUTES = {"currency": Currency.EUR, "start_time": "5Y", "end_time": "10Y", "size": 100_000_000}
+
+
+def edit(path: str, old: str, new: str) -> None:
+    with open(path, encoding="utf8") as f:
+        text = f.read()
+    with open(path, "w", encoding="utf8") as f:
+        f.write(text.replace(old, new))
+    # the modification time is moved forward as the edit may happen within its resolution
+    mtime = time.time() + 10
+    os.utime(path, (mtime, mtime))
+
+
+class TestGrammarReloader:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.grammar_path = str(tmp_path / "grammar")
+        shutil.copytree(GRAMMAR_PATH, self.grammar_path)
+        self.parser = AssetClassParser("linear_rate", grammar_path=self.grammar_path)
+        self.formatter = AssetClassFormatter("linear_rate", grammar_path=self.grammar_path)
+        self.reloader = GrammarReloader(self.grammar_path)
+        self.reloader.register(self.parser, self.formatter)
+        yield
+        self.reloader.stop()
+
+    def test_reload_product(self):
+        assert self.formatter.format("fix_float_swap", ATTRIBUTES) == "EUR 5Y10Y 100M"
+        bound = self.formatter.bind("fix_float_swap", ATTRIBUTES)
+        memo = _imported_grammars[os.path.abspath(self.grammar_path)]
+        shared = memo["common/shared.lark"]
+
+        edit(os.path.join(self.grammar_path, "linear_rate__fix_float_swap.lark"), '[CURRENCY " "]', '[CURRENCY "/"]')
+        assert self.reloader.changes() == {"linear_rate__fix_float_swap.lark"}
+        assert self.reloader.reload() == {"linear_rate": {"fix_float_swap"}}
+        assert not self.reloader.changes() and self.reloader.reload() == {}
+
+        # the grammars of the files unchanged are reused
+        assert memo["common/shared.lark"] is shared
+        assert self.parser.parse("EUR/5Y10Y 100M")[0] == "fix_float_swap"
+        assert self.formatter.format("fix_float_swap", ATTRIBUTES) == "EUR/5Y10Y 100M"
+        assert bound.update(size=200_000_000) == "EUR/5Y10Y 200M"
+        assert self.parser.validate("EUR/5Y10Y 100M") == "fix_float_swap"
+        assert not self.parser.validate("EUR 5Y10Y 100M")
+
+    def test_reload_import(self):
+        with open(os.path.join(self.grammar_path, "common", "custom.lark"), "a", encoding="utf8") as f:
+            f.write("\n// changed\n")
+        products = self.reloader.reload()
+        assert set(products) == {"linear_rate", "rates_volatility"}
+        assert "fra" in products["linear_rate"] and "swaption" in products["rates_volatility"]
+
+    def test_reload_by_hash(self):
+        reloader = GrammarReloader(self.grammar_path, method="hash")
+        os.utime(os.path.join(self.grammar_path, "linear_rate__fra.lark"))
+        assert reloader.reload() == {}
+
+        with open(os.path.join(self.grammar_path, "rates_volatility__swaption.lark"), "a", encoding="utf8") as f:
+            f.write("\n")
+        assert reloader.reload() == {"rates_volatility": {"swaption"}}
+
+    def test_invalid_grammar(self):
+        path = os.path.join(self.grammar_path, "linear_rate__fix_float_swap.lark")
+        edit(path, "start:", "start:: (")
+        with pytest.raises(Exception):
+            self.reloader.reload()
+        # the previous grammar is kept until the file is fixed
+        assert self.parser.parse("EUR 5Y10Y 100M")[0] == "fix_float_swap"
+
+        edit(path, "start:: (", "start:")
+        self.reloader.reload()
+        assert self.parser.parse("EUR 5Y10Y 100M")[0] == "fix_float_swap"
+
+    def test_unknown_product(self):
+        with pytest.raises(FileNotFoundError):
+            self.formatter.format("not_a_product", ATTRIBUTES)
+        # the product types that could not be formatted are not reloaded
+        self.formatter.reload()
+        assert "not_a_product" not in self.formatter._versions
+
+    def test_register(self):
+        with pytest.raises(ValueError):
+            self.reloader.register(AssetClassFormatter("linear_rate"))
+        with pytest.raises(ValueError):
+            GrammarReloader(self.grammar_path, method="ctime")
+
+    def test_background(self):
+        self.reloader.start(interval=0.01)
+        edit(os.path.join(self.grammar_path, "linear_rate__fix_float_swap.lark"), '[CURRENCY " "]', '[CURRENCY "/"]')
+        for _ in range(500):
+            if self.parser.validate("EUR/5Y10Y 100M") and self.formatter.format("fix_float_swap", ATTRIBUTES)[3] == "/":
+                break
+            time.sleep(0.01)
+        assert self.parser.parse("EUR/5Y10Y 100M")[0] == "fix_float_swap"
+        assert self.reloader.last_error is None
@@ -0,0 +1,56 @@
+from datetime import date
+
+import pytest
+
+from rates_derivative_grammar.resolution import TimeResolver, BusinessDayCalendar, third_wednesday
+
+VALUATION_DATE = date(2020, 5, 15)
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("5Y", date(2025, 5, 15)),
+        ("4.25Y", date(2024, 8, 15)),
+        ("6M", date(2020, 11, 15)),
+        ("1W", date(2020, 5, 22)),
+        ("3B", date(2020, 5, 20)),
+        ("0D", date(2020, 5, 15)),
+        ("M8", date(2028, 6, 21)),
+        ("M0", date(2020, 6, 17)),
+        ("H0", date(2030, 3, 20)),
+        ("IMM_1", date(2020, 6, 17)),
+        ("IMM_2", date(2020, 9, 16)),
+        ("IMM_MAR25", date(2025, 3, 19)),
+        (date(2021, 1, 1), date(2021, 1, 1)),
+        (["5Y", "7Y"], [date(2025, 5, 15), date(2027, 5, 15)]),
+    ],
+)
+def test_resolve(value, expected):
+    assert TimeResolver().resolve(VALUATION_DATE, value) == expected
+
+
+def test_resolve_many():
+    resolver = TimeResolver()
+    values = ["5Y", "M8", ["5Y", "IMM_1"], "5Y"]
+    assert resolver.resolve_many(VALUATION_DATE, values) == [resolver.resolve(VALUATION_DATE, v) for v in values]
+    with pytest.raises(ValueError):
+        resolver.resolve_many(VALUATION_DATE, ["5X"])
+
+
+def test_third_wednesday():
+    assert third_wednesday(2025, 3) == date(2025, 3, 19)
+    assert third_wednesday(2025, 10) == date(2025, 10, 15)
+
+
+def test_calendar(tmp_path):
+    path = tmp_path / "holidays.txt"
+    path.write_text("# holidays\n2025-05-15\n\n2020-05-18\n")
+    resolver = TimeResolver(BusinessDayCalendar.from_file(str(path)))
+    assert resolver.resolve_many(VALUATION_DATE, ["5Y", "1B", "3B"]) == [
+        date(2025, 5, 16),
+        date(2020, 5, 19),
+        date(2020, 5, 21),
+    ]
+    # modified following rolls back at the end of the month
+    assert BusinessDayCalendar().roll(date(2020, 5, 31)) == date(2020, 5, 29)
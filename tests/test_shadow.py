@@ -0,0 +1,63 @@
+import pytest
+
+from rates_derivative_grammar import AssetClassParser
+
+STRINGS = ["EUR 5Y10Y 100M", "3X6 0.1", "DKK 3X6I -0.36", "NOT A SWAP"]
+
+
+class TestShadow:
+    def setup_method(self):
+        self.parser = AssetClassParser("linear_rate")
+
+    def teardown_method(self):
+        self.parser.stop_shadow()
+
+    def test_mismatches(self):
+        expected = AssetClassParser("linear_rate").parse_many(STRINGS, return_exceptions=True)
+        shadow = self.parser.start_shadow({"parser": "lalr"}, sample_rate=1.0, max_overhead=100.0)
+
+        results = self.parser.parse_many(STRINGS, return_exceptions=True)
+        shadow.flush()
+
+        # the results are the ones of the primary parser
+        assert [r if not isinstance(r, Exception) else type(r) for r in results] == [
+            r if not isinstance(r, Exception) else type(r) for r in expected
+        ]
+
+        report = shadow.report()
+        assert (report.parses, report.sampled, report.compared, report.dropped) == (4, 4, 4, 0)
+        # lalr cannot parse the grammar's ambiguities, and both parsers fail on the last string
+        assert report.mismatches == 3
+        assert sorted(mismatch.string for mismatch in report.examples) == sorted(STRINGS[:3])
+        mismatch = next(mismatch for mismatch in report.examples if mismatch.string == STRINGS[0])
+        assert mismatch.primary == expected[0]
+        assert isinstance(mismatch.secondary, Exception)
+        assert report.agreement == pytest.approx(0.25)
+        assert report.relative_latency > 0
+
+    def test_secondary_does_not_affect_primary(self):
+        # building a lalr parser drops the priorities of the rules, which must not leak into the earley parsers
+        self.parser.start_shadow({"parser": "lalr"}, sample_rate=0.0)
+        expected = ("fra", {"start_time": "3M", "end_time": "6M", "size": 0.1})
+        assert self.parser.parse("3X6 0.1") == expected
+        assert AssetClassParser("linear_rate").parse("3X6 0.1") == expected
+
+    def test_overhead_cap(self):
+        shadow = self.parser.start_shadow({"lexer": "dynamic_complete"}, sample_rate=1.0, max_overhead=0.0)
+        for string in STRINGS[:3]:
+            self.parser.parse(string)
+            shadow.flush()
+
+        report = shadow.report()
+        assert (report.sampled, report.compared, report.dropped, report.mismatches) == (3, 1, 2, 0)
+
+    def test_sample_rate(self):
+        shadow = self.parser.start_shadow({"lexer": "dynamic_complete"}, sample_rate=0.0)
+        self.parser.parse_many(STRINGS[:3])
+        assert shadow.report().parses == 3
+        assert shadow.report().sampled == 0
+
+        self.parser.stop_shadow()
+        assert self.parser.shadow is None
+        self.parser.parse(STRINGS[0])
+        assert shadow.report().parses == 3
@@ -0,0 +1,66 @@
+import pickle
+
+from lark import Token, Tree
+from lark.parsers import xearley
+import pytest
+
+from rates_derivative_grammar import AssetClassParser
+from rates_derivative_grammar.corpus import CorpusGenerator
+from rates_derivative_grammar.utils import PredictOnceParser, SlimTree, to_name, to_value
+
+
+def test_parse_tree():
+    parser = AssetClassParser("linear_rate")
+    tree = parser.parser.parse("EUR 5Y10Y 100M")
+    subtrees = list(tree.iter_subtrees())
+    assert all(type(subtree) is SlimTree and subtree.meta is None for subtree in subtrees)
+    assert pickle.loads(pickle.dumps(tree)) == tree
+
+    transformer, visitor = parser._make_pipeline(to_name(tree.children[0]))
+    transformed = transformer.transform(tree.children[0])
+    # no meta is allocated while transforming the tree
+    assert all(subtree._meta is None for subtree in transformed.iter_subtrees())
+    assert visitor(transformed)["size"] == 100_000_000
+
+
+def test_slim_tree():
+    start_time, end_time = Token("FLOAT_TENOR", "5Y"), Token("FLOAT_TENOR", "10Y")
+    tree = SlimTree("schedule", [SlimTree("start_time", [start_time]), SlimTree("end_time", [end_time])])
+    assert isinstance(tree, Tree)
+    assert tree == Tree("schedule", [Tree("start_time", [start_time]), Tree("end_time", [end_time])])
+    assert to_name(tree) == "schedule"
+    assert to_value(tree) == ["5Y", "10Y"]
+    assert tree.meta is None
+
+
+def test_processors_make_slim_trees():
+    parser = AssetClassParser("linear_rate")
+    tree = parser.parser.parse("EUR 1JAN19 5S7S10S 0.5/2/1 1D ACT365 -5K/10.2K/-5KR")
+    transformer, _ = parser._make_pipeline(to_name(tree.children[0]))
+    subtrees = list(transformer.transform(tree.children[0]).iter_subtrees())
+    assert {subtree.data for subtree in subtrees} >= {"size", "schedule"}
+    assert all(type(subtree) is SlimTree and subtree._meta is None for subtree in subtrees)
+
+
+def test_propagate_positions():
+    parser = AssetClassParser("linear_rate", parser_options={"propagate_positions": True})
+    assert parser.parse("EUR 5Y10Y 100M") == AssetClassParser("linear_rate").parse("EUR 5Y10Y 100M")
+    tree = parser.parser.parse("EUR 5Y10Y 100M")
+    assert (tree.meta.line, tree.meta.column, tree.meta.end_column) == (1, 1, 15)
+
+
+def test_predict_once():
+    parser = AssetClassParser("linear_rate")
+    assert type(parser.parser.parser.parser) is PredictOnceParser
+    stock = AssetClassParser("linear_rate")
+    stock.parser.parser.parser.__class__ = xearley.Parser
+
+    for sample in CorpusGenerator("linear_rate", seed=1).generate(100):
+        for string in (sample.string, sample.string[:-1]):
+            try:
+                expected = stock.parser.parse(string)
+            except Exception as e:
+                with pytest.raises(type(e)):
+                    parser.parser.parse(string)
+            else:
+                assert parser.parser.parse(string) == expected
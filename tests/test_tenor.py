@@ -0,0 +1,51 @@
+import copy
+import pickle
+
+import pytest
+
+from rates_derivative_grammar import AssetClassParser, AssetClassFormatter
+from rates_derivative_grammar.custom_types import Tenor
+
+
+@pytest.mark.parametrize(
+    "value, unit, quantity, months",
+    [("10Y", "Y", 10, 120), ("4.25Y", "Y", 4.25, 51.0), ("6M", "M", 6, 6), ("1W", "W", 1, None), ("0D", "D", 0, None)],
+)
+def test_tenor(value, unit, quantity, months):
+    tenor = Tenor(value)
+    assert (tenor.unit, tenor.quantity, tenor.months, tenor.is_imm) == (unit, quantity, months, False)
+    assert tenor == value and hash(tenor) == hash(value)
+
+
+def test_str_methods():
+    tenor = AssetClassParser("linear_rate", intern_tenors=True).parse("EUR 5Y10Y 100M")[1]["start_time"]
+    assert isinstance(tenor, Tenor)
+    assert tenor.count("Y") == 1 and tenor.endswith("Y") and tenor.lower() == "5y"
+    assert tenor.replace("Y", "M") == "5M" and tenor.split("Y") == ["5", ""] and tenor.strip() == "5Y"
+    assert tenor.upper() == tenor and f"{tenor}" == "5Y" and tenor.index("Y") == 1
+
+
+def test_imm_code():
+    tenor = Tenor("U8")
+    assert (tenor.unit, tenor.imm_month, tenor.imm_year, tenor.is_imm) == (None, 9, 8, True)
+
+
+def test_tenor_is_flyweight():
+    tenor = Tenor("10Y")
+    assert Tenor("".join(["10", "Y"])) is tenor
+    assert copy.deepcopy(tenor) is tenor
+    assert pickle.loads(pickle.dumps(tenor)) is tenor
+    assert Tenor("12M").months == Tenor("1Y").months
+    with pytest.raises(AttributeError):
+        tenor.unit = "M"
+    with pytest.raises(ValueError):
+        Tenor("10X")
+
+
+@pytest.mark.parametrize("string", ["EUR 5Y10Y 3S 100M", "H02YSH22YS 3S 100M/100MR", "EUR 1JAN195YS30MAR1910YS 1D 1.2M"])
+def test_parse_interned_tenors(string):
+    parser = AssetClassParser("linear_rate", intern_tenors=True)
+    product_type, attributes_dict = parser.parse(string)
+    assert (product_type, attributes_dict) == AssetClassParser("linear_rate").parse(string)
+    assert isinstance(attributes_dict["float_freq"], Tenor)
+    assert AssetClassFormatter("linear_rate").format(product_type, attributes_dict) == string